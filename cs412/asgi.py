@@ -2,6 +2,9 @@
 ASGI config for cs412 project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn cs412.asgi:application``) so the
+live match event stream (project.views.MatchEventsView) runs without tying up
+a thread per open connection.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
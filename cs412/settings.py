@@ -45,7 +45,7 @@ INSTALLED_APPS = [
     'restaurant', #assignment 2
     'blog_ex', #example blog
     'mini_insta', #assignment 3
-    #'voter_analytics' #assignment 8
+    'voter_analytics', #assignment 8
     'project', #final project
 ]
 
@@ -79,6 +79,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'cs412.wsgi.application'
 
+# serve with an ASGI server (uvicorn cs412.asgi:application) for live match scores
+ASGI_APPLICATION = 'cs412.asgi.application'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
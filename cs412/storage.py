@@ -0,0 +1,124 @@
+# file: cs412/storage.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Content-addressed, deduplicating file storage for uploaded media, with reference-counted deletion.
+
+import hashlib
+import os
+import time
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+# directory under MEDIA_ROOT holding content-addressed files
+PREFIX = 'cas'
+
+# seconds after a save reuses a stored file during which release() won't delete it
+REUSE_GRACE_SECONDS = 60
+
+# (app label, model, field) of every FileField stored here; a file's reference
+# count is the number of rows across these fields that name it
+REFERENCES = [
+    ('mini_insta', 'Photo', 'image_file'),
+    ('project', 'ProPlayer', 'image_file'),
+]
+
+
+def is_content_addressed(name):
+    ''' True if name was produced by ContentAddressedStorage (or derived from such a name). '''
+
+    return bool(name) and name.replace('\\', '/').startswith(PREFIX + '/')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    ''' Store each upload at cas/<2 hex>/<blake2b hex><ext>, named by its
+    content. Saving bytes that are already stored returns the existing name
+    without writing anything, so re-posted images cost no disk or write time.
+
+    Names that are already content-addressed (e.g. a thumbnail derived from
+    cas/ab/ab12….jpg) are saved as given, since they are determined by the
+    original's content. Files saved before this backend keep their old names. '''
+
+    def __init__(self, **kwargs):
+        # two writers of the same name write the same bytes, so overwriting is safe
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+
+    def hashed_name(self, content, name):
+        ''' Return the content-addressed name for content, keeping name's extension. '''
+
+        digest = hashlib.blake2b(digest_size=20)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if content.seekable():
+            content.seek(0)
+        ext = os.path.splitext(name)[1].lower()
+        hexdigest = digest.hexdigest()
+        return f'{PREFIX}/{hexdigest[:2]}/{hexdigest}{ext}'
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        if not is_content_addressed(name):
+            name = self.hashed_name(content, name)
+            if self.touch(name):
+                return name
+        return super().save(name, content, max_length=max_length)
+
+    def touch(self, name):
+        ''' Mark a stored file as just reused by setting its mtime to now.
+        Returns False if it doesn't exist (or was just released), in which
+        case the caller writes it again. '''
+
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def delete_unreferenced(self, name, derived=()):
+        ''' Delete name and its derived files unless a row references it or a
+        save reused it in the last REUSE_GRACE_SECONDS. The file is first
+        renamed aside, so a save racing this call either touched it before
+        (and it is put back here) or finds it gone (and writes it again). '''
+
+        path = self.path(name)
+        aside = f'{path}.releasing'
+        try:
+            os.replace(path, aside)
+        except FileNotFoundError:
+            return False
+        if os.stat(aside).st_mtime > time.time() - REUSE_GRACE_SECONDS or references(name):
+            os.replace(aside, path)
+            return False
+        os.remove(aside)
+        for derived_name in derived:
+            self.delete(derived_name)
+        return True
+
+
+# the storage of every FileField in REFERENCES
+media_storage = ContentAddressedStorage()
+
+
+def references(name):
+    ''' Return how many rows in REFERENCES name this file. '''
+
+    return sum(
+        apps.get_model(app_label, model).objects.filter(**{field: name}).count()
+        for app_label, model, field in REFERENCES
+    )
+
+
+def release(name, derived=(), storage=None):
+    ''' Delete a content-addressed file, and files derived from it, once no row
+    references it any more. Call after the referencing row is deleted (on
+    commit). Files from before this backend are left alone. '''
+
+    storage = storage or media_storage
+    if not is_content_addressed(name) or references(name):
+        return False
+    return storage.delete_unreferenced(name, derived)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MiniInstaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mini_insta'
+
+    def ready(self):
+        ''' Connect the signal handlers that keep denormalized data in sync. '''
+        from . import signals  # noqa: F401
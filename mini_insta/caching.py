@@ -0,0 +1,83 @@
+# file: mini_insta/caching.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Per-object version stamps for Profile/Post and caching keyed by them, with hit/miss counters.
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import models
+
+# changed model -> [(model whose version is bumped, lookup on it, attribute of the changed row)]
+BUMPS = {
+    # a profile's name also shows under the posts it liked or commented on
+    'Profile': [('Profile', 'pk', 'pk'), ('Post', 'like__profile', 'pk'), ('Post', 'comment__profile', 'pk')],
+    'Post': [('Post', 'pk', 'pk'), ('Profile', 'pk', 'profile_id')],
+    # a photo shows on its post and as the thumbnail in its author's grid
+    'Photo': [('Post', 'pk', 'post_id'), ('Profile', 'post', 'post_id')],
+    'Comment': [('Post', 'pk', 'post_id')],
+    'Like': [('Post', 'pk', 'post_id')],
+    # both follower and following counts are on the profile page
+    'Follow': [('Profile', 'pk', 'profile_id'), ('Profile', 'pk', 'follower_profile_id')],
+}
+
+# entries age out on their own; a version bump just stops them being read
+CACHE_SECONDS = 60 * 60 * 24
+
+STATS_KEYS = {'hit': 'mini_insta:cache:hits', 'miss': 'mini_insta:cache:misses'}
+
+
+def bump(instance):
+    ''' Increment the version of every Profile and Post whose rendering
+    depends on instance. One UPDATE per target; no cache keys are deleted. '''
+
+    for target, lookup, attr in BUMPS.get(type(instance).__name__, []):
+        apps.get_model('mini_insta', target).objects.filter(**{lookup: getattr(instance, attr)}).update(
+            version=models.F('version') + 1,
+        )
+
+
+def version_key(name, *objects):
+    ''' Return a cache key for name that changes whenever any of objects
+    (anything with pk and version, e.g. a Profile, Post or values() dict) does. '''
+
+    parts = [
+        f'{pk}.{version}' for pk, version in (
+            (o['pk'], o['version']) if isinstance(o, dict) else (o.pk, o.version) for o in objects
+        )
+    ]
+    return f'mini_insta:{name}:{":".join(parts)}'
+
+
+def record(outcome):
+    ''' Count a cache 'hit' or 'miss' in the cache itself, so every process
+    sharing the cache backend adds to the same totals. '''
+
+    key = STATS_KEYS[outcome]
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def get_or_render(key, render):
+    ''' Return the cached value at key, or call render(), cache and return it.
+    Returns (value, hit). '''
+
+    value = cache.get(key)
+    if value is not None:
+        record('hit')
+        return value, True
+    record('miss')
+    value = render()
+    cache.set(key, value, CACHE_SECONDS)
+    return value, False
+
+
+def stats():
+    ''' Return {'hits', 'misses', 'ratio'} since the counters were last reset. '''
+
+    values = cache.get_many(STATS_KEYS.values())
+    hits = values.get(STATS_KEYS['hit'], 0)
+    misses = values.get(STATS_KEYS['miss'], 0)
+    return {'hits': hits, 'misses': misses, 'ratio': round(hits / (hits + misses), 4) if hits + misses else None}
@@ -0,0 +1,60 @@
+# file: mini_insta/counters.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Denormalized follower/following/post/like/comment counters: incremental updates and bulk reconciliation.
+
+from django.apps import apps
+from django.db import models
+from django.db.models.functions import Coalesce, Greatest
+
+# (model holding the counter, counter field, model being counted, its foreign key to the holder)
+COUNTERS = [
+    ('Profile', 'follower_count', 'Follow', 'profile'),
+    ('Profile', 'following_count', 'Follow', 'follower_profile'),
+    ('Profile', 'post_count', 'Post', 'profile'),
+    ('Post', 'like_count', 'Like', 'post'),
+    ('Post', 'comment_count', 'Comment', 'post'),
+]
+
+
+def _model(name):
+    return apps.get_model('mini_insta', name)
+
+
+def adjust(instance, delta):
+    ''' Add delta to every counter that counts rows like instance. Each counter
+    is one UPDATE ... SET n = n + delta, so concurrent writers don't lose
+    increments; inside the caller's transaction it commits with the row. '''
+
+    for holder, field, counted, fk in COUNTERS:
+        if type(instance).__name__ != counted:
+            continue
+        # never below zero, even if the stored value had drifted low
+        _model(holder).objects.filter(pk=getattr(instance, f'{fk}_id')).update(
+            **{field: Greatest(models.F(field) + delta, 0)}
+        )
+
+
+def expected(field):
+    ''' Return an expression computing the true value of a counter field. '''
+
+    _, _, counted, fk = next(c for c in COUNTERS if c[1] == field)
+    rows = _model(counted).objects.filter(**{fk: models.OuterRef('pk')}).order_by().values(fk)
+    return Coalesce(models.Subquery(rows.annotate(n=models.Count('pk')).values('n')), 0)
+
+
+def reconcile(fix=True):
+    ''' Compare every counter with a fresh count and return {field: rows that
+    had drifted}. With fix=True each drifted counter is repaired by a single
+    UPDATE over its whole table. '''
+
+    drift = {}
+    for holder, field, _, _ in COUNTERS:
+        stale = (
+            _model(holder).objects
+            .annotate(actual=expected(field))
+            .exclude(**{field: models.F('actual')})
+        )
+        drift[field] = stale.count()
+        if fix and drift[field]:
+            _model(holder).objects.update(**{field: expected(field)})
+    return drift
@@ -0,0 +1,160 @@
+# file: mini_insta/graph.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: In-memory follow graph in CSR arrays for mutuals, "followers you know" and two-hop suggestions.
+
+import copy
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from .models import Follow, Profile
+
+# seconds between checks of the Follow table for changes
+REFRESH_INTERVAL = 5.0
+
+# delta edges kept beside the arrays before they are rebuilt
+MAX_DELTA = 10000
+
+
+def _csr(n, pairs):
+    ''' Return (offsets, targets) arrays for n nodes from (source, target)
+    index pairs: the neighbours of node i are targets[offsets[i]:offsets[i + 1]]. '''
+
+    offsets = array('i', [0]) * (n + 1)
+    for source, _ in pairs:
+        offsets[source + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    targets = array('i', [0]) * len(pairs)
+    fill = array('i', offsets[:-1])
+    for source, target in pairs:
+        targets[fill[source]] = target
+        fill[source] += 1
+    return offsets, targets
+
+
+class FollowGraph:
+    ''' The Follow table as two CSR adjacency structures over dense node
+    indexes: out-edges (who a Profile follows) and in-edges (its followers).
+    Follows added after the build go into small per-node sets until there are
+    MAX_DELTA of them; any unfollow forces a rebuild.
+
+    A graph is never changed once built: refresh() returns a new one, so a
+    reader holding a graph sees one consistent state however long it takes. '''
+
+    def __init__(self):
+        ''' Load every Profile and Follow into fresh arrays. Both are read in
+        one transaction; where the database doesn't give that a single
+        snapshot, a Profile created between the two reads is added from its
+        edges rather than failing the build. '''
+
+        with transaction.atomic():
+            ids = list(Profile.objects.order_by('pk').values_list('pk', flat=True))
+            edges = list(Follow.objects.values_list('pk', 'follower_profile_id', 'profile_id'))
+        ids.extend(sorted({pk for _, a, b in edges for pk in (a, b)}.difference(ids)))
+        self.ids = array('q', ids)
+        self.index = {pk: i for i, pk in enumerate(self.ids)}
+        pairs = [(self.index[a], self.index[b]) for _, a, b in edges]
+        self.out_offsets, self.out_targets = _csr(len(self.ids), pairs)
+        self.in_offsets, self.in_targets = _csr(len(self.ids), [(b, a) for a, b in pairs])
+
+        self.last_follow = max((pk for pk, _, _ in edges), default=0)
+        self.edge_count = len(edges)
+        self.delta_out = defaultdict(set)
+        self.delta_in = defaultdict(set)
+        self.delta_size = 0
+
+    def refresh(self):
+        ''' Return this graph with the Follows created since it was built or
+        refreshed applied, or self if there are none. If the table has fewer
+        rows than that implies, someone unfollowed: return a fresh build. '''
+
+        new = list(Follow.objects.filter(pk__gt=self.last_follow).values_list('pk', 'follower_profile_id', 'profile_id'))
+        if self.delta_size + len(new) > MAX_DELTA or Follow.objects.count() != self.edge_count + len(new):
+            return FollowGraph()
+        if not new:
+            return self
+
+        # the arrays are shared; the delta dicts are copied, and every set
+        # that grows is replaced rather than added to
+        graph = copy.copy(self)
+        graph.delta_out = defaultdict(set, self.delta_out)
+        graph.delta_in = defaultdict(set, self.delta_in)
+        for pk, follower, followed in new:
+            graph.delta_out[follower] = graph.delta_out[follower] | {followed}
+            graph.delta_in[followed] = graph.delta_in[followed] | {follower}
+            graph.last_follow = max(graph.last_follow, pk)
+        graph.edge_count += len(new)
+        graph.delta_size += len(new)
+        return graph
+
+    def _neighbours(self, pk, offsets, targets, delta):
+        i = self.index.get(pk)
+        found = set(delta.get(pk, ()))
+        if i is not None:
+            found.update(self.ids[j] for j in targets[offsets[i]:offsets[i + 1]])
+        return found
+
+    def following(self, pk):
+        ''' Return the set of Profile pks that pk follows. '''
+
+        return self._neighbours(pk, self.out_offsets, self.out_targets, self.delta_out)
+
+    def followers(self, pk):
+        ''' Return the set of Profile pks that follow pk. '''
+
+        return self._neighbours(pk, self.in_offsets, self.in_targets, self.delta_in)
+
+    def mutuals(self, pk):
+        ''' Return the Profiles that pk follows and that follow pk back. '''
+
+        return self.following(pk) & self.followers(pk)
+
+    def followers_you_know(self, viewer, pks):
+        ''' Return {pk: set of Profiles viewer follows that also follow pk} for each of pks. '''
+
+        known = self.following(viewer)
+        return {pk: self.followers(pk) & known for pk in pks}
+
+    def suggestions(self, pk, limit=10):
+        ''' Return [(Profile pk, score)] of Profiles pk doesn't follow yet, scored
+        by how many of the Profiles pk follows follow them (two hops), best first. '''
+
+        following = self.following(pk)
+        scores = Counter()
+        for friend in following:
+            scores.update(self.following(friend))
+        for excluded in following | {pk}:
+            scores.pop(excluded, None)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+_lock = threading.Lock()
+_graph = None
+_checked = 0.0
+
+
+def get_graph():
+    ''' Return the process-wide FollowGraph, built on first use and refreshed
+    from the Follow table at most every REFRESH_INTERVAL seconds. A refresh
+    builds its graph outside the lock and swaps it in with one assignment;
+    callers keep the graph they got for the rest of the request. '''
+
+    global _graph, _checked
+    graph = _graph
+    now = time.monotonic()
+    if graph is None:
+        fresh = FollowGraph()
+    elif now - _checked >= REFRESH_INTERVAL:
+        fresh = graph.refresh()
+    else:
+        return graph
+
+    with _lock:
+        # another thread may have swapped in its own refresh meanwhile: keep that one
+        if _graph is graph:
+            _graph, _checked = fresh, now
+        return _graph
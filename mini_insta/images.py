@@ -0,0 +1,83 @@
+# file: mini_insta/images.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Downscaled, recompressed JPEG and WebP variants of uploaded Photo images.
+
+import io
+import os
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# variant name -> (longest side in pixels, Pillow format)
+VARIANTS = {
+    'thumb': (320, 'JPEG'),
+    'thumb_webp': (320, 'WEBP'),
+    'medium': (1080, 'JPEG'),
+    'medium_webp': (1080, 'WEBP'),
+}
+
+EXTENSIONS = {'JPEG': 'jpg', 'WEBP': 'webp'}
+
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 82, 'optimize': True, 'progressive': True},
+    'WEBP': {'quality': 80, 'method': 6},
+}
+
+
+def variant_name(name, variant):
+    ''' Return the storage name of a variant, next to the original:
+    photos/neo.jpg -> photos/neo.thumb.jpg, photos/neo.thumb.webp, ... '''
+
+    root, _ = os.path.splitext(name)
+    size = variant.split('_')[0]
+    return f'{root}.{size}.{EXTENSIONS[VARIANTS[variant][1]]}'
+
+
+def open_image(f):
+    ''' Decode an image file upright (EXIF rotation applied). JPEGs are decoded
+    at reduced scale when even the largest variant doesn't need full size. '''
+
+    image = Image.open(f)
+    largest = max(side for side, fmt in VARIANTS.values())
+    image.draft('RGB', (largest, largest))
+    image = ImageOps.exif_transpose(image)
+    image.load()
+    return image
+
+
+def render(image, side, fmt):
+    ''' Return the bytes of image shrunk to fit a side x side box (never enlarged) in fmt. '''
+
+    image = image.copy()
+    image.thumbnail((side, side), Image.LANCZOS)
+    if fmt == 'JPEG' and image.mode not in ('RGB', 'L'):
+        # JPEG has no alpha channel: flatten transparent PNG/WebP onto white
+        background = Image.new('RGB', image.size, 'white')
+        image = image.convert('RGBA')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    out = io.BytesIO()
+    image.save(out, fmt, **SAVE_OPTIONS[fmt])
+    return out.getvalue()
+
+
+def generate_variants(photo):
+    ''' Write every variant of photo.image_file to its storage and return
+    {variant: storage name}. Photos that only have an external image_url have
+    nothing to resize, so they get {}. '''
+
+    if not photo.image_file:
+        return {}
+
+    storage = photo.image_file.storage
+    with photo.image_file.open('rb') as f:
+        image = open_image(f)
+
+    names = {}
+    for variant, (side, fmt) in VARIANTS.items():
+        name = variant_name(photo.image_file.name, variant)
+        # regenerating replaces the old file rather than saving neo.thumb_AbC12.jpg
+        if storage.exists(name):
+            storage.delete(name)
+        names[variant] = storage.save(name, ContentFile(render(image, side, fmt)))
+    return names
@@ -0,0 +1,119 @@
+# file: mini_insta/jobs.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: A small job queue stored in the Job table: enqueue, claim with a visibility timeout, run with retries.
+
+import datetime
+import logging
+import os
+import socket
+import traceback
+
+from django.db import close_old_connections, connection
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# how long a claimed job stays invisible to other workers
+VISIBILITY_TIMEOUT = datetime.timedelta(minutes=5)
+
+# delay before retry n is 2 ** n times this
+RETRY_DELAY = datetime.timedelta(seconds=10)
+
+
+def enqueue(task, **kwargs):
+    ''' Queue a call of task (a function or its dotted path) with JSON-serializable
+    kwargs. Called inside a transaction, the job only becomes visible to workers
+    if that transaction commits. '''
+
+    if callable(task):
+        task = f'{task.__module__}.{task.__qualname__}'
+    return Job.objects.create(task=task, kwargs=kwargs)
+
+
+def worker_name(suffix=''):
+    ''' Return an identifier for this worker, for Job.worker. '''
+
+    return f'{socket.gethostname()}:{os.getpid()}{suffix}'
+
+
+def claim(worker, visibility=VISIBILITY_TIMEOUT):
+    ''' Claim the next visible job for worker and return it, or None when the
+    queue is empty. A job is visible when it is queued and due, or running
+    but its lease has expired. Claiming is a compare-and-set UPDATE, so two
+    workers racing for one job can't both get it. '''
+
+    while True:
+        now = timezone.now()
+        candidate = (
+            Job.objects
+            .filter(status__in=[Job.QUEUED, Job.RUNNING], run_after__lte=now)
+            .order_by('run_after', 'pk')
+            .values('pk', 'status', 'run_after', 'attempts', 'max_attempts')
+            .first()
+        )
+        if candidate is None:
+            return None
+
+        if candidate['status'] == Job.RUNNING and candidate['attempts'] >= candidate['max_attempts']:
+            # its last worker died mid-run and there are no attempts left
+            Job.objects.filter(pk=candidate['pk'], run_after=candidate['run_after']).update(
+                status=Job.FAILED, finished=now, last_error='lease expired on final attempt',
+            )
+            continue
+
+        claimed = Job.objects.filter(
+            pk=candidate['pk'], status=candidate['status'], run_after=candidate['run_after'],
+        ).update(
+            status=Job.RUNNING, run_after=now + visibility, worker=worker,
+            attempts=candidate['attempts'] + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=candidate['pk'])
+        # another worker won the race; look again
+
+
+def run(job):
+    ''' Run a claimed job and record the outcome: done, queued again with a
+    backoff delay, or failed once max_attempts is used up. Returns True on success. '''
+
+    try:
+        import_string(job.task)(**job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('job %s (%s) failed on attempt %s', job.pk, job.task, job.attempts)
+        now = timezone.now()
+        if job.attempts >= job.max_attempts:
+            changes = {'status': Job.FAILED, 'finished': now}
+        else:
+            changes = {'status': Job.QUEUED, 'run_after': now + RETRY_DELAY * 2 ** job.attempts}
+        # only if we still hold the lease; otherwise another worker owns the job now
+        Job.objects.filter(pk=job.pk, worker=job.worker, run_after=job.run_after).update(last_error=error, **changes)
+        return False
+
+    Job.objects.filter(pk=job.pk, worker=job.worker, run_after=job.run_after).update(
+        status=Job.DONE, finished=timezone.now(), last_error='',
+    )
+    return True
+
+
+def work(worker, stop, poll=1.0, visibility=VISIBILITY_TIMEOUT, drain=False):
+    ''' Claim and run jobs until the stop event is set. Sleeps poll seconds
+    when the queue is empty; with drain=True it returns then instead. '''
+
+    processed = 0
+    while not stop.is_set():
+        close_old_connections()
+        job = claim(worker, visibility)
+        if job is None:
+            if drain:
+                break
+            stop.wait(poll)
+            continue
+        run(job)
+        processed += 1
+    # each worker thread has its own connection
+    connection.close()
+    return processed
@@ -0,0 +1,53 @@
+# file: mini_insta/management/commands/dedupe_media.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Management command that moves media saved under upload names into content-addressed storage.
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from cs412.storage import REFERENCES, is_content_addressed, media_storage, references
+
+
+class Command(BaseCommand):
+    ''' Re-save every file referenced by a Photo or ProPlayer under its content
+    hash and point the rows at the new name. Duplicates such as Twistzz.png
+    and Twistzz_6WCIJeM.png collapse into one file; the old copies are deleted
+    once nothing references them. '''
+
+    help = 'Move existing uploads into content-addressed storage, merging identical files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-old', action='store_true', help='leave the old files in place')
+
+    def handle(self, *args, **options):
+        storage = media_storage
+        old_names = set()
+        new_names = set()
+        moved = 0
+
+        for app_label, model_name, field in REFERENCES:
+            model = apps.get_model(app_label, model_name)
+            for pk, name in model.objects.exclude(**{field: ''}).values_list('pk', field).iterator():
+                if is_content_addressed(name):
+                    continue
+                if not storage.exists(name):
+                    self.stderr.write(f'{model_name} {pk}: {name} is missing')
+                    continue
+                with storage.open(name, 'rb') as f:
+                    new_name = storage.save(name, f)
+                # update() rather than save(), so auto_now timestamps aren't touched
+                model.objects.filter(pk=pk).update(**{field: new_name})
+                old_names.add(name)
+                new_names.add(new_name)
+                moved += 1
+
+        freed = 0
+        if not options['keep_old']:
+            for name in sorted(old_names):
+                if not references(name):
+                    freed += storage.size(name)
+                    storage.delete(name)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Moved {moved} references to {len(new_names)} stored files; freed {freed:,} bytes'
+        ))
@@ -0,0 +1,34 @@
+# file: mini_insta/management/commands/generate_photo_variants.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Management command that creates the thumb/medium JPEG and WebP variants of uploaded Photos.
+
+from django.core.management.base import BaseCommand
+
+from mini_insta.models import Photo
+
+
+class Command(BaseCommand):
+    ''' Backfill variants for Photos uploaded before they existed, or redo
+    them all with --all after changing the sizes in images.VARIANTS. '''
+
+    help = 'Generate downscaled JPEG/WebP variants for uploaded Photo images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='regenerate variants that already exist')
+
+    def handle(self, *args, **options):
+        photos = Photo.objects.exclude(image_file='').order_by('pk')
+        if not options['all']:
+            photos = photos.filter(variants={})
+
+        done = failed = 0
+        for photo in photos.iterator():
+            try:
+                photo.make_variants()
+                done += 1
+            except (OSError, ValueError) as e:
+                # a missing or unreadable original; leave the Photo on its full-size URL
+                failed += 1
+                self.stderr.write(f'Photo {photo.pk} ({photo.image_file.name}): {e}')
+
+        self.stdout.write(self.style.SUCCESS(f'Generated variants for {done} photos ({failed} failed)'))
@@ -0,0 +1,41 @@
+# file: mini_insta/management/commands/rebuild_feeds.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Management command that rebuilds the materialized FeedItem table from Follows and Posts.
+
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from mini_insta.models import FeedItem, Follow, Post
+
+
+class Command(BaseCommand):
+    ''' Recreate every Profile's feed from scratch. The signal handlers keep
+    feeds current; run this once for data that existed before FeedItem, or to
+    repair drift after raw SQL edits. '''
+
+    help = 'Rebuild all materialized home feeds from Follow and Post rows.'
+
+    BATCH_SIZE = 5000
+
+    def handle(self, *args, **options):
+        posts_by_profile = defaultdict(list)
+        for pk, profile_id, timestamp in Post.objects.values_list('pk', 'profile_id', 'timestamp').iterator():
+            posts_by_profile[profile_id].append((pk, timestamp))
+
+        created = 0
+        with transaction.atomic():
+            FeedItem.objects.all().delete()
+            batch = []
+            for owner_id, profile_id in Follow.objects.values_list('follower_profile_id', 'profile_id').iterator():
+                for pk, timestamp in posts_by_profile[profile_id]:
+                    batch.append(FeedItem(owner_id=owner_id, post_id=pk, timestamp=timestamp))
+                if len(batch) >= self.BATCH_SIZE:
+                    FeedItem.objects.bulk_create(batch, ignore_conflicts=True)
+                    created += len(batch)
+                    batch = []
+            FeedItem.objects.bulk_create(batch, ignore_conflicts=True)
+            created += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt feeds with {created} items'))
@@ -0,0 +1,34 @@
+# file: mini_insta/management/commands/reconcile_counters.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Management command that checks the denormalized Profile/Post counters against real counts and repairs drift.
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from mini_insta.counters import reconcile
+
+
+class Command(BaseCommand):
+    ''' Recount followers, following, posts, likes and comments. The signal
+    handlers keep the counters current; run this after raw SQL edits, bulk
+    operations that skip signals, or a crash between a write and its update. '''
+
+    help = 'Report and repair drift in the denormalized follower/following/post/like/comment counters.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='only report drifted counters; exit with status 1 if any are found')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drift = reconcile(fix=not options['check'])
+
+        for field, rows in drift.items():
+            self.stdout.write(f'{field:<16} {rows} drifted')
+        total = sum(drift.values())
+        if options['check']:
+            if total:
+                raise CommandError(f'{total} counters have drifted')
+            self.stdout.write(self.style.SUCCESS('All counters are correct'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Repaired {total} counters'))
@@ -0,0 +1,52 @@
+# file: mini_insta/management/commands/run_jobs.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Management command that runs a pool of job queue workers.
+
+import datetime
+import threading
+
+from django.core.management.base import BaseCommand
+
+from mini_insta import jobs
+
+
+class Command(BaseCommand):
+    ''' Run background jobs from the Job table with a pool of worker threads.
+    Any number of these processes can run side by side; claims are atomic and
+    a job whose worker dies is picked up again after the visibility timeout. '''
+
+    help = 'Process queued background jobs (photo variants, ...) with a pool of workers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='worker threads (default 2)')
+        parser.add_argument('--poll', type=float, default=1.0,
+                            help='seconds to sleep when the queue is empty (default 1)')
+        parser.add_argument('--visibility', type=int, default=int(jobs.VISIBILITY_TIMEOUT.total_seconds()),
+                            help='seconds a claimed job stays hidden from other workers (default 300)')
+        parser.add_argument('--drain', action='store_true', help='exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        counts = []
+        visibility = datetime.timedelta(seconds=options['visibility'])
+
+        def loop(n):
+            counts.append(jobs.work(
+                jobs.worker_name(f'/{n}'), stop, poll=options['poll'],
+                visibility=visibility, drain=options['drain'],
+            ))
+
+        threads = [threading.Thread(target=loop, args=(n,), daemon=True) for n in range(options['workers'])]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            # let running jobs finish; unfinished claims expire and are retried
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {sum(counts)} jobs'))
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_feeds(apps, schema_editor):
+    ''' Materialize the feeds of existing Follows (rebuild_feeds does the same later on). '''
+
+    FeedItem = apps.get_model('mini_insta', 'FeedItem')
+    Follow = apps.get_model('mini_insta', 'Follow')
+    Post = apps.get_model('mini_insta', 'Post')
+    items = [
+        FeedItem(owner_id=follow.follower_profile_id, post_id=pk, timestamp=timestamp)
+        for follow in Follow.objects.all()
+        for pk, timestamp in Post.objects.filter(profile_id=follow.profile_id).values_list('pk', 'timestamp')
+    ]
+    FeedItem.objects.bulk_create(items, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mini_insta', '0008_remove_profile_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField()),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_items', to='mini_insta.profile')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_items', to='mini_insta.post')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', '-timestamp', '-post'], name='feeditem_owner_time_idx')],
+                'unique_together': {('owner', 'post')},
+            },
+        ),
+        migrations.RunPython(backfill_feeds, migrations.RunPython.noop),
+    ]
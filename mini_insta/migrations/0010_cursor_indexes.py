@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mini_insta', '0009_feeditem'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['profile', '-timestamp', '-id'], name='follow_profile_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['follower_profile', '-timestamp', '-id'], name='follow_follower_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['profile', '-timestamp', '-id'], name='post_profile_time_idx'),
+        ),
+    ]
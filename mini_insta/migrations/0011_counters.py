@@ -0,0 +1,59 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:19
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    ''' Count the existing rows into the new columns (same as reconcile_counters). '''
+
+    counters = [
+        ('Profile', 'follower_count', 'Follow', 'profile'),
+        ('Profile', 'following_count', 'Follow', 'follower_profile'),
+        ('Profile', 'post_count', 'Post', 'profile'),
+        ('Post', 'like_count', 'Like', 'post'),
+        ('Post', 'comment_count', 'Comment', 'post'),
+    ]
+    for holder, field, counted, fk in counters:
+        rows = (
+            apps.get_model('mini_insta', counted).objects
+            .filter(**{fk: models.OuterRef('pk')}).order_by().values(fk)
+            .annotate(n=models.Count('pk')).values('n')
+        )
+        apps.get_model('mini_insta', holder).objects.update(**{field: Coalesce(models.Subquery(rows), 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mini_insta', '0010_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='follower_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:24
+
+from django.db import migrations
+
+from mini_insta.migrations._search_index import DROP_TRIGGERS, TRIGGERS
+
+# One FTS5 row per Post (caption) and per Profile (username, display name, bio).
+# The rowid encodes the source row, 2 * id for a Post and 2 * id + 1 for a
+# Profile; the triggers in _search_index.py keep it current.
+# prefix='2 3' adds prefix indexes so short "pho*" queries stay cheap.
+CREATE = '''
+CREATE VIRTUAL TABLE mini_insta_search USING fts5(
+    caption,
+    username,
+    display_name,
+    bio_text,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+INSERT INTO mini_insta_search (rowid, caption)
+    SELECT 2 * id, caption FROM mini_insta_post;
+INSERT INTO mini_insta_search (rowid, username, display_name, bio_text)
+    SELECT 2 * id + 1, username, display_name, bio_text FROM mini_insta_profile;
+''' + TRIGGERS
+
+DROP = DROP_TRIGGERS + '''
+DROP TABLE mini_insta_search;
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mini_insta', '0011_counters'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE, DROP),
+    ]
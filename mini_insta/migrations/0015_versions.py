@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:26
+
+from django.db import migrations, models
+
+from mini_insta.migrations._search_index import keep_search_triggers
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mini_insta', '0014_job'),
+    ]
+
+    # adding the columns makes SQLite rebuild both tables
+    operations = keep_search_triggers(
+        migrations.AddField(
+            model_name='post',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    )
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:48
+
+from django.db import migrations, models
+
+
+def queue_legacy_photos(apps, schema_editor):
+    ''' Photos uploaded before variants existed (or added through the admin)
+    have an image file but no variants: mark them pending and queue the same
+    job an upload gets. Photos that already have variants stay ready. '''
+
+    Photo = apps.get_model('mini_insta', 'Photo')
+    Job = apps.get_model('mini_insta', 'Job')
+    legacy = list(Photo.objects.exclude(image_file='').filter(variants={}).values_list('pk', flat=True))
+    Photo.objects.filter(pk__in=legacy).update(variants_status='pending')
+    Job.objects.bulk_create(
+        [Job(task='mini_insta.tasks.make_photo_variants', kwargs={'photo_id': pk}) for pk in legacy],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mini_insta', '0015_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='variants_status',
+            field=models.CharField(choices=[('pending', 'pending'), ('ready', 'ready'), ('failed', 'failed')], default='ready', editable=False, max_length=10),
+        ),
+        migrations.RunPython(queue_legacy_photos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:50
+
+import cs412.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mini_insta', '0016_photo_variants_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='photo',
+            name='image_file',
+            field=models.ImageField(blank=True, storage=cs412.storage.ContentAddressedStorage(), upload_to=''),
+        ),
+    ]
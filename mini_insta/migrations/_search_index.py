@@ -0,0 +1,56 @@
+# file: mini_insta/migrations/_search_index.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: The triggers that keep the mini_insta_search FTS table in step with posts and profiles, for migrations.
+
+# (The leading underscore keeps the migration loader from reading this module
+# as a migration.)
+
+from django.db import migrations
+
+# The FTS rowid is 2 * id for a Post and 2 * id + 1 for a Profile, so each
+# trigger updates or deletes one row by rowid instead of scanning.
+TRIGGERS = '''
+CREATE TRIGGER mini_insta_search_post_ai AFTER INSERT ON mini_insta_post BEGIN
+    INSERT INTO mini_insta_search (rowid, caption) VALUES (2 * new.id, new.caption);
+END;
+CREATE TRIGGER mini_insta_search_post_au AFTER UPDATE OF caption ON mini_insta_post BEGIN
+    UPDATE mini_insta_search SET caption = new.caption WHERE rowid = 2 * new.id;
+END;
+CREATE TRIGGER mini_insta_search_post_ad AFTER DELETE ON mini_insta_post BEGIN
+    DELETE FROM mini_insta_search WHERE rowid = 2 * old.id;
+END;
+
+CREATE TRIGGER mini_insta_search_profile_ai AFTER INSERT ON mini_insta_profile BEGIN
+    INSERT INTO mini_insta_search (rowid, username, display_name, bio_text)
+        VALUES (2 * new.id + 1, new.username, new.display_name, new.bio_text);
+END;
+CREATE TRIGGER mini_insta_search_profile_au AFTER UPDATE OF username, display_name, bio_text ON mini_insta_profile BEGIN
+    UPDATE mini_insta_search SET username = new.username, display_name = new.display_name, bio_text = new.bio_text
+        WHERE rowid = 2 * new.id + 1;
+END;
+CREATE TRIGGER mini_insta_search_profile_ad AFTER DELETE ON mini_insta_profile BEGIN
+    DELETE FROM mini_insta_search WHERE rowid = 2 * old.id + 1;
+END;
+'''
+
+TRIGGER_NAMES = [
+    'mini_insta_search_post_ai', 'mini_insta_search_post_au', 'mini_insta_search_post_ad',
+    'mini_insta_search_profile_ai', 'mini_insta_search_profile_au', 'mini_insta_search_profile_ad',
+]
+
+DROP_TRIGGERS = ''.join(f'DROP TRIGGER IF EXISTS {name};\n' for name in reversed(TRIGGER_NAMES))
+
+
+def keep_search_triggers(*operations):
+    ''' Return operations wrapped so the search triggers survive them. SQLite
+    applies AddField, AlterField and RemoveField on mini_insta_post or
+    mini_insta_profile by copying the table into a new one, which drops
+    its triggers. The FTS rows themselves are keyed by id and survive the
+    copy. Triggers are recreated after the operations run, and again after
+    they are unapplied. '''
+
+    return [
+        migrations.RunSQL(migrations.RunSQL.noop, TRIGGERS),
+        *operations,
+        migrations.RunSQL(TRIGGERS, DROP_TRIGGERS),
+    ]
@@ -4,9 +4,39 @@
 
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
+
+from cs412.storage import media_storage
+
+from .caching import bump
+from .images import generate_variants
 
 # Create your models here.
-class Profile(models.Model):
+class MaintainedFieldsModel(models.Model):
+    ''' A model with columns that only signals.py writes, each with an UPDATE
+    of an F() expression (counters, and the version caching.bump() moves). save() on an existing row leaves those columns out,
+    so a stale instance (in a form, the admin or the shell) can't write back
+    the values it loaded over newer ones. '''
+
+    # columns save() never writes on an existing row
+    maintained_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not kwargs.get('force_insert'):
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                # what a plain save() writes: every loaded column
+                deferred = self.get_deferred_fields()
+                update_fields = [f.name for f in self._meta.concrete_fields
+                                 if not f.primary_key and f.attname not in deferred]
+            kwargs['update_fields'] = [name for name in update_fields if name not in self.maintained_fields]
+        super().save(*args, **kwargs)
+
+
+class Profile(MaintainedFieldsModel):
     '''Encapsulate the data of a personal Profile by an user of the mini_insta app'''
 
     username = models.TextField(blank=True)
@@ -15,6 +45,14 @@ class Profile(models.Model):
     join_date = models.DateTimeField(auto_now=True)
     profile_image_url = models.URLField(blank=True)
 
+    # denormalized counts, kept current by signals.py (reconcile_counters repairs drift)
+    follower_count = models.PositiveIntegerField(default=0, editable=False)
+    following_count = models.PositiveIntegerField(default=0, editable=False)
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+    # bumped by any change that shows on the profile page (see caching.py)
+    version = models.PositiveIntegerField(default=1, editable=False)
+    maintained_fields = ('follower_count', 'following_count', 'post_count', 'version')
+
     def __str__(self):
         ''' Return a readable string showing the display name and bio snippet. '''
         return f'{self.bio_text} by {self.display_name}'
@@ -22,7 +60,7 @@ class Profile(models.Model):
     def get_all_posts(self):
         ''' Return all Post objects associated with this Profile, ordered by most recent timestamp first. '''
         posts = Post.objects.filter(profile=self)
-        return posts.order_by('-timestamp')
+        return posts.order_by('-timestamp', '-pk')
     
     def get_absolute_url(self):
         """Return the URL for this Profile’s detail page."""
@@ -37,7 +75,7 @@ class Profile(models.Model):
     def get_num_followers(self):
         ''' Return the count of followers (int). '''
 
-        return Follow.objects.filter(profile=self).count()
+        return self.follower_count
 
     def get_following(self):
         '''Return a Python list of Profile objects that THIS profile follows. '''
@@ -48,34 +86,86 @@ class Profile(models.Model):
     def get_num_following(self):
         ''' Return the count of profiles this profile is following (int). '''
 
-        return Follow.objects.filter(follower_profile=self).count()
+        return self.following_count
     
     def get_post_feed(self):
         ''' Return a QuerySet of Posts made by Profiles that this Profile follows,
-        ordered from newest to oldest. '''
-        
-        # Get all the Follow objects where this profile is the follower
-        following_rels = Follow.objects.filter(follower_profile=self)
-
-        # Extract the followed Profile objects (publishers)
-        followed_profiles = [f.profile for f in following_rels]
-
-        # If not following anyone, return an empty QuerySet
-        if not followed_profiles:
-            return Post.objects.none()
-
-        # Retrieve posts from those profiles
-        feed_posts = Post.objects.filter(profile__in=followed_profiles).order_by('-timestamp')
-
-        return feed_posts
-
-
-class Post(models.Model):
+        ordered from newest to oldest. Reads the materialized FeedItem rows, so
+        the cost doesn't grow with the number of profiles followed. '''
+
+        return (
+            Post.objects
+            .filter(feed_items__owner=self)
+            # reuses the join above; also the key for paginating the feed
+            .annotate(feed_timestamp=models.F('feed_items__timestamp'))
+            # post via FeedItem rather than Post.pk, so the index also covers the tie-break
+            .order_by('-feed_timestamp', '-feed_items__post')
+        )
+
+
+class PostQuerySet(models.QuerySet):
+    ''' QuerySet methods for listing Posts. '''
+
+    def with_first_photo(self):
+        ''' Prefetch each Post's newest Photo into post.first_photos ([Photo] or []). '''
+
+        return self.prefetch_related(
+            models.Prefetch('photo_set', Photo.objects.order_by('-timestamp', '-pk')[:1],
+                            to_attr='first_photos'),
+        )
+
+    def with_first_like(self):
+        ''' Prefetch each Post's newest Like, with its profile, into post.first_likes ([Like] or []). '''
+
+        return self.prefetch_related(
+            models.Prefetch('like_set', Like.objects.select_related('profile').order_by('-timestamp', '-pk')[:1],
+                            to_attr='first_likes'),
+        )
+
+    def with_feed_data(self, comments=3):
+        ''' Attach what a feed card shows to every Post, in a fixed number of
+        queries however many Posts there are:
+
+        post.first_photos   [newest Photo] or []
+        post.first_likes    [newest Like, with its profile] or []
+        post.feed_comments  up to `comments` newest Comments
+
+        Like and comment totals are the like_count/comment_count columns.
+        '''
+
+        return (
+            self
+            .select_related('profile')
+            .with_first_photo()
+            .with_first_like()
+            .prefetch_related(
+                models.Prefetch('comment_set', Comment.objects.select_related('profile').order_by('-timestamp', '-pk')[:comments],
+                                to_attr='feed_comments'),
+            )
+        )
+
+
+class Post(MaintainedFieldsModel):
     ''' Represents a single post created by a Profile. '''
 
+    objects = PostQuerySet.as_manager()
+
     profile = models.ForeignKey(Profile, on_delete=models.CASCADE)
     caption = models.TextField(blank=True)
     timestamp = models.DateTimeField(auto_now=True)
+    # denormalized counts, kept current by signals.py
+    like_count = models.PositiveIntegerField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    # bumped by any change to the post, its photos, comments or likes, or to a
+    # profile that liked or commented on it (see caching.py)
+    version = models.PositiveIntegerField(default=1, editable=False)
+    maintained_fields = ('like_count', 'comment_count', 'version')
+
+    class Meta:
+        indexes = [
+            # a Profile's post grid, newest first
+            models.Index(fields=['profile', '-timestamp', '-id'], name='post_profile_time_idx'),
+        ]
 
     def __str__(self):
         ''' Return a readable string showing the caption and profile username. '''
@@ -96,7 +186,7 @@ class Post(models.Model):
 
     def get_num_likes(self):
         ''' Return the number of likes on this Post. '''
-        return Like.objects.filter(post=self).count()
+        return self.like_count
 
     
 class Photo(models.Model):
@@ -105,17 +195,74 @@ class Photo(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
     image_url = models.URLField(blank=True)
     timestamp = models.DateTimeField(auto_now=True)
-    image_file = models.ImageField(blank=True)
+    # stored by content hash, so identical images are written once
+    image_file = models.ImageField(blank=True, storage=media_storage)
+    # {variant name: storage name} of the downscaled copies of image_file (see images.py)
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+
+    # where the variants job stands: pending from a new image_file until the
+    # job finishes, failed if it raised (the original is shown meanwhile)
+    VARIANTS_PENDING = 'pending'
+    VARIANTS_READY = 'ready'
+    VARIANTS_FAILED = 'failed'
+    VARIANTS_STATUS_CHOICES = [
+        (VARIANTS_PENDING, 'pending'),
+        (VARIANTS_READY, 'ready'),
+        (VARIANTS_FAILED, 'failed'),
+    ]
+    variants_status = models.CharField(
+        max_length=10, choices=VARIANTS_STATUS_CHOICES, default=VARIANTS_READY, editable=False,
+    )
 
-    def get_image_url(self):
-        ''' Return the URL of the image. '''
+    def get_image_url(self, size=None):
+        ''' Return the URL of the image. With a size ('thumb', 'medium', or
+        either with '_webp') return that variant's URL when it has been
+        generated, falling back to the original. '''
 
         if self.image_url:
             return self.image_url
         elif self.image_file:
+            if size in self.variants:
+                return self.image_file.storage.url(self.variants[size])
             return self.image_file.url
         return None
 
+    def get_image_urls(self):
+        ''' Return {size: {'src': JPEG or original URL, 'webp': WebP URL or None}}
+        for 'thumb', 'medium' and 'original', for use in templates. '''
+
+        return {
+            size: {
+                'src': self.get_image_url(size),
+                'webp': self.get_image_url(f'{size}_webp') if f'{size}_webp' in self.variants else None,
+            }
+            for size in ('thumb', 'medium', 'original')
+        }
+
+    def is_processing(self):
+        ''' True while a variants job is queued or running for image_file. A
+        photo whose job failed, or that never had one, shows its original. '''
+
+        return bool(self.image_file) and self.variants_status == self.VARIANTS_PENDING
+
+    def make_variants(self):
+        ''' Generate and record the resized variants of image_file. If that
+        raises (e.g. Pillow can't decode the file) the photo is marked failed
+        before the error goes back to the job queue, which may retry it. '''
+
+        try:
+            self.variants = generate_variants(self)
+        except Exception:
+            self.variants_status = self.VARIANTS_FAILED
+            Photo.objects.filter(pk=self.pk).update(variants_status=self.variants_status)
+            bump(self)
+            raise
+        self.variants_status = self.VARIANTS_READY
+        # update() rather than save(), so timestamp (auto_now) isn't bumped
+        Photo.objects.filter(pk=self.pk).update(variants=self.variants, variants_status=self.variants_status)
+        # update() sends no post_save, so stale "Processing photo…" pages need an explicit bump
+        bump(self)
+
     def __str__(self):
         ''' Return a readable string showing the image URL and username of owner. '''
 
@@ -144,6 +291,11 @@ class Follow(models.Model):
 
     class Meta:
         unique_together = ('profile', 'follower_profile')
+        indexes = [
+            # followers and following lists, newest first
+            models.Index(fields=['profile', '-timestamp', '-id'], name='follow_profile_time_idx'),
+            models.Index(fields=['follower_profile', '-timestamp', '-id'], name='follow_follower_time_idx'),
+        ]
 
     def __str__(self):
         ''' String representation '''
@@ -174,3 +326,59 @@ class Like(models.Model):
     def __str__(self):
         return f'{self.profile.display_name} liked Post {self.post_id}'
 
+
+class FeedItem(models.Model):
+    ''' One Post in one Profile's home feed. Rows are written when a Post is
+    created or a Follow is made, and removed when the Post or Follow goes
+    away (see signals.py), so reading a feed is one indexed range scan. '''
+
+    # the Profile whose feed this is
+    owner = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="feed_items")
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="feed_items")
+    # copy of post.timestamp, so the feed can be sorted without touching Post
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('owner', 'post')
+        indexes = [
+            models.Index(fields=['owner', '-timestamp', '-post'], name='feeditem_owner_time_idx'),
+        ]
+
+    def __str__(self):
+        return f'Post {self.post_id} in feed of Profile {self.owner_id}'
+
+
+class Job(models.Model):
+    ''' One unit of background work in the database-backed queue (see jobs.py).
+    A queued job becomes visible to workers at run_after. A claimed job's
+    run_after is pushed forward by the visibility timeout, so if its worker
+    dies the job is claimed again once that lease expires. '''
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(s, s) for s in (QUEUED, RUNNING, DONE, FAILED)]
+
+    # dotted path of the function to call, e.g. 'mini_insta.tasks.make_photo_variants'
+    task = models.CharField(max_length=200)
+    # keyword arguments for the function (JSON)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    # queued: earliest start (later after a failure); running: end of the worker's lease
+    run_after = models.DateTimeField(default=timezone.now)
+    worker = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # the claim query: next visible job
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.task}({self.kwargs}) {self.status}'
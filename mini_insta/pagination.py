@@ -0,0 +1,49 @@
+# file: mini_insta/pagination.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Keyset (cursor) pagination over querysets ordered newest first by (timestamp, pk).
+
+import base64
+import datetime
+import json
+
+from django.db.models import Q
+
+
+def encode_cursor(timestamp, pk):
+    ''' Return an opaque cursor pointing just past the row with this (timestamp, pk). '''
+
+    raw = json.dumps([timestamp.isoformat(), pk]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    ''' Return (timestamp, pk) from a cursor, or None if it is invalid. '''
+
+    try:
+        timestamp, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.datetime.fromisoformat(timestamp), int(pk)
+    except (ValueError, TypeError):
+        return None
+
+
+def paginate(qs, cursor, page_size, key='timestamp'):
+    ''' Return (rows, next_cursor) for the page of qs after cursor.
+
+    qs must be ordered by (-key, -pk) with an index to match, so every page is
+    one range scan starting at the cursor instead of an OFFSET that re-reads
+    all earlier pages. key may be a field or an annotation; next_cursor is
+    None on the last page. '''
+
+    position = decode_cursor(cursor or '')
+    if position:
+        timestamp, pk = position
+        # the leading <= bound lets the index start the range scan at the cursor
+        qs = qs.filter(**{f'{key}__lte': timestamp}).filter(
+            Q(**{f'{key}__lt': timestamp}) | Q(**{key: timestamp, 'pk__lt': pk})
+        )
+
+    rows = list(qs[:page_size + 1])
+    if len(rows) <= page_size:
+        return rows, None
+    last = rows[page_size - 1]
+    return rows[:page_size], encode_cursor(getattr(last, key), last.pk)
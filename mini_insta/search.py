@@ -0,0 +1,53 @@
+# file: mini_insta/search.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Ranked full-text search over Posts and Profiles using the SQLite FTS5 table mini_insta_search.
+
+import re
+
+from django.db import connection
+
+# bm25 weights of the indexed columns (caption, username, display_name, bio_text);
+# a hit in a name counts for more than one in a longer caption or bio
+WEIGHTS = (1.0, 10.0, 10.0, 2.0)
+
+# at most this many ranked hits are read per search
+MAX_RESULTS = 100
+
+TOKEN = re.compile(r'\w+')
+
+
+def match_expression(query):
+    ''' Turn free text into an FTS5 query: every word must match, and the last
+    one also matches as a prefix so results appear while it is being typed.
+    Words are quoted, so FTS5 operators in user input are taken literally. '''
+
+    words = TOKEN.findall(query)
+    if not words:
+        return ''
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search(query, limit=MAX_RESULTS):
+    ''' Return ([(profile id, score)], [(post id, score)]) for query, best match
+    first, from one indexed MATCH over the FTS table. Lower bm25 scores rank
+    higher. The table's rowid is 2 * id for a Post and 2 * id + 1 for a Profile
+    (see migration 0012_search_index). '''
+
+    expression = match_expression(query)
+    if not expression:
+        return [], []
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT rowid, bm25(mini_insta_search, %s, %s, %s, %s) AS score '
+            'FROM mini_insta_search WHERE mini_insta_search MATCH %s '
+            'ORDER BY score LIMIT %s',
+            [*WEIGHTS, expression, limit],
+        )
+        rows = cursor.fetchall()
+
+    profiles = [(rowid // 2, score) for rowid, score in rows if rowid % 2]
+    posts = [(rowid // 2, score) for rowid, score in rows if not rowid % 2]
+    return profiles, posts
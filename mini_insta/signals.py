@@ -0,0 +1,123 @@
+# file: mini_insta/signals.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Signal handlers that keep the FeedItem table, counters, cache versions and stored media in sync.
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from cs412.storage import release
+
+from . import caching, counters
+from .jobs import enqueue
+from .models import Comment, FeedItem, Follow, Like, Photo, Post, Profile
+from .tasks import make_photo_variants
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, **kwargs):
+    ''' Push a new Post into the feed of every follower of its author; on an
+    edit, move the existing feed rows to the Post's new timestamp. '''
+
+    if not created:
+        FeedItem.objects.filter(post=instance).update(timestamp=instance.timestamp)
+        return
+
+    followers = Follow.objects.filter(profile_id=instance.profile_id).values_list('follower_profile_id', flat=True)
+    FeedItem.objects.bulk_create(
+        [FeedItem(owner_id=owner_id, post=instance, timestamp=instance.timestamp) for owner_id in followers],
+        ignore_conflicts=True,
+    )
+
+
+@receiver(post_save, sender=Follow)
+def backfill_follow(sender, instance, created, **kwargs):
+    ''' Add the followed Profile's existing Posts to the follower's feed. '''
+
+    if not created:
+        return
+    posts = Post.objects.filter(profile_id=instance.profile_id).values_list('pk', 'timestamp')
+    FeedItem.objects.bulk_create(
+        [FeedItem(owner_id=instance.follower_profile_id, post_id=pk, timestamp=ts) for pk, ts in posts],
+        ignore_conflicts=True,
+    )
+
+
+@receiver(post_delete, sender=Follow)
+def remove_follow(sender, instance, **kwargs):
+    ''' Take the unfollowed Profile's Posts out of the follower's feed.
+    (Deleting a Post removes its FeedItems through the cascade.) '''
+
+    FeedItem.objects.filter(owner_id=instance.follower_profile_id, post__profile_id=instance.profile_id).delete()
+
+
+def count_created(sender, instance, created, **kwargs):
+    ''' Increment the counters that count this kind of row. '''
+
+    if created:
+        counters.adjust(instance, 1)
+
+
+def count_deleted(sender, instance, **kwargs):
+    ''' Decrement the counters that count this kind of row (also runs for cascades). '''
+
+    counters.adjust(instance, -1)
+
+
+for model in (Follow, Like, Post, Comment):
+    post_save.connect(count_created, sender=model, dispatch_uid=f'count_created_{model.__name__}')
+    post_delete.connect(count_deleted, sender=model, dispatch_uid=f'count_deleted_{model.__name__}')
+
+
+def bump_versions(sender, instance, **kwargs):
+    ''' Move the Profiles and Posts that show this row to a new version, so
+    their cached pages and fragments are no longer read. '''
+
+    caching.bump(instance)
+
+
+for model in (Profile, Post, Photo, Comment, Like, Follow):
+    post_save.connect(bump_versions, sender=model, dispatch_uid=f'bump_versions_save_{model.__name__}')
+    post_delete.connect(bump_versions, sender=model, dispatch_uid=f'bump_versions_delete_{model.__name__}')
+
+
+@receiver(pre_save, sender=Photo)
+def mark_variants_pending(sender, instance, **kwargs):
+    ''' A Photo saved with a new or replaced image_file (from a post form, the
+    admin or the shell) needs new variants: drop the old ones and mark it
+    pending before the row is written. '''
+
+    instance._queue_variants = False
+    if kwargs.get('raw') or not instance.image_file:
+        return
+    old_name = None
+    if instance.pk:
+        old_name = sender.objects.filter(pk=instance.pk).values_list('image_file', flat=True).first()
+    if instance.image_file.name != old_name:
+        instance.variants = {}
+        instance.variants_status = Photo.VARIANTS_PENDING
+        instance._queue_variants = True
+
+
+@receiver(post_save, sender=Photo)
+def queue_variants(sender, instance, **kwargs):
+    ''' Queue the variants job for a Photo marked pending above. Inside a
+    transaction the job only becomes visible once the Photo is committed. '''
+
+    if getattr(instance, '_queue_variants', False):
+        instance._queue_variants = False
+        enqueue(make_photo_variants, photo_id=instance.pk)
+
+
+@receiver(post_delete, sender=Photo)
+def release_photo_file(sender, instance, **kwargs):
+    ''' Once the deletion commits, remove the image and its variants if no
+    other Photo or ProPlayer still uses the same stored file. '''
+
+    if instance.image_file:
+        transaction.on_commit(partial(
+            release, instance.image_file.name, derived=list(instance.variants.values()),
+            storage=instance.image_file.storage,
+        ))
@@ -0,0 +1,14 @@
+# file: mini_insta/tasks.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Background tasks run by the job queue workers (see jobs.py and the run_jobs command).
+
+from .models import Photo
+
+
+def make_photo_variants(photo_id):
+    ''' Generate the resized variants of one uploaded Photo. '''
+
+    photo = Photo.objects.filter(pk=photo_id).first()
+    if photo is None:
+        return  # deleted before the worker got to it
+    photo.make_variants()
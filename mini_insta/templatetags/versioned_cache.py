@@ -0,0 +1,40 @@
+# file: mini_insta/templatetags/versioned_cache.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: {% versioned_cache %} template tag: cache a fragment under the versions of the objects it shows.
+
+from django import template
+
+from mini_insta.caching import get_or_render, version_key
+
+register = template.Library()
+
+
+class VersionedCacheNode(template.Node):
+
+    def __init__(self, nodelist, name, objects):
+        self.nodelist = nodelist
+        self.name = name
+        self.objects = objects
+
+    def render(self, context):
+        objects = [o.resolve(context) for o in self.objects]
+        key = version_key(self.name, *objects)
+        content, hit = get_or_render(key, lambda: self.nodelist.render(context))
+        return content
+
+
+@register.tag
+def versioned_cache(parser, token):
+    ''' {% versioned_cache "name" obj1 obj2 ... %} ... {% endversioned_cache %}
+
+    Render the block once per combination of the objects' versions. When any
+    of them is bumped the key changes, so the old entry is simply never read
+    again. '''
+
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f'{bits[0]} needs a name and at least one object')
+    nodelist = parser.parse(('endversioned_cache',))
+    parser.delete_first_token()
+    name = bits[1].strip('"\'')
+    return VersionedCacheNode(nodelist, name, [parser.compile_filter(bit) for bit in bits[2:]])
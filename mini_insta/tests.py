@@ -1,3 +1,483 @@
+import datetime
+import io
+import os
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from cs412.storage import media_storage, release
+
+from . import graph as graph_module
+from .counters import reconcile
+from .graph import FollowGraph, get_graph
+from .images import VARIANTS
+from .jobs import claim, enqueue, run
+from .migrations._search_index import TRIGGER_NAMES
+from .models import Comment, FeedItem, Follow, Job, Like, Photo, Post, Profile
+from .search import search
+from .views import PostFeedListView, ProfileDetailView
 
 # Create your tests here.
+
+class FeedQueryTests(TestCase):
+    ''' The feed page must cost the same number of queries for any number of posts. '''
+
+    # Profile, Posts, then one prefetch each for photos, likes and comments
+    FEED_QUERIES = 5
+
+    def setUp(self):
+        self.reader = Profile.objects.create(username='reader')
+        self.author = Profile.objects.create(username='author')
+        self.fans = [Profile.objects.create(username=f'fan{i}') for i in range(3)]
+        Follow.objects.create(profile=self.author, follower_profile=self.reader)
+
+    def add_posts(self, n):
+        for i in range(n):
+            post = Post.objects.create(profile=self.author, caption=f'post {i}')
+            Photo.objects.create(post=post, image_url=f'https://example.com/{post.pk}.jpg')
+            for fan in self.fans:
+                Like.objects.create(post=post, profile=fan)
+                Comment.objects.create(post=post, profile=fan, text=f'nice {i}')
+
+    def get_feed(self, after=None, name='show_feed'):
+        return self.client.get(reverse(name, args=[self.reader.pk]), {'after': after} if after else {})
+
+    def test_query_count_is_constant(self):
+        self.add_posts(2)
+        with self.assertNumQueries(self.FEED_QUERIES):
+            self.get_feed()
+
+        self.add_posts(40)
+        with self.assertNumQueries(self.FEED_QUERIES):
+            response = self.get_feed()
+        self.assertEqual(len(response.context['posts']), PostFeedListView.page_size)
+
+        # a deep page costs the same as the first
+        with self.assertNumQueries(self.FEED_QUERIES):
+            self.get_feed(after=response.context['next_cursor'], name='show_feed_more')
+
+    def test_cursor_walks_whole_feed(self):
+        self.add_posts(45)
+        seen, cursor = [], None
+        while True:
+            response = self.get_feed(after=cursor, name='show_feed_more' if cursor else 'show_feed')
+            seen.extend(post.pk for post in response.context['posts'])
+            cursor = response.context['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, list(self.reader.get_post_feed().values_list('pk', flat=True)))
+        self.assertEqual(len(set(seen)), 45)
+
+    def test_feed_card_data(self):
+        self.add_posts(1)
+        post = self.get_feed().context['posts'][0]
+        self.assertEqual(post.like_count, 3)
+        self.assertEqual(post.comment_count, 3)
+        self.assertEqual(len(post.first_photos), 1)
+        self.assertEqual(post.first_likes[0].profile, self.fans[-1])
+        self.assertEqual([c.profile for c in post.feed_comments], self.fans[::-1])
+
+
+class CursorPageTests(TestCase):
+    ''' The profile post grid and follow lists walk every row once, page by page. '''
+
+    ROWS = 45
+
+    def setUp(self):
+        cache.clear()
+        self.profile = Profile.objects.create(username='center')
+
+    def walk(self, name, more_name, key):
+        ''' Follow next_cursor from the full page through the /more fragments;
+        return the rows seen and the number of pages. '''
+
+        response = self.client.get(reverse(name, args=[self.profile.pk]))
+        seen, pages = [], 0
+        while True:
+            pages += 1
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row.pk for row in response.context[key])
+            cursor = response.context['next_cursor']
+            if not cursor:
+                return seen, pages
+            response = self.client.get(reverse(more_name, args=[self.profile.pk]), {'after': cursor})
+
+    def test_post_grid(self):
+        posts = [Post.objects.create(profile=self.profile, caption=f'post {i}') for i in range(self.ROWS)]
+        seen, pages = self.walk('profile', 'profile_posts_more', 'posts')
+        self.assertEqual(seen, [post.pk for post in reversed(posts)])
+        self.assertEqual(pages, 3)
+
+    def test_follow_lists(self):
+        others = [Profile.objects.create(username=f'p{i}') for i in range(self.ROWS)]
+        for other in others:
+            Follow.objects.create(profile=self.profile, follower_profile=other)
+            Follow.objects.create(profile=other, follower_profile=self.profile)
+        newest_first = [other.pk for other in reversed(others)]
+
+        self.assertEqual(self.walk('show_followers', 'show_followers_more', 'profiles'), (newest_first, 3))
+        self.assertEqual(self.walk('show_following', 'show_following_more', 'profiles'), (newest_first, 3))
+
+    def test_last_page(self):
+        # exactly one full page: no cursor to a page that would be empty
+        for i in range(ProfileDetailView.page_size):
+            Post.objects.create(profile=self.profile, caption=f'post {i}')
+        response = self.client.get(reverse('profile', args=[self.profile.pk]))
+        self.assertEqual(len(response.context['posts']), ProfileDetailView.page_size)
+        self.assertIsNone(response.context['next_cursor'])
+        self.assertNotContains(response, reverse('profile_posts_more', args=[self.profile.pk]))
+
+
+class FeedItemTests(TestCase):
+    ''' The materialized feeds follow posts and follows, and rebuild_feeds writes the same table. '''
+
+    def setUp(self):
+        self.reader = Profile.objects.create(username='reader')
+        self.author = Profile.objects.create(username='author')
+        self.other = Profile.objects.create(username='other')
+
+    def feed(self):
+        return set(FeedItem.objects.filter(owner=self.reader).values_list('post_id', flat=True))
+
+    def table(self):
+        return sorted(FeedItem.objects.values_list('owner_id', 'post_id', 'timestamp'))
+
+    def test_signals_keep_feeds_current(self):
+        old = Post.objects.create(profile=self.author, caption='before the follow')
+        follow = Follow.objects.create(profile=self.author, follower_profile=self.reader)
+        # the new follow brings in the author's existing posts
+        self.assertEqual(self.feed(), {old.pk})
+
+        new = Post.objects.create(profile=self.author, caption='after the follow')
+        elsewhere = Post.objects.create(profile=self.other, caption='not followed yet')
+        self.assertEqual(self.feed(), {old.pk, new.pk})
+        Follow.objects.create(profile=self.other, follower_profile=self.reader)
+        self.assertEqual(self.feed(), {old.pk, new.pk, elsewhere.pk})
+
+        # an edit moves the feed row to the post's new timestamp
+        old.caption = 'edited'
+        old.save()
+        self.assertEqual(FeedItem.objects.get(owner=self.reader, post=old).timestamp, old.timestamp)
+
+        new.delete()
+        self.assertEqual(self.feed(), {old.pk, elsewhere.pk})
+        follow.delete()
+        self.assertEqual(self.feed(), {elsewhere.pk})
+
+    def test_rebuild_matches_signals(self):
+        for profile in (self.author, self.other):
+            Follow.objects.create(profile=profile, follower_profile=self.reader)
+            for i in range(3):
+                Post.objects.create(profile=profile, caption=f'{profile.username} {i}')
+        Follow.objects.create(profile=self.reader, follower_profile=self.author)
+        mine = Post.objects.create(profile=self.reader, caption='mine')
+        mine.caption = 'mine, edited'
+        mine.save()
+        Follow.objects.get(profile=self.other, follower_profile=self.reader).delete()
+        Post.objects.filter(profile=self.author).first().delete()
+
+        maintained = self.table()
+        self.assertEqual(len(maintained), 3)
+        call_command('rebuild_feeds', stdout=io.StringIO())
+        self.assertEqual(self.table(), maintained)
+
+
+class CounterTests(TestCase):
+    ''' The denormalized counters follow creates and deletes, and reconcile repairs drift. '''
+
+    def test_counters(self):
+        a = Profile.objects.create(username='a')
+        b = Profile.objects.create(username='b')
+        follow = Follow.objects.create(profile=a, follower_profile=b)
+        post = Post.objects.create(profile=a)
+        Like.objects.create(post=post, profile=b)
+        Comment.objects.create(post=post, profile=b, text='hi')
+
+        a.refresh_from_db()
+        b.refresh_from_db()
+        post.refresh_from_db()
+        self.assertEqual((a.follower_count, a.post_count, b.following_count), (1, 1, 1))
+        self.assertEqual((post.like_count, post.comment_count), (1, 1))
+
+        follow.delete()
+        post.delete()
+        a.refresh_from_db()
+        self.assertEqual((a.follower_count, a.post_count), (0, 0))
+
+        Profile.objects.filter(pk=a.pk).update(follower_count=5)
+        self.assertEqual(reconcile()['follower_count'], 1)
+        self.assertEqual(reconcile(fix=False)['follower_count'], 0)
+
+    def test_stale_save_keeps_counters(self):
+        a = Profile.objects.create(username='a')
+        b = Profile.objects.create(username='b')
+        post = Post.objects.create(profile=a, caption='first')
+        stale_post, stale_profile = Post.objects.get(pk=post.pk), Profile.objects.get(pk=a.pk)
+
+        Like.objects.create(post=post, profile=b)
+        Follow.objects.create(profile=a, follower_profile=b)
+        # an edit form holding the rows loaded before the like and the follow
+        stale_post.caption = 'edited'
+        stale_post.save()
+        stale_profile.bio_text = 'edited'
+        stale_profile.save()
+
+        post.refresh_from_db()
+        a.refresh_from_db()
+        self.assertEqual((post.caption, post.like_count), ('edited', 1))
+        self.assertEqual((a.bio_text, a.follower_count, a.post_count), ('edited', 1, 1))
+
+
+class SearchTests(TestCase):
+    ''' The FTS5 index follows Post and Profile changes through its triggers. '''
+
+    def test_search(self):
+        neo = Profile.objects.create(username='neo_rider', display_name='Keanu Reeves', bio_text='rides motorcycles')
+        fan = Profile.objects.create(username='fan', bio_text='likes keanu movies')
+        post = Post.objects.create(profile=fan, caption='Motorcycle day')
+
+        profiles, posts = search('keanu')
+        # a display name hit outranks a bio hit
+        self.assertEqual([pk for pk, score in profiles], [neo.pk, fan.pk])
+        self.assertEqual([pk for pk, score in search('motorcy')[1]], [post.pk])
+
+        post.caption = 'Quiet day'
+        post.save()
+        self.assertEqual(search('motorcy')[1], [])
+        neo.delete()
+        self.assertEqual([pk for pk, score in search('keanu')[0]], [fan.pk])
+        self.assertEqual(search('"OR (*'), ([], []))
+
+    def test_triggers_survive_migrations(self):
+        # a later migration that rebuilds the post or profile table must put them back
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'mini_insta_search_%'")
+            self.assertEqual(sorted(name for name, in cursor.fetchall()), sorted(TRIGGER_NAMES))
+
+
+class PhotoVariantTests(TestCase):
+    ''' Uploaded images get downscaled JPEG and WebP copies next to the original. '''
+
+    def test_upload_makes_variants(self):
+        image = Image.new('RGBA', (2000, 1000), (255, 0, 0, 128))
+        data = io.BytesIO()
+        image.save(data, 'PNG')
+        upload = SimpleUploadedFile('red.png', data.getvalue(), content_type='image/png')
+        profile = Profile.objects.create(username='a')
+
+        with tempfile.TemporaryDirectory() as media, self.settings(MEDIA_ROOT=media):
+            self.client.post(reverse('create_post', args=[profile.pk]), {'caption': 'red', 'image_files': upload})
+            photo = Photo.objects.get()
+            self.assertTrue(photo.is_processing())
+            self.assertTrue(run(claim('test')))
+            photo.refresh_from_db()
+            self.assertEqual(set(photo.variants), set(VARIANTS))
+            self.assertEqual(photo.variants['thumb'], photo.image_file.name.replace('.png', '.thumb.jpg'))
+            with Image.open(os.path.join(media, photo.variants['thumb_webp'])) as thumb:
+                self.assertEqual(thumb.size, (320, 160))
+            self.assertTrue(photo.get_image_url('medium').endswith('.medium.jpg'))
+            self.assertFalse(photo.is_processing())
+
+    def test_undecodable_image_shows_original(self):
+        profile = Profile.objects.create(username='a')
+        post = Post.objects.create(profile=profile, caption='broken')
+        upload = SimpleUploadedFile('broken.jpg', b'not an image', content_type='image/jpeg')
+
+        with tempfile.TemporaryDirectory() as media, self.settings(MEDIA_ROOT=media):
+            # created outside the post form, as the admin does: the save itself queues the job
+            photo = Photo.objects.create(post=post, image_file=upload)
+            self.assertTrue(photo.is_processing())
+            job = Job.objects.get()
+            self.assertEqual(job.kwargs, {'photo_id': photo.pk})
+
+            self.assertFalse(run(claim('test')))
+            photo.refresh_from_db()
+            self.assertEqual(photo.variants_status, Photo.VARIANTS_FAILED)
+            self.assertFalse(photo.is_processing())
+            self.assertEqual(photo.get_image_url('medium'), photo.image_file.url)
+
+            # saving without a new file doesn't queue another job
+            photo.save()
+            self.assertEqual(Job.objects.count(), 1)
+
+
+def flaky(fail_times):
+    ''' Job target for the queue tests: fail until it has been called fail_times times. '''
+
+    flaky.calls = getattr(flaky, 'calls', 0) + 1
+    if flaky.calls <= fail_times:
+        raise RuntimeError('try again')
+
+
+class JobQueueTests(TestCase):
+    ''' Claims are exclusive, expired leases are reclaimed, failures are retried. '''
+
+    def test_lease_and_retry(self):
+        flaky.calls = 0
+        job = enqueue(flaky, fail_times=1)
+
+        claimed = claim('a', visibility=datetime.timedelta(minutes=5))
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertIsNone(claim('b'))
+
+        # worker a died: once its lease runs out, b gets the job
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        claimed = claim('b')
+        self.assertEqual((claimed.worker, claimed.attempts), ('b', 2))
+
+        self.assertFalse(run(claimed))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertGreater(job.run_after, timezone.now())
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        self.assertTrue(run(claim('c')))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.DONE, 3))
+
+
+class StorageTests(TestCase):
+    ''' Identical uploads share one content-addressed file, deleted with its last reference. '''
+
+    def test_dedupe_and_release(self):
+        post = Post.objects.create(profile=Profile.objects.create(username='a'))
+        with tempfile.TemporaryDirectory() as media, self.settings(MEDIA_ROOT=media):
+            photos = [
+                Photo.objects.create(post=post, image_file=SimpleUploadedFile(name, b'same bytes'))
+                for name in ('one.png', 'two.PNG')
+            ]
+            name = photos[0].image_file.name
+            self.assertEqual(photos[1].image_file.name, name)
+            self.assertTrue(name.startswith('cas/'))
+            path = photos[0].image_file.path
+            # uploaded long enough ago that a racing upload can't be reusing it
+            os.utime(path, (0, 0))
+
+            with self.captureOnCommitCallbacks(execute=True):
+                photos[0].delete()
+            self.assertTrue(os.path.exists(path))
+            with self.captureOnCommitCallbacks(execute=True):
+                photos[1].delete()
+            self.assertFalse(os.path.exists(path))
+
+            # an upload that reused the file just now, with its row not yet
+            # committed, keeps it from being released
+            self.assertEqual(media_storage.save('three.png', ContentFile(b'same bytes')), name)
+            os.utime(path, (0, 0))
+            self.assertEqual(media_storage.save('four.png', ContentFile(b'same bytes')), name)
+            self.assertFalse(release(name))
+            self.assertTrue(os.path.exists(path))
+
+
+class FollowGraphTests(TestCase):
+    ''' Two-hop suggestions, mutuals and incremental refresh of the follow graph. '''
+
+    def test_graph(self):
+        me, a, b, c, d = [Profile.objects.create(username=name) for name in 'me a b c d'.split()]
+        for follower, followed in [(me, a), (me, b), (a, c), (b, c), (b, d), (a, me)]:
+            Follow.objects.create(follower_profile=follower, profile=followed)
+
+        graph = FollowGraph()
+        self.assertEqual(graph.suggestions(me.pk), [(c.pk, 2), (d.pk, 1)])
+        self.assertEqual(graph.mutuals(me.pk), {a.pk})
+        self.assertEqual(graph.followers_you_know(me.pk, [c.pk]), {c.pk: {a.pk, b.pk}})
+
+        # a new Follow lands in the delta of a new graph; the old one doesn't change
+        Follow.objects.create(follower_profile=me, profile=c)
+        refreshed = graph.refresh()
+        self.assertEqual(refreshed.suggestions(me.pk), [(d.pk, 1)])
+        self.assertEqual(refreshed.delta_size, 1)
+        self.assertEqual(graph.suggestions(me.pk), [(c.pk, 2), (d.pk, 1)])
+        self.assertIs(refreshed.refresh(), refreshed)
+
+        # an unfollow triggers a rebuild
+        Follow.objects.filter(follower_profile=b, profile=d).delete()
+        rebuilt = refreshed.refresh()
+        self.assertEqual(rebuilt.suggestions(me.pk), [])
+        self.assertEqual(rebuilt.delta_size, 0)
+        self.assertEqual(refreshed.suggestions(me.pk), [(d.pk, 1)])
+
+    def test_get_graph_swaps_in_refreshes(self):
+        me, a = Profile.objects.create(username='me'), Profile.objects.create(username='a')
+        self.addCleanup(setattr, graph_module, '_graph', None)
+        graph_module._graph = None
+        first = get_graph()
+        self.assertIs(get_graph(), first)
+
+        Follow.objects.create(follower_profile=me, profile=a)
+        with mock.patch.object(graph_module, 'REFRESH_INTERVAL', 0):
+            second = get_graph()
+        self.assertIsNot(second, first)
+        self.assertEqual(second.following(me.pk), {a.pk})
+        self.assertEqual(first.following(me.pk), set())
+
+
+class VersionedCacheTests(TestCase):
+    ''' Pages are served from the cache until something on them changes. '''
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_cache(self):
+        author, fan = Profile.objects.create(username='author'), Profile.objects.create(username='fan')
+        post = Post.objects.create(profile=author, caption='hello')
+        url = reverse('post', args=[post.pk])
+
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+        Like.objects.create(post=post, profile=fan)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, 'Liked by fan')
+
+        # a follow changes the author's profile page; a comment elsewhere changes nothing here
+        profile_url = reverse('profile', args=[author.pk])
+        self.client.get(profile_url)
+        Follow.objects.create(follower_profile=fan, profile=author)
+        self.assertEqual(self.client.get(profile_url)['X-Cache'], 'MISS')
+        other = Post.objects.create(profile=fan, caption='elsewhere')
+        Comment.objects.create(post=other, profile=author, text='hi')
+        self.assertEqual(self.client.get(profile_url)['X-Cache'], 'HIT')
+
+        self.assertEqual(self.client.get(reverse('cache_stats')).json(), {'hits': 2, 'misses': 4, 'ratio': 0.3333})
+
+    def test_names_of_likers_and_commenters(self):
+        author, reader = Profile.objects.create(username='author'), Profile.objects.create(username='reader')
+        fan = Profile.objects.create(username='fan', display_name='Fan')
+        Follow.objects.create(profile=author, follower_profile=reader)
+        post = Post.objects.create(profile=author, caption='hello')
+        Like.objects.create(post=post, profile=fan)
+        Comment.objects.create(post=post, profile=fan, text='nice')
+        urls = [reverse('post', args=[post.pk]), reverse('show_feed', args=[reader.pk])]
+        for url in urls:
+            self.assertContains(self.client.get(url), 'Liked by Fan')
+
+        # the post page and the feed card both show the new name
+        fan.display_name = 'Renamed'
+        fan.save()
+        for url in urls:
+            response = self.client.get(url)
+            self.assertContains(response, 'Liked by Renamed')
+            self.assertNotContains(response, 'Fan')
+
+    def test_stale_save_keeps_version(self):
+        author = Profile.objects.create(username='author')
+        post = Post.objects.create(profile=author, caption='hello')
+        stale = Post.objects.get(pk=post.pk)
+        Like.objects.create(post=post, profile=author)
+        after_like = Post.objects.get(pk=post.pk).version
+
+        # saving the copy loaded before the like moves the version on, never back
+        stale.caption = 'edited'
+        stale.save()
+        self.assertEqual(Post.objects.get(pk=post.pk).version, after_like + 1)
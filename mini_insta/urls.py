@@ -16,5 +16,12 @@ urlpatterns = [
     path('profile/<int:pk>/followers', ShowFollowersDetailView.as_view(), name='show_followers'),
     path('profile/<int:pk>/following', ShowFollowingDetailView.as_view(), name='show_following'),
     path('profile/<int:pk>/feed', PostFeedListView.as_view(), name='show_feed'),
+    path('profile/<int:pk>/suggestions', SuggestionsDetailView.as_view(), name='show_suggestions'),
+    # "load more" fragments: the next page of each list, without the page around it
+    path('profile/<int:pk>/posts/more', ProfileDetailView.as_view(fragment=True), name='profile_posts_more'),
+    path('profile/<int:pk>/followers/more', ShowFollowersDetailView.as_view(fragment=True), name='show_followers_more'),
+    path('profile/<int:pk>/following/more', ShowFollowingDetailView.as_view(fragment=True), name='show_following_more'),
+    path('profile/<int:pk>/feed/more', PostFeedListView.as_view(fragment=True), name='show_feed_more'),
     path('profile/<int:pk>/search', SearchView.as_view(), name='search'),
-]
\ No newline at end of file
+    path('cache/stats', CacheStatsView.as_view(), name='cache_stats'),
+]
@@ -2,13 +2,101 @@
 # Author: Evren Yaman (yamane@bu.edu), 9/26/2025
 # Description: Class-based views for listing all Profile records and showing a single Profile detail page.
 
+import hashlib
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, View
 from .models import *
 from .forms import CreatePostForm, UpdateProfileForm
 from django.urls import reverse
+from .pagination import paginate
+from .caching import CACHE_SECONDS, record, stats, version_key
+from .graph import get_graph
+from .search import search
 # Create your views here.
 
+# newest comments shown under each post in the feed
+FEED_COMMENTS = 3
+
+# profiles on the suggestions page, and names shown under each
+SUGGESTIONS = 12
+SUGGESTION_NAMES = 2
+
+class CursorPageMixin:
+    ''' Show one keyset page of get_page_queryset() (by default the view's
+    queryset), newest first, on a view whose URL has the Profile pk. The page after it is addressed by an opaque
+    ?after= cursor. With fragment=True only the rows and the next "load more"
+    link are rendered, for the script that appends them to the open page. '''
+
+    page_size = 20
+    cursor_key = 'timestamp'
+    fragment = False
+    fragment_template_name = None
+    more_url_name = None
+
+    def get_page_queryset(self):
+        ''' Return the rows to page through, ordered by (-cursor_key, -pk). '''
+        return self.get_queryset()
+
+    def get_page(self):
+        ''' Return the rows of the requested page and remember the next cursor. '''
+        rows, self.next_cursor = paginate(
+            self.get_page_queryset(), self.request.GET.get('after'), self.page_size, self.cursor_key,
+        )
+        return rows
+
+    def get_template_names(self):
+        if self.fragment:
+            return [self.fragment_template_name]
+        return super().get_template_names()
+
+    def get_context_data(self, **kwargs):
+        ''' Add the next cursor and the fragment URL used to load it. '''
+        context = super().get_context_data(**kwargs)
+        context['next_cursor'] = self.next_cursor
+        context['more_url'] = reverse(self.more_url_name, args=[self.kwargs['pk']])
+        return context
+
+class VersionedCacheMixin:
+    ''' Serve whole rendered pages from the cache, keyed by the versions of
+    the objects on the page (get_versions, by default just the object named
+    by the URL pk) and the full request path. A
+    change bumps a version, which changes the key, so nothing is deleted.
+    Responses carry X-Cache: HIT or MISS. '''
+
+    cache_name = None
+
+    def get_versions(self):
+        ''' Return [{'pk', 'version'}] for the objects the page shows, empty if missing. '''
+        return list(self.get_queryset().filter(pk=self.kwargs['pk']).values('pk', 'version'))
+
+    def get(self, request, *args, **kwargs):
+        versions = self.get_versions()
+        if not versions:
+            # let the normal view raise its 404
+            return super().get(request, *args, **kwargs)
+
+        path = hashlib.md5(request.get_full_path().encode('utf-8')).hexdigest()
+        key = f'{version_key(self.cache_name, *versions)}:{path}'
+        content = cache.get(key)
+        if content is not None:
+            record('hit')
+            response = HttpResponse(content)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        record('miss')
+        response = super().get(request, *args, **kwargs)
+        response.render()
+        if response.status_code == 200:
+            cache.set(key, response.content, CACHE_SECONDS)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
 class ProfileListView(ListView):
     ''' Display a list of all Profiles in the database '''
 
@@ -16,19 +104,38 @@ class ProfileListView(ListView):
     template_name = "mini_insta/show_all_profiles.html"
     context_object_name = "profiles"
 
-class ProfileDetailView(DetailView):
-    ''' Display a single Profile from the database '''
+class ProfileDetailView(VersionedCacheMixin, CursorPageMixin, DetailView):
+    ''' Display a single Profile from the database, with one page of its posts '''
     
     model = Profile
     template_name = "mini_insta/show_profile.html"
     context_object_name = "profile"
+    fragment_template_name = "mini_insta/_post_grid.html"
+    more_url_name = "profile_posts_more"
+
+    cache_name = "profile_page"
+
+    def get_page_queryset(self):
+        return self.object.get_all_posts().with_first_photo()
 
-class PostDetailView(DetailView):
+    def get_context_data(self, **kwargs):
+        kwargs['posts'] = self.get_page()
+        return super().get_context_data(**kwargs)
+
+class PostDetailView(VersionedCacheMixin, DetailView):
     ''' Display a single Post from the database '''
     
     model = Post
     template_name = "mini_insta/show_post.html"
     context_object_name = "post"
+    cache_name = "post_page"
+
+    def get_versions(self):
+        ''' The Post's version and its author's (name and avatar are on the page). '''
+        row = Post.objects.filter(pk=self.kwargs['pk']).values('pk', 'version', 'profile_id', 'profile__version').first()
+        if row is None:
+            return None
+        return [row, {'pk': row['profile_id'], 'version': row['profile__version']}]
 
 class CreatePostView(CreateView):
     ''' A view for creating a new Post associated with a given Profile. '''
@@ -45,7 +152,11 @@ class CreatePostView(CreateView):
         context['profile'] = profile
         return context
     
+    @transaction.atomic
     def form_valid(self, form):
+        # one transaction, so the Post, its Photos and the counter and feed
+        # rows the signal handlers write commit (or roll back) together
+
         # look up the Profile by pk from the URL
         profile = Profile.objects.get(pk=self.kwargs['pk'])
 
@@ -62,6 +173,7 @@ class CreatePostView(CreateView):
         uploaded_files = self.request.FILES.getlist('image_files')
         
         for file in uploaded_files:
+            # saving queues the resizing for a run_jobs worker (see signals.py)
             Photo.objects.create(post=self.object, image_file=file)
 
         return response
@@ -92,6 +204,11 @@ class DeletePostView(DeleteView):
         context['profile'] = post.profile
         return context
     
+    @transaction.atomic
+    def form_valid(self, form):
+        ''' Delete the Post together with the counter updates its cascade triggers. '''
+        return super().form_valid(form)
+
     def get_success_url(self):
         ''' Redirect to the Profile page of the Post you just deleted. '''
         return reverse('profile', args=[str(self.object.profile.pk)])
@@ -112,44 +229,108 @@ class UpdatePostView(UpdateView):
     def get_success_url(self):
         return reverse('post', args=[str(self.object.pk)])
     
-class ShowFollowersDetailView(DetailView):
-    ''' Detail view for a Profile that shows who follows this profile. '''
+class ShowFollowersDetailView(CursorPageMixin, DetailView):
+    ''' Detail view for a Profile that shows who follows this profile, newest follower first. '''
 
     model = Profile
     template_name = "mini_insta/show_followers.html"
     context_object_name = "profile"
+    fragment_template_name = "mini_insta/_profile_grid.html"
+    more_url_name = "show_followers_more"
+
+    def get_page_queryset(self):
+        return (
+            Follow.objects.filter(profile=self.object)
+            .select_related('follower_profile')
+            .order_by('-timestamp', '-pk')
+        )
+
+    def get_context_data(self, **kwargs):
+        kwargs['profiles'] = [f.follower_profile for f in self.get_page()]
+        return super().get_context_data(**kwargs)
 
 
-class ShowFollowingDetailView(DetailView):
-    ''' Detail view for a Profile that shows who this profile is following. '''
+class ShowFollowingDetailView(CursorPageMixin, DetailView):
+    ''' Detail view for a Profile that shows who this profile is following, most recent first. '''
 
     model = Profile
     template_name = "mini_insta/show_following.html"
     context_object_name = "profile"
+    fragment_template_name = "mini_insta/_profile_grid.html"
+    more_url_name = "show_following_more"
+
+    def get_page_queryset(self):
+        return (
+            Follow.objects.filter(follower_profile=self.object)
+            .select_related('profile')
+            .order_by('-timestamp', '-pk')
+        )
+
+    def get_context_data(self, **kwargs):
+        kwargs['profiles'] = [f.profile for f in self.get_page()]
+        return super().get_context_data(**kwargs)
+
+class SuggestionsDetailView(DetailView):
+    ''' Profiles this Profile might want to follow: followed by the most of
+    the Profiles it already follows. Answered from the in-memory follow graph. '''
+
+    model = Profile
+    template_name = "mini_insta/show_suggestions.html"
+    context_object_name = "profile"
+
+    def get_context_data(self, **kwargs):
+        ''' Add [{'profile', 'score', 'known', 'others'}] as "suggestions", where
+        known names a few of the followed Profiles that follow the suggestion
+        and others counts the rest. '''
 
-class PostFeedListView(ListView):
-    ''' Feed of Posts from Profiles that this Profile follows. '''
+        context = super().get_context_data(**kwargs)
+        graph = get_graph()
+        ranked = graph.suggestions(self.object.pk, limit=SUGGESTIONS)
+        known = graph.followers_you_know(self.object.pk, [pk for pk, score in ranked])
+
+        shown = {pk: sorted(known[pk])[:SUGGESTION_NAMES] for pk, score in ranked}
+        profiles = Profile.objects.in_bulk(
+            [pk for pk, score in ranked] + [pk for names in shown.values() for pk in names]
+        )
+        context['suggestions'] = [
+            {
+                'profile': profiles[pk],
+                'score': score,
+                'known': [profiles[k] for k in shown[pk] if k in profiles],
+                'others': score - len(shown[pk]),
+            }
+            # the graph may be a few seconds behind a deleted Profile
+            for pk, score in ranked if pk in profiles
+        ]
+        context['mutuals'] = len(graph.mutuals(self.object.pk))
+        return context
+
+
+class PostFeedListView(CursorPageMixin, ListView):
+    ''' Feed of Posts from Profiles that this Profile follows, one page at a time. '''
 
     model = Post
     template_name = "mini_insta/show_feed.html"
     context_object_name = "posts"
+    cursor_key = "feed_timestamp"
+    fragment_template_name = "mini_insta/_feed_posts.html"
+    more_url_name = "show_feed_more"
 
     def get_queryset(self):
-        ''' Return Posts authored by Profiles that this Profile follows, newest first. '''
+        ''' Return one page of Posts authored by Profiles that this Profile follows, newest first. '''
 
         pk = self.kwargs['pk']
         try:
             self.profile = Profile.objects.get(pk=pk)
         except Profile.DoesNotExist:
-            # If profile not found, return an empty queryset
+            # If profile not found, return an empty page
             self.profile = None
-            return Post.objects.none()
-        return (
-            self.profile
-            .get_post_feed()
-            .select_related('profile')
-            .order_by('-timestamp')
-        )
+            self.next_cursor = None
+            return []
+        return self.get_page()
+
+    def get_page_queryset(self):
+        return self.profile.get_post_feed().with_feed_data(comments=FEED_COMMENTS)
 
     def get_context_data(self, **kwargs):
         ''' Provide the Profile object to the template as "profile". '''
@@ -181,32 +362,39 @@ class SearchView(ListView):
         return super().dispatch(request, *args, **kwargs)
 
     def get_queryset(self):
-        ''' Return Posts whose caption contains the query, newest first. '''
+        ''' Return Posts whose caption matches the query, best match first. '''
 
+        self.profile_hits = []
         if not getattr(self, "query", ""):
-            return Post.objects.none()
-        return (
+            return []
+        self.profile_hits, post_hits = search(self.query)
+        posts = (
             Post.objects
-            .filter(caption__icontains=self.query)
+            .filter(pk__in=[pk for pk, score in post_hits])
             .select_related("profile")
-            .order_by("-timestamp")
+            .with_first_photo()
+            .with_first_like()
+            .in_bulk()
         )
+        # keep the FTS ranking; a hit may have been deleted since it was indexed
+        return [posts[pk] for pk, score in post_hits if pk in posts]
 
     def get_context_data(self, **kwargs):
         ''' Add the searching profile, query, matching profiles, and posts to context. '''
 
         context = super().get_context_data(**kwargs)
 
-        if self.query:
-            profiles_username = Profile.objects.filter(username__icontains=self.query)
-            profiles_display  = Profile.objects.filter(display_name__icontains=self.query)
-            profiles_bio      = Profile.objects.filter(bio_text__icontains=self.query)
-            matching_profiles = (profiles_username | profiles_display | profiles_bio).distinct().order_by("display_name", "username")
-        else:
-            matching_profiles = Profile.objects.none()
+        profiles = Profile.objects.in_bulk([pk for pk, score in self.profile_hits])
+        matching_profiles = [profiles[pk] for pk, score in self.profile_hits if pk in profiles]
 
         context['profile']  = self.profile
         context['query']    = self.query
         context['profiles'] = matching_profiles
-        context['posts']    = self.get_queryset()
         return context
+
+
+class CacheStatsView(View):
+    ''' Report the page and fragment cache hit/miss counts as JSON. '''
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(stats())
@@ -0,0 +1,155 @@
+# file: project/aggregates.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Incremental maintenance and full rebuild of the PlayerAggregate table from PlayerMatchStats.
+
+from django.apps import apps
+from django.db import models
+from django.db.models.functions import Coalesce, Greatest, Least, TruncMonth
+from django.utils import timezone
+
+# stats every row has: summed, with min and max
+TOTALS = ["kills", "deaths", "assists"]
+
+# optional stats: summed and counted where present, with min, max and mean
+MEANS = ["acs", "rating"]
+
+
+def _model(name):
+    return apps.get_model("project", name)
+
+
+def period_of(match_date):
+    ''' Return the monthly period ("2025-12") a match played at match_date counts towards. '''
+
+    return timezone.localtime(match_date).strftime("%Y-%m")
+
+
+def keys(player_id, game_id, map_name, match_date):
+    ''' Return the (player, game, map_name, period) keys of the four aggregate
+    rows a stats row counts towards: its map and all maps, all time and its month. '''
+
+    PlayerAggregate = _model("PlayerAggregate")
+    return [
+        (player_id, game_id, m, period)
+        for m in (map_name, PlayerAggregate.ALL_MAPS)
+        for period in (PlayerAggregate.ALL_TIME, period_of(match_date))
+    ]
+
+
+def keys_of(stats):
+    ''' Return the aggregate keys of a PlayerMatchStats instance. '''
+
+    game_id, match_date = _model("Match").objects.values_list("game_id", "match_date").get(pk=stats.match_id)
+    return keys(stats.player_id, game_id, stats.map_name, match_date)
+
+
+def summary():
+    ''' Return the aggregate expressions computing every PlayerAggregate field
+    (except the means) over a PlayerMatchStats queryset. '''
+
+    fields = {"games": models.Count("pk")}
+    for stat in TOTALS:
+        fields[f"{stat}_sum"] = models.Sum(stat)
+        fields[f"{stat}_min"] = models.Min(stat)
+        fields[f"{stat}_max"] = models.Max(stat)
+    for stat in MEANS:
+        fields[f"{stat}_count"] = models.Count(stat)
+        fields[f"{stat}_sum"] = Coalesce(models.Sum(stat), 0.0)
+        fields[f"{stat}_min"] = models.Min(stat)
+        fields[f"{stat}_max"] = models.Max(stat)
+    return fields
+
+
+def with_means(values):
+    ''' Fill in avg_acs and avg_rating from the sums and counts in values. '''
+
+    for stat in MEANS:
+        count = values[f"{stat}_count"]
+        values[f"avg_{stat}"] = values[f"{stat}_sum"] / count if count else None
+    return values
+
+
+def add(stats):
+    ''' Count a new PlayerMatchStats row into its aggregates: one UPDATE per
+    aggregate row, each field computed from its current value, so no reads
+    and no lost updates under concurrent inserts. '''
+
+    PlayerAggregate = _model("PlayerAggregate")
+    targets = keys_of(stats)
+    PlayerAggregate.objects.bulk_create(
+        [PlayerAggregate(player_id=p, game_id=g, map_name=m, period=t) for p, g, m, t in targets],
+        ignore_conflicts=True,
+    )
+
+    changes = {"games": models.F("games") + 1}
+    for stat in TOTALS:
+        value = models.Value(getattr(stats, stat))
+        changes[f"{stat}_sum"] = models.F(f"{stat}_sum") + value
+        changes[f"{stat}_min"] = Least(Coalesce(f"{stat}_min", value), value)
+        changes[f"{stat}_max"] = Greatest(Coalesce(f"{stat}_max", value), value)
+    for stat in MEANS:
+        if getattr(stats, stat) is None:
+            continue
+        value = models.Value(float(getattr(stats, stat)))
+        changes[f"{stat}_count"] = models.F(f"{stat}_count") + 1
+        changes[f"{stat}_sum"] = models.F(f"{stat}_sum") + value
+        changes[f"{stat}_min"] = Least(Coalesce(f"{stat}_min", value), value)
+        changes[f"{stat}_max"] = Greatest(Coalesce(f"{stat}_max", value), value)
+        # the right-hand sides all see the row before this UPDATE
+        changes[f"avg_{stat}"] = (models.F(f"{stat}_sum") + value) / (models.F(f"{stat}_count") + 1)
+
+    for player_id, game_id, map_name, period in targets:
+        PlayerAggregate.objects.filter(
+            player_id=player_id, game_id=game_id, map_name=map_name, period=period,
+        ).update(**changes)
+
+
+def refresh(targets):
+    ''' Recompute the aggregate rows at targets from the player's stats rows,
+    deleting those with nothing left to count. Used when a row changes or
+    goes away: a removed value might have been the min or max, which can't
+    be undone incrementally. Reads only that player's rows. '''
+
+    PlayerAggregate = _model("PlayerAggregate")
+    for player_id, game_id, map_name, period in targets:
+        rows = _model("PlayerMatchStats").objects.filter(player_id=player_id, match__game_id=game_id)
+        if map_name != PlayerAggregate.ALL_MAPS:
+            rows = rows.filter(map_name=map_name)
+        if period != PlayerAggregate.ALL_TIME:
+            year, month = period.split("-")
+            rows = rows.filter(match__match_date__year=int(year), match__match_date__month=int(month))
+        values = rows.aggregate(**summary())
+        lookup = {"player_id": player_id, "game_id": game_id, "map_name": map_name, "period": period}
+        if values["games"]:
+            PlayerAggregate.objects.update_or_create(defaults=with_means(values), **lookup)
+        else:
+            PlayerAggregate.objects.filter(**lookup).delete()
+
+
+def rebuild(players=None):
+    ''' Replace the aggregate rows of players (pks; all players if None) with
+    ones computed from scratch by four GROUP BY queries (per map or not, per
+    month or not). Returns the number of rows written. Use after writes that
+    skip signals, like bulk_create. '''
+
+    PlayerAggregate = _model("PlayerAggregate")
+    rows = _model("PlayerMatchStats").objects.order_by().annotate(month=TruncMonth("match__match_date"))
+    existing = PlayerAggregate.objects.all()
+    if players is not None:
+        rows = rows.filter(player__in=players)
+        existing = existing.filter(player__in=players)
+
+    aggregates = []
+    for group in (("map_name",), (), ("map_name", "month"), ("month",)):
+        for values in rows.values("player", "match__game", *group).annotate(**summary()):
+            month = values.pop("month", None)
+            aggregates.append(PlayerAggregate(
+                player_id=values.pop("player"),
+                game_id=values.pop("match__game"),
+                map_name=values.pop("map_name", PlayerAggregate.ALL_MAPS),
+                period=month.strftime("%Y-%m") if month else PlayerAggregate.ALL_TIME,
+                **with_means(values),
+            ))
+    existing.delete()
+    PlayerAggregate.objects.bulk_create(aggregates, batch_size=500)
+    return len(aggregates)
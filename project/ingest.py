@@ -0,0 +1,220 @@
+# file: project/ingest.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Bulk, idempotent import of Match and PlayerMatchStats rows from JSON or CSV dumps.
+
+import csv
+import json
+import os
+import time
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import aggregates
+from .models import GameTitle, Match, PlayerMatchStats, ProPlayer
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Match fields an import may set besides its natural key; re-importing overwrites them
+MATCH_FIELDS = ["best_of", "status", "team_one_score", "team_two_score"]
+
+# PlayerMatchStats fields an import sets; re-importing overwrites them
+STATS_FIELDS = ["kills", "deaths", "assists", "acs", "rating"]
+
+# keys of a match object (the first five identify it, as Match.NATURAL_KEY with the game by name)
+MATCH_COLUMNS = ["game", "tournament_name", "match_date", "team_one_name", "team_two_name", *MATCH_FIELDS]
+
+# keys of a stat line; the player is given by IGN
+STATS_COLUMNS = ["player", "map_name", *STATS_FIELDS]
+
+# CSV header: one stat line per row, with its match repeated on every row
+CSV_COLUMNS = MATCH_COLUMNS + STATS_COLUMNS
+
+
+class RowError(ValueError):
+    ''' A match or stat line that can't be imported. '''
+
+
+def read_json(f):
+    ''' Return the matches in a JSON dump: a list (or {"matches": [...]}) of
+    match objects with MATCH_COLUMNS keys, each with a "player_stats" list
+    of objects with STATS_COLUMNS keys. '''
+
+    data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("matches", [])
+    if not isinstance(data, list):
+        raise RowError("expected a list of matches")
+    return data
+
+
+def read_csv(f):
+    ''' Return the matches in a CSV dump (header CSV_COLUMNS), grouping
+    consecutive or scattered rows of the same match together. '''
+
+    matches = {}
+    for row in csv.DictReader(f):
+        key = tuple(row.get(column) for column in MATCH_COLUMNS[:5])
+        if key not in matches:
+            matches[key] = {column: row.get(column) for column in MATCH_COLUMNS}
+            matches[key]["player_stats"] = []
+        # a row without a player just records the match
+        if row.get("player"):
+            matches[key]["player_stats"].append({column: row.get(column) for column in STATS_COLUMNS})
+    return list(matches.values())
+
+
+def read_file(path):
+    ''' Return the matches in the .json or .csv file at path. '''
+
+    with open(path, newline="", encoding="utf-8") as f:
+        if os.path.splitext(path)[1].lower() == ".json":
+            return read_json(f)
+        return read_csv(f)
+
+
+def _number(value, kind, required=True):
+    if value in (None, ""):
+        if required:
+            raise RowError("missing number")
+        return None
+    return kind(value)
+
+
+class Importer:
+    ''' Upsert matches and their stat lines. GameTitles and ProPlayers are
+    resolved through dictionaries loaded once, matches are matched on
+    Match.NATURAL_KEY, and both tables are written with
+    INSERT ... ON CONFLICT DO UPDATE in batches, so importing the same dump
+    twice leaves the database as it was after the first time. '''
+
+    def __init__(self, create_missing=False, batch_size=DEFAULT_BATCH_SIZE):
+        self.create_missing = create_missing
+        self.batch_size = batch_size
+        self.games = {name.lower(): pk for pk, name in GameTitle.objects.values_list("pk", "name")}
+        self.players = {
+            (game_id, ign.lower()): pk
+            for pk, game_id, ign in ProPlayer.objects.values_list("pk", "game_id", "ign")
+        }
+        self.errors = []
+        self.counts = {"matches": 0, "stats": 0, "rejected": 0, "games created": 0, "players created": 0}
+
+    def reject(self, where, error):
+        self.errors.append(f"{where}: {error}")
+        self.counts["rejected"] += 1
+
+    def game_id(self, name):
+        ''' Return the pk of the GameTitle called name (any case). '''
+
+        name = (name or "").strip()
+        if not name:
+            raise RowError("missing game")
+        if name.lower() not in self.games:
+            if not self.create_missing:
+                raise RowError(f"unknown game {name!r}")
+            self.games[name.lower()] = GameTitle.objects.create(name=name).pk
+            self.counts["games created"] += 1
+        return self.games[name.lower()]
+
+    def player_id(self, game_id, ign):
+        ''' Return the pk of the game's ProPlayer with this IGN (any case). '''
+
+        ign = (ign or "").strip()
+        if not ign:
+            raise RowError("missing player")
+        if (game_id, ign.lower()) not in self.players:
+            if not self.create_missing:
+                raise RowError(f"unknown player {ign!r}")
+            self.players[game_id, ign.lower()] = ProPlayer.objects.create(ign=ign, game_id=game_id).pk
+            self.counts["players created"] += 1
+        return self.players[game_id, ign.lower()]
+
+    def parse_match(self, data):
+        ''' Return an unsaved Match from one match object. '''
+
+        match_date = parse_datetime(str(data.get("match_date") or ""))
+        if match_date is None:
+            raise RowError(f"bad match_date {data.get('match_date')!r}")
+        if timezone.is_naive(match_date):
+            match_date = timezone.make_aware(match_date)
+        status = data.get("status") or Match.STATUS_FINISHED
+        if status not in dict(Match.STATUS_CHOICES):
+            raise RowError(f"bad status {status!r}")
+        return Match(
+            game_id=self.game_id(data.get("game")),
+            tournament_name=(data.get("tournament_name") or "").strip(),
+            match_date=match_date,
+            team_one_name=(data.get("team_one_name") or "").strip(),
+            team_two_name=(data.get("team_two_name") or "").strip(),
+            best_of=_number(data.get("best_of"), int, required=False) or 3,
+            status=status,
+            team_one_score=_number(data.get("team_one_score"), int, required=False) or 0,
+            team_two_score=_number(data.get("team_two_score"), int, required=False) or 0,
+        )
+
+    def parse_stats(self, match, data):
+        ''' Return an unsaved PlayerMatchStats for match from one stat line. '''
+
+        return PlayerMatchStats(
+            player_id=self.player_id(match.game_id, data.get("player")),
+            match=match,
+            map_name=(data.get("map_name") or "").strip(),
+            kills=_number(data.get("kills"), int),
+            deaths=_number(data.get("deaths"), int),
+            assists=_number(data.get("assists"), int),
+            acs=_number(data.get("acs"), float, required=False),
+            rating=_number(data.get("rating"), float, required=False),
+        )
+
+    def load(self, matches):
+        ''' Import a list of match objects in one transaction and return the counts. '''
+
+        started = time.monotonic()
+        with transaction.atomic():
+            parsed = []
+            for n, data in enumerate(matches, start=1):
+                try:
+                    parsed.append((self.parse_match(data), data.get("player_stats") or []))
+                except (RowError, ValueError, TypeError, AttributeError) as e:
+                    self.reject(f"match {n}", e)
+
+            # one upsert per batch, then one read to learn every match's pk
+            Match.objects.bulk_create(
+                [match for match, _ in parsed], batch_size=self.batch_size,
+                update_conflicts=True, unique_fields=Match.NATURAL_KEY, update_fields=MATCH_FIELDS,
+            )
+            natural_key = [f"{field}_id" if field == "game" else field for field in Match.NATURAL_KEY]
+            saved = {
+                tuple(row[:-1]): row[-1]
+                for row in Match.objects.filter(
+                    game_id__in={m.game_id for m, _ in parsed},
+                    tournament_name__in={m.tournament_name for m, _ in parsed},
+                ).values_list(*natural_key, "pk")
+            }
+            for match, _ in parsed:
+                match.pk = saved[tuple(getattr(match, field) for field in natural_key)]
+            self.counts["matches"] = len(parsed)
+
+            stats = {}
+            for match, lines in parsed:
+                for n, data in enumerate(lines, start=1):
+                    try:
+                        row = self.parse_stats(match, data)
+                    except (RowError, ValueError, TypeError, AttributeError) as e:
+                        self.reject(f"{match}, stat line {n}", e)
+                        continue
+                    # a dump that repeats a line keeps the last copy, as a re-import would
+                    stats[row.player_id, match.pk, row.map_name] = row
+
+            PlayerMatchStats.objects.bulk_create(
+                stats.values(), batch_size=self.batch_size,
+                update_conflicts=True, unique_fields=["player", "match", "map_name"], update_fields=STATS_FIELDS,
+            )
+            self.counts["stats"] = len(stats)
+
+            # bulk_create sends no signals: recompute the touched players' aggregates
+            aggregates.rebuild({player_id for player_id, _, _ in stats})
+
+        self.counts["seconds"] = time.monotonic() - started
+        return self.counts
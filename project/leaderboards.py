@@ -0,0 +1,186 @@
+# file: project/leaderboards.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Player leaderboards by game, region, map and time window, read from the PlayerAggregate table.
+
+import base64
+import bisect
+import json
+
+from django.core.cache import cache
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import PlayerAggregate, ProPlayer
+
+# metric name -> (PlayerAggregate mean field, its sum field, its count field)
+METRICS = {
+    "rating": ("avg_rating", "rating_sum", "rating_count"),
+    "acs": ("avg_acs", "acs_sum", "acs_count"),
+}
+
+# window name -> number of calendar months it covers, counting the current one (None: all time)
+WINDOWS = {
+    "all": None,
+    "month": 1,
+    "quarter": 3,
+    "year": 12,
+}
+
+# players need this many maps in the window to be ranked
+MIN_GAMES = 5
+
+# windowed boards are summed from monthly rows; keep each result this long
+WINDOW_CACHE_SECONDS = 60
+
+
+def encode_cursor(score, player_id):
+    ''' Return an opaque cursor pointing just past the entry (score, player_id). '''
+
+    raw = json.dumps([score, player_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor):
+    ''' Return (score, player_id) from a cursor, or None if it is invalid. '''
+
+    try:
+        score, player_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return float(score), int(player_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def recent_periods(months, now=None):
+    ''' Return the PlayerAggregate periods of the last months calendar months, current first. '''
+
+    now = timezone.localtime(now)
+    year, month = now.year, now.month
+    periods = []
+    for _ in range(months):
+        periods.append(f"{year:04d}-{month:02d}")
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return periods
+
+
+class Leaderboard:
+    ''' Players of one game ranked by a metric, best first, ties broken by
+    player pk so the order (and every page boundary) is stable.
+
+    The all-time board is a range scan of the all-time PlayerAggregate rows
+    in index order. A windowed board adds up at most a year of monthly rows
+    per player, sorts them once and caches the result for
+    WINDOW_CACHE_SECONDS. Either way the aggregates underneath are updated
+    as each stats row is written. '''
+
+    def __init__(self, game_id, region=None, map_name=PlayerAggregate.ALL_MAPS,
+                 window="all", metric="rating", min_games=MIN_GAMES):
+        if window not in WINDOWS:
+            raise ValueError(f"unknown window {window!r}")
+        if metric not in METRICS:
+            raise ValueError(f"unknown metric {metric!r}")
+        self.game_id = game_id
+        self.region = region or None
+        self.map_name = map_name
+        self.window = window
+        self.metric = metric
+        self.min_games = min_games
+
+    def rows(self):
+        ''' Return the PlayerAggregate rows this board reads, before any period filter. '''
+
+        rows = PlayerAggregate.objects.filter(game_id=self.game_id, map_name=self.map_name)
+        if self.region:
+            rows = rows.filter(player__region__iexact=self.region)
+        return rows
+
+    def all_time(self):
+        ''' Return the all-time board as a queryset of {'player_id', 'games', 'score'} in rank order. '''
+
+        field = METRICS[self.metric][0]
+        return (
+            self.rows()
+            .filter(period=PlayerAggregate.ALL_TIME, games__gte=self.min_games, **{f"{field}__isnull": False})
+            .order_by(f"-{field}", "player_id")
+            .values("player_id", "games", score=models.F(field))
+        )
+
+    def windowed(self):
+        ''' Return the board for a time window as a list of {'player_id', 'games', 'score'} in rank order. '''
+
+        key = (
+            f"project:leaderboard:{self.game_id}:{self.region}:{self.map_name}:"
+            f"{self.window}:{self.metric}:{self.min_games}"
+        )
+        entries = cache.get(key)
+        if entries is None:
+            _, total, count = METRICS[self.metric]
+            totals = (
+                self.rows()
+                .filter(period__in=recent_periods(WINDOWS[self.window]))
+                .values("player_id")
+                .annotate(games=models.Sum("games"), total=models.Sum(total), count=models.Sum(count))
+                .filter(games__gte=self.min_games, count__gt=0)
+            )
+            entries = sorted(
+                (
+                    {"player_id": t["player_id"], "games": t["games"], "score": t["total"] / t["count"]}
+                    for t in totals
+                ),
+                key=lambda e: (-e["score"], e["player_id"]),
+            )
+            cache.set(key, entries, WINDOW_CACHE_SECONDS)
+        return entries
+
+    def page(self, cursor=None, size=25):
+        ''' Return (entries, next_cursor) for the page after cursor. Each entry
+        gets its 1-based rank and ProPlayer; next_cursor is None on the last page. '''
+
+        position = decode_cursor(cursor or "")
+        if WINDOWS[self.window] is None:
+            board = self.all_time()
+            field = METRICS[self.metric][0]
+            ahead = 0
+            if position:
+                score, player_id = position
+                after = Q(**{f"{field}__lt": score}) | Q(**{field: score, "player_id__gt": player_id})
+                ahead = board.exclude(after).count()
+                board = board.filter(after)
+            entries = list(board[:size + 1])
+        else:
+            board = self.windowed()
+            ahead = 0
+            if position:
+                score, player_id = position
+                ahead = bisect.bisect_right(board, (-score, player_id), key=lambda e: (-e["score"], e["player_id"]))
+            entries = [dict(e) for e in board[ahead:ahead + size + 1]]
+
+        next_cursor = None
+        if len(entries) > size:
+            entries = entries[:size]
+            next_cursor = encode_cursor(entries[-1]["score"], entries[-1]["player_id"])
+
+        players = ProPlayer.objects.in_bulk([e["player_id"] for e in entries])
+        for rank, entry in enumerate(entries, start=ahead + 1):
+            entry["rank"] = rank
+            entry["player"] = players.get(entry["player_id"])
+        return entries, next_cursor
+
+    def rank(self, player_id):
+        ''' Return player_id's entry with its rank, or None if the player isn't on the board. '''
+
+        if WINDOWS[self.window] is None:
+            field = METRICS[self.metric][0]
+            entry = self.all_time().filter(player_id=player_id).first()
+            if entry is None:
+                return None
+            score = entry["score"]
+            ahead = self.all_time().filter(
+                Q(**{f"{field}__gt": score}) | Q(**{field: score, "player_id__lt": player_id})
+            ).count()
+            return {**entry, "rank": ahead + 1}
+
+        for rank, entry in enumerate(self.windowed(), start=1):
+            if entry["player_id"] == player_id:
+                return {**entry, "rank": rank}
+        return None
@@ -0,0 +1,196 @@
+# file: project/live.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: In-process broadcaster that polls live Match scores once and fans the changes out to server-sent-event viewers.
+
+import asyncio
+import json
+import logging
+import time
+import weakref
+
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Q
+
+from .models import Match
+
+logger = logging.getLogger(__name__)
+
+# seconds between polls of the Match table while anyone is watching
+POLL_INTERVAL = 2.0
+
+# seconds of silence before a viewer is sent a keep-alive comment
+KEEPALIVE_INTERVAL = 15.0
+
+# undelivered updates buffered per viewer; a slow viewer loses its oldest ones
+QUEUE_SIZE = 100
+
+# the Match fields pushed to viewers
+FIELDS = ["status", "team_one_score", "team_two_score"]
+
+# seconds a stream served under WSGI stays open before the browser reconnects
+WSGI_STREAM_SECONDS = 25.0
+
+
+def sse(event, data):
+    ''' Return one server-sent event as text. '''
+
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def served_over_asgi(request):
+    ''' True if request came through an ASGI server, where an open stream costs no thread. '''
+
+    return isinstance(request, ASGIRequest)
+
+
+def watched(state):
+    ''' Return the rows to poll: the live matches, and the ones in state
+    (live at the last poll), to catch them finishing. '''
+
+    return Match.objects.filter(Q(status=Match.STATUS_LIVE) | Q(pk__in=list(state))).values("pk", *FIELDS)
+
+
+def changes(state, rows):
+    ''' Compare polled rows with state (pk -> {field: value}) and return the
+    new state and the list of {'id', changed fields...} updates. A match that
+    just finished is reported once, then no longer watched. '''
+
+    new_state = {}
+    updates = []
+    for row in rows:
+        pk = row.pop("pk")
+        previous = state.get(pk, {})
+        changed = {field: value for field, value in row.items() if previous.get(field) != value}
+        if changed:
+            updates.append({"id": pk, **changed})
+        if row["status"] == Match.STATUS_LIVE:
+            new_state[pk] = row
+    return new_state, updates
+
+
+class Subscription:
+    ''' One viewer: a queue of updates for the matches it watches (None: all). '''
+
+    def __init__(self, matches=None):
+        self.matches = set(matches) if matches else None
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def wants(self, match_id):
+        return self.matches is None or match_id in self.matches
+
+    def put(self, update):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(update)
+
+
+class Broadcaster:
+    ''' Watches the live matches for every viewer in this process. While at
+    least one viewer is subscribed, a single task reads the live matches
+    (and the ones that were live at the last poll, to catch them finishing)
+    every POLL_INTERVAL seconds, and queues {'id', changed fields...} to the
+    viewers of each match that changed. Viewers cost a queue, not a query. '''
+
+    def __init__(self):
+        self.subscribers = set()
+        # pk -> {field: value} for matches live at the last poll
+        self.state = {}
+        self.task = None
+
+    def subscribe(self, matches=None):
+        ''' Register a viewer and return its Subscription, starting the poller if needed. '''
+
+        subscription = Subscription(matches)
+        self.subscribers.add(subscription)
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscribers.discard(subscription)
+
+    def snapshot(self, subscription):
+        ''' Return the current state of the live matches subscription watches. '''
+
+        return [{"id": pk, **row} for pk, row in self.state.items() if subscription.wants(pk)]
+
+    def publish(self, update):
+        for subscription in self.subscribers:
+            if subscription.wants(update["id"]):
+                subscription.put(update)
+
+    async def poll(self):
+        ''' Read the watched matches once and publish what changed since the last poll. '''
+
+        rows = [row async for row in watched(self.state)]
+        self.state, updates = changes(self.state, rows)
+        for update in updates:
+            self.publish(update)
+
+    async def run(self):
+        ''' Poll until the last viewer leaves. '''
+
+        while self.subscribers:
+            try:
+                await self.poll()
+            except Exception:
+                logger.exception("live match poll failed")
+            await asyncio.sleep(POLL_INTERVAL)
+        self.state = {}
+
+
+# one Broadcaster per event loop (an ASGI server runs one loop per process)
+_broadcasters = weakref.WeakKeyDictionary()
+
+
+def get_broadcaster():
+    ''' Return the Broadcaster for the running event loop. '''
+
+    loop = asyncio.get_running_loop()
+    if loop not in _broadcasters:
+        _broadcasters[loop] = Broadcaster()
+    return _broadcasters[loop]
+
+
+async def stream(matches=None):
+    ''' Yield server-sent events for a viewer of matches (pks; None for every
+    live match): the current scores, then each change as it is polled. '''
+
+    broadcaster = get_broadcaster()
+    subscription = broadcaster.subscribe(matches)
+    try:
+        yield f"retry: {int(POLL_INTERVAL * 1000)}\n\n"
+        for update in broadcaster.snapshot(subscription):
+            yield sse("score", update)
+        while True:
+            try:
+                update = await asyncio.wait_for(subscription.queue.get(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield sse("score", update)
+    finally:
+        # the viewer went away (the server cancels the response)
+        broadcaster.unsubscribe(subscription)
+
+
+def sync_stream(matches=None, duration=WSGI_STREAM_SECONDS):
+    ''' Yield server-sent events like stream(), for a WSGI server. There every
+    open response holds a worker thread and no event loop outlives the
+    request, so this generator polls the matches itself and ends after
+    duration seconds; EventSource reconnects after the retry delay and is
+    sent the current scores again. '''
+
+    deadline = time.monotonic() + duration
+    state = {}
+    yield f"retry: {int(POLL_INTERVAL * 1000)}\n\n"
+    while True:
+        rows = watched(state)
+        if matches:
+            rows = rows.filter(pk__in=matches)
+        state, updates = changes(state, rows)
+        for update in updates:
+            yield sse("score", update)
+        if time.monotonic() + POLL_INTERVAL > deadline:
+            return
+        time.sleep(POLL_INTERVAL)
@@ -0,0 +1,47 @@
+# file: project/management/commands/import_matches.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Management command that upserts matches and player stats from JSON or CSV dumps.
+
+from django.core.management.base import BaseCommand, CommandError
+
+from project.ingest import CSV_COLUMNS, DEFAULT_BATCH_SIZE, Importer, RowError, read_file
+
+
+class Command(BaseCommand):
+    ''' Import match dumps (.json, or .csv with the CSV_COLUMNS header). Matches
+    are identified by game, tournament, date and teams, stat lines by player,
+    match and map, so re-running an import updates rows instead of duplicating them. '''
+
+    help = 'Upsert Match and PlayerMatchStats rows from JSON or CSV files. CSV columns: ' + ', '.join(CSV_COLUMNS)
+
+    # rejected lines listed before the rest are summarised
+    SHOW_ERRORS = 20
+
+    def add_arguments(self, parser):
+        parser.add_argument('filenames', nargs='+', help='path(s) to .json or .csv match dumps')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help=f'rows per INSERT statement (default {DEFAULT_BATCH_SIZE})')
+        parser.add_argument('--create-missing', action='store_true',
+                            help='create GameTitles and ProPlayers the dumps mention but the database lacks '
+                                 '(by default their lines are rejected)')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        try:
+            matches = [match for filename in options['filenames'] for match in read_file(filename)]
+        except (OSError, ValueError, RowError) as e:
+            raise CommandError(f'could not read input: {e}')
+
+        importer = Importer(create_missing=options['create_missing'], batch_size=options['batch_size'])
+        result = importer.load(matches)
+
+        for error in importer.errors[:self.SHOW_ERRORS]:
+            self.stderr.write(f'rejected {error}')
+        if len(importer.errors) > self.SHOW_ERRORS:
+            self.stderr.write(f'... and {len(importer.errors) - self.SHOW_ERRORS} more')
+
+        seconds = result.pop('seconds')
+        summary = ', '.join(f'{key} {value}' for key, value in result.items())
+        self.stdout.write(self.style.SUCCESS(f'Done in {seconds:.1f}s: {summary}'))
@@ -0,0 +1,24 @@
+# file: project/management/commands/rebuild_player_aggregates.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Management command that recomputes the PlayerAggregate table from PlayerMatchStats.
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from project.aggregates import rebuild
+
+
+class Command(BaseCommand):
+    ''' Recompute career and per-map aggregates from scratch. The signal
+    handlers keep them current; run this after loaddata, raw SQL edits or
+    bulk writes that skip signals. '''
+
+    help = 'Rebuild the PlayerAggregate table from PlayerMatchStats rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('players', nargs='*', type=int, help='ProPlayer pks to rebuild (default: all)')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            written = rebuild(options['players'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} player aggregates'))
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_aggregates(apps, schema_editor):
+    ''' Aggregate the existing PlayerMatchStats (same as rebuild_player_aggregates). '''
+
+    PlayerAggregate = apps.get_model('project', 'PlayerAggregate')
+    summary = {'games': models.Count('pk')}
+    for stat in ('kills', 'deaths', 'assists'):
+        summary.update({f'{stat}_sum': models.Sum(stat), f'{stat}_min': models.Min(stat), f'{stat}_max': models.Max(stat)})
+    for stat in ('acs', 'rating'):
+        summary.update({
+            f'{stat}_count': models.Count(stat), f'{stat}_sum': Coalesce(models.Sum(stat), 0.0),
+            f'{stat}_min': models.Min(stat), f'{stat}_max': models.Max(stat),
+        })
+
+    rows = apps.get_model('project', 'PlayerMatchStats').objects.order_by()
+    aggregates = []
+    for values in [
+        *rows.values('player', 'match__game', 'map_name').annotate(**summary),
+        *rows.values('player', 'match__game').annotate(**summary),
+    ]:
+        for stat in ('acs', 'rating'):
+            count = values[f'{stat}_count']
+            values[f'avg_{stat}'] = values[f'{stat}_sum'] / count if count else None
+        aggregates.append(PlayerAggregate(
+            player_id=values.pop('player'), game_id=values.pop('match__game'),
+            map_name=values.pop('map_name', ''), **values,
+        ))
+    PlayerAggregate.objects.bulk_create(aggregates, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0004_favoriteplayer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('map_name', models.TextField(blank=True)),
+                ('games', models.PositiveIntegerField(default=0)),
+                ('kills_sum', models.PositiveIntegerField(default=0)),
+                ('kills_min', models.PositiveSmallIntegerField(null=True)),
+                ('kills_max', models.PositiveSmallIntegerField(null=True)),
+                ('deaths_sum', models.PositiveIntegerField(default=0)),
+                ('deaths_min', models.PositiveSmallIntegerField(null=True)),
+                ('deaths_max', models.PositiveSmallIntegerField(null=True)),
+                ('assists_sum', models.PositiveIntegerField(default=0)),
+                ('assists_min', models.PositiveSmallIntegerField(null=True)),
+                ('assists_max', models.PositiveSmallIntegerField(null=True)),
+                ('acs_count', models.PositiveIntegerField(default=0)),
+                ('acs_sum', models.FloatField(default=0)),
+                ('acs_min', models.FloatField(null=True)),
+                ('acs_max', models.FloatField(null=True)),
+                ('avg_acs', models.FloatField(null=True)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.FloatField(default=0)),
+                ('rating_min', models.FloatField(null=True)),
+                ('rating_max', models.FloatField(null=True)),
+                ('avg_rating', models.FloatField(null=True)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='player_aggregates', to='project.gametitle')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aggregates', to='project.proplayer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['game', 'map_name', '-avg_rating'], name='aggregate_game_rating_idx')],
+                'constraints': [models.UniqueConstraint(fields=('player', 'game', 'map_name'), name='playeraggregate_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:32
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, TruncMonth
+
+
+def backfill_months(apps, schema_editor):
+    ''' Add the monthly rows for existing PlayerMatchStats (same as rebuild_player_aggregates). '''
+
+    PlayerAggregate = apps.get_model('project', 'PlayerAggregate')
+    summary = {'games': models.Count('pk')}
+    for stat in ('kills', 'deaths', 'assists'):
+        summary.update({f'{stat}_sum': models.Sum(stat), f'{stat}_min': models.Min(stat), f'{stat}_max': models.Max(stat)})
+    for stat in ('acs', 'rating'):
+        summary.update({
+            f'{stat}_count': models.Count(stat), f'{stat}_sum': Coalesce(models.Sum(stat), 0.0),
+            f'{stat}_min': models.Min(stat), f'{stat}_max': models.Max(stat),
+        })
+
+    rows = (
+        apps.get_model('project', 'PlayerMatchStats').objects.order_by()
+        .annotate(month=TruncMonth('match__match_date'))
+    )
+    aggregates = []
+    for values in [
+        *rows.values('player', 'match__game', 'map_name', 'month').annotate(**summary),
+        *rows.values('player', 'match__game', 'month').annotate(**summary),
+    ]:
+        for stat in ('acs', 'rating'):
+            count = values[f'{stat}_count']
+            values[f'avg_{stat}'] = values[f'{stat}_sum'] / count if count else None
+        aggregates.append(PlayerAggregate(
+            player_id=values.pop('player'), game_id=values.pop('match__game'),
+            map_name=values.pop('map_name', ''), period=values.pop('month').strftime('%Y-%m'), **values,
+        ))
+    PlayerAggregate.objects.bulk_create(aggregates, batch_size=500)
+
+
+def remove_months(apps, schema_editor):
+    apps.get_model('project', 'PlayerAggregate').objects.exclude(period='').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0005_playeraggregate'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='playeraggregate',
+            name='playeraggregate_unique',
+        ),
+        migrations.RemoveIndex(
+            model_name='playeraggregate',
+            name='aggregate_game_rating_idx',
+        ),
+        migrations.AddField(
+            model_name='playeraggregate',
+            name='period',
+            field=models.CharField(blank=True, default='', max_length=7),
+        ),
+        migrations.AddIndex(
+            model_name='playeraggregate',
+            index=models.Index(fields=['game', 'map_name', 'period', '-avg_rating', 'player'], name='aggregate_game_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playeraggregate',
+            index=models.Index(fields=['game', 'map_name', 'period', '-avg_acs', 'player'], name='aggregate_game_acs_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='playeraggregate',
+            constraint=models.UniqueConstraint(fields=('player', 'game', 'map_name', 'period'), name='playeraggregate_unique'),
+        ),
+        migrations.RunPython(backfill_months, remove_months),
+    ]
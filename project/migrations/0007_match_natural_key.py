@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0006_aggregate_periods'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='match',
+            constraint=models.UniqueConstraint(fields=('game', 'tournament_name', 'match_date', 'team_one_name', 'team_two_name'), name='match_natural_key'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0007_match_natural_key'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['status', 'match_date', 'id'], name='match_status_date_idx'),
+        ),
+    ]
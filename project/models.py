@@ -1,6 +1,8 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 
+from cs412.storage import media_storage
+
 # Create your models here.
 class GameTitle(models.Model):
     '''Model for each esports game being tracked (e.g., Valorant, CS2).'''
@@ -21,7 +23,8 @@ class ProPlayer(models.Model):
     region = models.TextField(blank=True)
     team_name = models.TextField(blank=True)
     game = models.ForeignKey(GameTitle, on_delete=models.CASCADE, related_name="players")
-    image_file = models.ImageField(blank=True)
+    # stored by content hash, so identical images are written once
+    image_file = models.ImageField(blank=True, storage=media_storage)
 
     def __str__(self):
         return f"{self.ign} ({self.game.name})"
@@ -49,6 +52,21 @@ class Match(models.Model):
     team_one_score = models.PositiveSmallIntegerField(default=0)
     team_two_score = models.PositiveSmallIntegerField(default=0)
 
+    # identifies a match in imported dumps, which carry no ids of ours
+    NATURAL_KEY = ("game", "tournament_name", "match_date", "team_one_name", "team_two_name")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["game", "tournament_name", "match_date", "team_one_name", "team_two_name"],
+                name="match_natural_key",
+            ),
+        ]
+        indexes = [
+            # the match board: next upcoming (ascending), live, and finished history (descending, keyset by pk)
+            models.Index(fields=["status", "match_date", "id"], name="match_status_date_idx"),
+        ]
+
     def __str__(self):
         return f"{self.tournament_name}: {self.team_one_name} vs {self.team_two_name}"
 
@@ -70,6 +88,84 @@ class PlayerMatchStats(models.Model):
 
     def __str__(self):
         return f"{self.player.ign} – {self.map_name} – {self.match}"
+
+    def save(self, *args, **kwargs):
+        # the PlayerAggregate signal handlers run inside save(), so they commit or roll back with the row
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
+
+class PlayerAggregate(models.Model):
+    '''Running totals of one player's PlayerMatchStats in one game, per map,
+    plus a row with map_name "" for all maps combined; each of those for all
+    time (period "") and per calendar month of the match (period "2025-12").
+    Kept current by the signal handlers in signals.py (see aggregates.py).'''
+
+    ALL_MAPS = ""
+    ALL_TIME = ""
+
+    player = models.ForeignKey(ProPlayer, on_delete=models.CASCADE, related_name="aggregates")
+    game = models.ForeignKey(GameTitle, on_delete=models.CASCADE, related_name="player_aggregates")
+    map_name = models.TextField(blank=True)
+    period = models.CharField(max_length=7, blank=True, default=ALL_TIME)
+
+    # number of PlayerMatchStats rows (maps played)
+    games = models.PositiveIntegerField(default=0)
+
+    kills_sum = models.PositiveIntegerField(default=0)
+    kills_min = models.PositiveSmallIntegerField(null=True)
+    kills_max = models.PositiveSmallIntegerField(null=True)
+    deaths_sum = models.PositiveIntegerField(default=0)
+    deaths_min = models.PositiveSmallIntegerField(null=True)
+    deaths_max = models.PositiveSmallIntegerField(null=True)
+    assists_sum = models.PositiveIntegerField(default=0)
+    assists_min = models.PositiveSmallIntegerField(null=True)
+    assists_max = models.PositiveSmallIntegerField(null=True)
+
+    # ACS and rating are optional, so they have their own counts and means
+    acs_count = models.PositiveIntegerField(default=0)
+    acs_sum = models.FloatField(default=0)
+    acs_min = models.FloatField(null=True)
+    acs_max = models.FloatField(null=True)
+    avg_acs = models.FloatField(null=True)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.FloatField(default=0)
+    rating_min = models.FloatField(null=True)
+    rating_max = models.FloatField(null=True)
+    avg_rating = models.FloatField(null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["player", "game", "map_name", "period"], name="playeraggregate_unique"),
+        ]
+        indexes = [
+            # leaderboards: top-N by rating or ACS within a game, map and period without a scan
+            models.Index(fields=["game", "map_name", "period", "-avg_rating", "player"], name="aggregate_game_rating_idx"),
+            models.Index(fields=["game", "map_name", "period", "-avg_acs", "player"], name="aggregate_game_acs_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.player.ign} – {self.map_name or 'all maps'}, {self.period or 'all time'} ({self.games} maps)"
+
+    def avg_kills(self):
+        '''Return mean kills per map.'''
+        return self.kills_sum / self.games if self.games else None
+
+    def avg_deaths(self):
+        '''Return mean deaths per map.'''
+        return self.deaths_sum / self.games if self.games else None
+
+    def avg_assists(self):
+        '''Return mean assists per map.'''
+        return self.assists_sum / self.games if self.games else None
+
+    def kd_ratio(self):
+        '''Return career kills divided by deaths.'''
+        return self.kills_sum / self.deaths_sum if self.deaths_sum else None
     
 
 class FavoritePlayer(models.Model):
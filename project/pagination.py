@@ -0,0 +1,48 @@
+# file: project/pagination.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Keyset (cursor) pagination of matches ordered newest first by (match_date, pk).
+
+import base64
+import datetime
+import json
+
+from django.db.models import Q
+
+
+def encode_cursor(match_date, pk):
+    ''' Return an opaque cursor pointing just past the match (match_date, pk). '''
+
+    raw = json.dumps([match_date.isoformat(), pk]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor):
+    ''' Return (match_date, pk) from a cursor, or None if it is invalid. '''
+
+    try:
+        match_date, pk = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.datetime.fromisoformat(match_date), int(pk)
+    except (ValueError, TypeError):
+        return None
+
+
+def page_by_date(matches, cursor, size):
+    ''' Return (matches, next_cursor) for the page of matches after cursor.
+
+    matches must be ordered by ("-match_date", "-pk"), which the
+    (status, match_date) index serves for one status, so each page is one
+    range scan starting at the cursor. next_cursor is None on the last page. '''
+
+    position = decode_cursor(cursor or "")
+    if position:
+        match_date, pk = position
+        # the leading <= bound lets the index start the range scan at the cursor
+        matches = matches.filter(match_date__lte=match_date).filter(
+            Q(match_date__lt=match_date) | Q(match_date=match_date, pk__lt=pk)
+        )
+
+    rows = list(matches[:size + 1])
+    if len(rows) <= size:
+        return rows, None
+    last = rows[size - 1]
+    return rows[:size], encode_cursor(last.match_date, last.pk)
@@ -0,0 +1,82 @@
+# file: project/signals.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Signal handlers that keep PlayerAggregate current and release a ProPlayer's stored image when the last reference to it goes away.
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from cs412.storage import release
+
+from . import aggregates
+from .models import Match, PlayerMatchStats, ProPlayer
+
+
+@receiver(post_delete, sender=ProPlayer)
+def release_player_image(sender, instance, **kwargs):
+    ''' Once the deletion commits, remove the image if no other row uses the same stored file. '''
+
+    if instance.image_file:
+        transaction.on_commit(partial(release, instance.image_file.name, storage=instance.image_file.storage))
+
+
+@receiver(pre_save, sender=PlayerMatchStats)
+def remember_aggregate_keys(sender, instance, **kwargs):
+    ''' Before an edit, note which aggregate rows the stats counted towards,
+    in case the edit moves them to another player, match or map. '''
+
+    old = None
+    if instance.pk and not kwargs.get("raw"):
+        old = sender.objects.filter(pk=instance.pk).values_list(
+            "player_id", "match__game_id", "map_name", "match__match_date",
+        ).first()
+    instance._aggregate_keys = aggregates.keys(*old) if old else []
+
+
+@receiver(post_save, sender=PlayerMatchStats)
+def update_aggregates(sender, instance, created, **kwargs):
+    ''' Add a new stats row to its aggregates; recompute the ones an edit touched. '''
+
+    if kwargs.get("raw"):
+        return  # loaddata; run rebuild_player_aggregates afterwards
+    old_keys = getattr(instance, "_aggregate_keys", [])
+    if created and not old_keys:
+        aggregates.add(instance)
+    else:
+        aggregates.refresh(dict.fromkeys([*old_keys, *aggregates.keys_of(instance)]))
+
+
+@receiver(post_delete, sender=PlayerMatchStats)
+def remove_from_aggregates(sender, instance, **kwargs):
+    ''' Recompute the aggregates a deleted stats row counted towards (also runs for cascades). '''
+
+    aggregates.refresh(aggregates.keys_of(instance))
+
+
+@receiver(pre_save, sender=Match)
+def remember_match_keys(sender, instance, **kwargs):
+    ''' Before an edit, note the game and date the match's stats counted under,
+    in case the edit moves them to another game or month. '''
+
+    instance._aggregate_match = None
+    if instance.pk and not kwargs.get("raw"):
+        instance._aggregate_match = sender.objects.filter(pk=instance.pk).values_list(
+            "game_id", "match_date",
+        ).first()
+
+
+@receiver(post_save, sender=Match)
+def refresh_match_aggregates(sender, instance, created, **kwargs):
+    ''' Recompute the aggregates of the match's players when its game or date changed. '''
+
+    old = getattr(instance, "_aggregate_match", None)
+    if kwargs.get("raw") or not old or old == (instance.game_id, instance.match_date):
+        return
+    old_game_id, old_match_date = old
+    targets = []
+    for player_id, map_name in instance.player_stats.values_list("player_id", "map_name"):
+        targets += aggregates.keys(player_id, old_game_id, map_name, old_match_date)
+        targets += aggregates.keys(player_id, instance.game_id, map_name, instance.match_date)
+    aggregates.refresh(dict.fromkeys(targets))
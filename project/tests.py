@@ -1,3 +1,228 @@
+import datetime
+import io
+import json
+import os
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .aggregates import rebuild
+from .leaderboards import Leaderboard
+from .live import Broadcaster, Subscription, get_broadcaster, sse, sync_stream
+from .models import GameTitle, Match, PlayerAggregate, PlayerMatchStats, ProPlayer
+
+
+def aggregate_rows():
+    return sorted(PlayerAggregate.objects.values_list(
+        'player', 'game', 'map_name', 'period', 'games', 'kills_sum', 'kills_min', 'kills_max',
+        'rating_count', 'rating_min', 'rating_max', 'avg_rating', 'avg_acs',
+    ))
+
+
+class PlayerAggregateTests(TestCase):
+    ''' The signal-maintained aggregates match a rebuild from scratch after every kind of write. '''
+
+    def test_incremental_matches_rebuild(self):
+        game = GameTitle.objects.create(name='Valorant')
+        player = ProPlayer.objects.create(ign='tenz', game=game)
+        one, two = [
+            Match.objects.create(game=game, match_date=timezone.now() - datetime.timedelta(days=n))
+            for n in (1, 2)
+        ]
+
+        a = PlayerMatchStats.objects.create(player=player, match=one, map_name='Bind', kills=20, deaths=10, assists=5, rating=1.5)
+        PlayerMatchStats.objects.create(player=player, match=one, map_name='Haven', kills=10, deaths=15, assists=2)
+        b = PlayerMatchStats.objects.create(player=player, match=two, map_name='Bind', kills=30, deaths=12, assists=4, acs=250, rating=1.1)
+
+        career = PlayerAggregate.objects.get(player=player, map_name='', period='')
+        self.assertEqual((career.games, career.kills_sum, career.kills_max, career.rating_count), (3, 60, 30, 2))
+        self.assertAlmostEqual(career.avg_rating, 1.3)
+        self.assertEqual(PlayerAggregate.objects.get(player=player, map_name='Bind', period='').kills_min, 20)
+        expected = aggregate_rows()
+        rebuild()
+        self.assertEqual(aggregate_rows(), expected)
+
+        # an edit that moves a row to another map, and a delete of the max
+        a.map_name = 'Ascent'
+        a.kills = 5
+        a.save()
+        b.delete()
+        career = PlayerAggregate.objects.get(player=player, map_name='', period='')
+        self.assertEqual((career.games, career.kills_sum, career.kills_max, career.avg_acs), (2, 15, 10, None))
+        self.assertFalse(PlayerAggregate.objects.filter(map_name='Bind').exists())
+        expected = aggregate_rows()
+        rebuild()
+        self.assertEqual(aggregate_rows(), expected)
+
+        # a match moved to another month and another game takes its stats along
+        other = GameTitle.objects.create(name='CS2')
+        one.match_date -= datetime.timedelta(days=62)
+        one.game = other
+        one.save()
+        self.assertFalse(PlayerAggregate.objects.filter(game=game).exists())
+        expected = aggregate_rows()
+        rebuild()
+        self.assertEqual(aggregate_rows(), expected)
+
+
+class LeaderboardTests(TestCase):
+    ''' Ranking, thresholds, windows, stable pages and rank lookup. '''
+
+    def setUp(self):
+        cache.clear()
+
+    def test_leaderboard(self):
+        game = GameTitle.objects.create(name='Valorant')
+        now = timezone.now()
+        recent = Match.objects.create(game=game, match_date=now)
+        old = Match.objects.create(game=game, match_date=now - datetime.timedelta(days=400))
+        # ratings: p0 and p1 tie, p3 only has one map
+        players = [ProPlayer.objects.create(ign=f'p{n}', region='NA' if n % 2 else 'EU', game=game) for n in range(4)]
+        for player, ratings in zip(players, [(1.0, 1.4), (1.2, 1.2), (0.9, 1.0), (2.0,)]):
+            for n, rating in enumerate(ratings):
+                PlayerMatchStats.objects.create(
+                    player=player, match=recent if n == 0 else old, map_name=f'map{n}',
+                    kills=10, deaths=10, assists=0, rating=rating,
+                )
+
+        board = Leaderboard(game.pk, min_games=2)
+        first, cursor = board.page(size=2)
+        second, end = board.page(cursor, size=2)
+        self.assertEqual([(e['rank'], e['player'].ign) for e in first + second], [(1, 'p0'), (2, 'p1'), (3, 'p2')])
+        self.assertIsNone(end)
+        self.assertEqual(board.rank(players[2].pk)['rank'], 3)
+        self.assertIsNone(board.rank(players[3].pk))
+
+        self.assertEqual([e['player_id'] for e in Leaderboard(game.pk, region='NA', min_games=1).all_time()],
+                         [players[3].pk, players[1].pk])
+        # the last year only includes the recent match
+        year = Leaderboard(game.pk, window='year', min_games=1)
+        self.assertEqual([e['player_id'] for e in year.windowed()], [p.pk for p in (players[3], players[1], players[0], players[2])])
+        self.assertEqual(year.page(year.page(size=1)[1], size=1)[0][0]['rank'], 2)
+
+        response = self.client.get(reverse('leaderboard'), {'game': game.pk, 'min_games': 2, 'player': 'p2'})
+        self.assertContains(response, 'is #3')
+
+
+class ImportMatchesTests(TestCase):
+    ''' import_matches upserts, so a second run changes nothing but edited values. '''
+
+    def test_import_is_idempotent(self):
+        game = GameTitle.objects.create(name='Valorant')
+        ProPlayer.objects.create(ign='TenZ', game=game)
+        dump = [{
+            'game': 'valorant', 'tournament_name': 'Masters', 'match_date': '2026-06-01T12:00:00Z',
+            'team_one_name': 'SEN', 'team_two_name': 'FNC', 'status': 'finished',
+            'player_stats': [
+                {'player': 'tenz', 'map_name': 'Bind', 'kills': 20, 'deaths': 10, 'assists': 3, 'rating': 1.2},
+                {'player': 'tenz', 'map_name': 'Haven', 'kills': 10, 'deaths': 10, 'assists': 3},
+                {'player': 'nobody', 'map_name': 'Bind', 'kills': 1, 'deaths': 1, 'assists': 1},
+            ],
+        }]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'masters.json')
+            for kills in (20, 30):
+                dump[0]['player_stats'][0]['kills'] = kills
+                with open(path, 'w') as f:
+                    json.dump(dump, f)
+                call_command('import_matches', path, stdout=io.StringIO(), stderr=io.StringIO())
+
+        self.assertEqual(Match.objects.count(), 1)
+        self.assertEqual(sorted(PlayerMatchStats.objects.values_list('map_name', 'kills')), [('Bind', 30), ('Haven', 10)])
+        career = PlayerAggregate.objects.get(map_name='', period='')
+        self.assertEqual((career.games, career.kills_sum), (2, 40))
+
+
+class LiveScoreTests(TestCase):
+    ''' One poll of live matches feeds every viewer only the fields that changed. '''
+
+    async def test_broadcast(self):
+        game = await GameTitle.objects.acreate(name='CS2')
+        match = await Match.objects.acreate(game=game, match_date=timezone.now(), status=Match.STATUS_LIVE)
+        other = await Match.objects.acreate(game=game, match_date=timezone.now(), status=Match.STATUS_UPCOMING)
+
+        broadcaster = Broadcaster()
+        everything, just_match = Subscription(), Subscription([match.pk])
+        broadcaster.subscribers.update([everything, just_match])
+
+        await broadcaster.poll()
+        self.assertEqual(just_match.queue.get_nowait(), {'id': match.pk, 'status': 'live', 'team_one_score': 0, 'team_two_score': 0})
+
+        await Match.objects.filter(pk=match.pk).aupdate(team_one_score=1)
+        await Match.objects.filter(pk=other.pk).aupdate(status=Match.STATUS_LIVE)
+        await broadcaster.poll()
+        self.assertEqual(just_match.queue.get_nowait(), {'id': match.pk, 'team_one_score': 1})
+        self.assertTrue(just_match.queue.empty())
+
+        # a finished match is reported once and then dropped
+        await Match.objects.filter(pk=match.pk).aupdate(status=Match.STATUS_FINISHED)
+        await broadcaster.poll()
+        await broadcaster.poll()
+        self.assertEqual(just_match.queue.get_nowait(), {'id': match.pk, 'status': 'finished'})
+        self.assertTrue(just_match.queue.empty())
+        self.assertEqual(everything.queue.qsize(), 4)
+        self.assertEqual(list(broadcaster.state), [other.pk])
+
+    async def test_event_stream(self):
+        response = await self.async_client.get(reverse('match_events'), {'match': '1'})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = aiter(response.streaming_content)
+        self.assertTrue((await anext(content)).startswith(b'retry:'))
+        await content.aclose()
+        get_broadcaster().task.cancel()
+
+        # pages served over ASGI open the stream
+        response = await self.async_client.get(reverse('match_list'))
+        self.assertContains(response, 'data-live-events')
+
+    def test_wsgi_stream_ends(self):
+        game = GameTitle.objects.create(name='CS2')
+        match = Match.objects.create(game=game, match_date=timezone.now(), status=Match.STATUS_LIVE)
+
+        # under WSGI the pages don't open a stream that would hold a worker thread
+        cache.clear()
+        self.assertNotContains(self.client.get(reverse('match_list')), 'data-live-events')
+        self.assertNotContains(self.client.get(reverse('match_detail', args=[match.pk])), 'data-live-events')
+
+        # a client that connects anyway gets a sync stream that ends, then reconnects
+        response = self.client.get(reverse('match_events'), {'match': match.pk})
+        self.assertTrue(next(iter(response.streaming_content)).startswith(b'retry:'))
+        response.close()
+        events = list(sync_stream([match.pk], duration=0))
+        self.assertEqual(events[1], sse('score', {'id': match.pk, 'status': 'live', 'team_one_score': 0, 'team_two_score': 0}))
+        self.assertEqual(len(events), 2)
+
+
+class MatchBoardTests(TestCase):
+    ''' The match board windows each section and pages the finished history. '''
+
+    def setUp(self):
+        cache.clear()
+
+    def test_sections(self):
+        game = GameTitle.objects.create(name='CS2')
+        now = timezone.now()
+        for n in range(12):
+            Match.objects.create(game=game, match_date=now + datetime.timedelta(days=n), team_two_name=f'up{n}')
+        Match.objects.create(game=game, match_date=now, status=Match.STATUS_LIVE)
+        for n in range(25):
+            Match.objects.create(game=game, match_date=now - datetime.timedelta(days=n), team_two_name=f'old{n}',
+                                 status=Match.STATUS_FINISHED)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('match_list'))
+        self.assertEqual([m.team_two_name for m in response.context['upcoming_matches']], [f'up{n}' for n in range(10)])
+        self.assertEqual(len(response.context['live_matches']), 1)
+        self.assertEqual(len(response.context['finished_matches']), 20)
+
+        # cached: no queries until the sections expire
+        with self.assertNumQueries(0):
+            self.client.get(reverse('match_list'))
 
-# Create your tests here.
+        older = self.client.get(f"{reverse('match_list')}?{response.context['older_query']}")
+        self.assertEqual([m.team_two_name for m in older.context['finished_matches']], [f'old{n}' for n in range(20, 25)])
+        self.assertNotIn('older_query', older.context)
@@ -17,7 +17,9 @@ urlpatterns = [
     path("players/<int:pk>/", PlayerDetailView.as_view(), name="player_detail"),
     path("matches/", MatchListView.as_view(), name="match_list"),
     path("matches/<int:pk>/", MatchDetailView.as_view(), name="match_detail"),
+    path("matches/events/", MatchEventsView.as_view(), name="match_events"),
     path("stats/<int:pk>/", PlayerMatchStatsDetailView.as_view(), name="stats_detail"),
+    path("leaderboard/", LeaderboardView.as_view(), name="leaderboard"),
     path("watchlist/", WatchlistView.as_view(), name="watchlist"),
     path("players/<int:pk>/favorite/", AddFavoriteView.as_view(), name="add_favorite"),
     path("players/<int:pk>/unfavorite/", RemoveFavoriteView.as_view(), name="remove_favorite"),
@@ -2,17 +2,23 @@
 # Author: Evren Yaman (yamane@bu.edu), 12/09/2025
 # Description: View classes for the esports tracker app.
 
+import hashlib
+
 from django.shortcuts import render
 
 # Create your views here.
+from django.core.cache import cache
 from django.db.models import Q
-from django.views.generic import TemplateView, ListView, DetailView, CreateView
+from django.views.generic import TemplateView, ListView, DetailView, CreateView, View
 from django.urls import reverse
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, StreamingHttpResponse
 from .models import *
+from .leaderboards import MIN_GAMES, METRICS, WINDOWS, Leaderboard
+from .live import served_over_asgi, stream, sync_stream
+from .pagination import page_by_date
 
 
 class GameListView(ListView):
@@ -133,22 +139,110 @@ class PlayerDetailView(DetailView):
             )
 
         context["filtered_stats"] = stats
+
+        # career numbers come from the maintained totals, not the stats rows
+        aggregates = (
+            self.object.aggregates.filter(period=PlayerAggregate.ALL_TIME)
+            .select_related("game").order_by("-games", "map_name")
+        )
+        context["career"] = [a for a in aggregates if a.map_name == PlayerAggregate.ALL_MAPS]
+        context["map_aggregates"] = [a for a in aggregates if a.map_name != PlayerAggregate.ALL_MAPS]
         return context
 
 
-class MatchListView(ListView):
-    """Display all matches."""
+class LeaderboardView(TemplateView):
+    """Rank the players of a game by rating or ACS, filtered by region, map and time window."""
+
+    template_name = "project/leaderboard.html"
+    page_size = 25
+
+    def get_context_data(self, **kwargs):
+        """Add one page of the leaderboard chosen by the GET parameters, and a player's rank if asked for."""
+
+        context = super().get_context_data(**kwargs)
+        params = self.request.GET
+        games = GameTitle.objects.order_by("name")
+        game = games.filter(pk=params.get("game")).first() if params.get("game", "").isdigit() else None
+        game = game or games.filter(active=True).first() or games.first()
+        context["games"] = games
+        context["game"] = game
+        if game is None:
+            return context
+
+        try:
+            min_games = max(int(params.get("min_games", MIN_GAMES)), 1)
+        except ValueError:
+            min_games = MIN_GAMES
+        board = Leaderboard(
+            game.pk,
+            region=params.get("region", ""),
+            map_name=params.get("map", PlayerAggregate.ALL_MAPS),
+            window=params.get("window") if params.get("window") in WINDOWS else "all",
+            metric=params.get("metric") if params.get("metric") in METRICS else "rating",
+            min_games=min_games,
+        )
+        context["board"] = board
+        context["entries"], next_cursor = board.page(params.get("after"), self.page_size)
+        if next_cursor:
+            query = params.copy()
+            query["after"] = next_cursor
+            context["next_query"] = query.urlencode()
+
+        # "where do I stand": look up one player by IGN
+        ign = params.get("player", "").strip()
+        if ign:
+            player = ProPlayer.objects.filter(game=game, ign__iexact=ign).first()
+            context["lookup"] = board.rank(player.pk) if player else None
+            context["lookup_player"] = player
+
+        context["regions"] = (
+            ProPlayer.objects.filter(game=game).exclude(region="")
+            .order_by("region").values_list("region", flat=True).distinct()
+        )
+        context["maps"] = (
+            PlayerAggregate.objects.filter(game=game, period=PlayerAggregate.ALL_TIME)
+            .exclude(map_name=PlayerAggregate.ALL_MAPS)
+            .order_by("map_name").values_list("map_name", flat=True).distinct()
+        )
+        context["windows"] = WINDOWS
+        context["metrics"] = METRICS
+        return context
+
+
+class MatchListView(TemplateView):
+    """Display the match board: the next upcoming matches, every live match,
+    and the finished history one keyset page at a time.
+
+    Each section is one range scan of the (status, match_date) index and is
+    cached on its own for a few seconds, so the busiest page of the tracker
+    does not grow with the history. (SQLite rejects LIMIT inside a UNION, so
+    the sections can't share one compound query.)"""
 
-    model = Match
     template_name = "project/match_list.html"
-    
+    upcoming_count = 10
+    page_size = 20
+
+    # seconds each section is cached; live scores also arrive over MatchEventsView
+    CACHE_SECONDS = {
+        Match.STATUS_UPCOMING: 60,
+        Match.STATUS_LIVE: 5,
+        Match.STATUS_FINISHED: 60,
+    }
+
+    def get_section(self, status, query, build):
+        """Return build() for one section, cached per status, search and cursor."""
+
+        after = self.request.GET.get("after", "") if status == Match.STATUS_FINISHED else ""
+        digest = hashlib.md5(f"{query}|{after}".encode("utf-8")).hexdigest()
+        return cache.get_or_set(f"project:match_board:{status}:{digest}", build, self.CACHE_SECONDS[status])
+
     def get_context_data(self, **kwargs):
-        """Filter matches by 'q' and split them into upcoming, live, and finished."""
+        """Filter matches by 'q' and fill the upcoming, live and finished sections."""
 
         context = super().get_context_data(**kwargs)
-        q = self.request.GET.get("q")
+        q = self.request.GET.get("q", "")
 
-        base_qs = Match.objects.all()
+        base_qs = Match.objects.select_related("game")
 
         if q:
             base_qs = base_qs.filter(
@@ -158,9 +252,29 @@ class MatchListView(ListView):
                 Q(game__name__icontains=q)
             )
 
-        context["upcoming_matches"] = base_qs.filter(status=Match.STATUS_UPCOMING).order_by("match_date")
-        context["live_matches"] = base_qs.filter(status=Match.STATUS_LIVE).order_by("match_date")
-        context["finished_matches"] = base_qs.filter(status=Match.STATUS_FINISHED).order_by("-match_date")
+        def by_status(status):
+            return base_qs.filter(status=status)
+
+        context["upcoming_matches"] = self.get_section(
+            Match.STATUS_UPCOMING, q,
+            lambda: list(by_status(Match.STATUS_UPCOMING).order_by("match_date", "pk")[:self.upcoming_count]),
+        )
+        context["live_matches"] = self.get_section(
+            Match.STATUS_LIVE, q,
+            lambda: list(by_status(Match.STATUS_LIVE).order_by("match_date", "pk")),
+        )
+        context["finished_matches"], next_cursor = self.get_section(
+            Match.STATUS_FINISHED, q,
+            lambda: page_by_date(
+                by_status(Match.STATUS_FINISHED).order_by("-match_date", "-pk"),
+                self.request.GET.get("after"), self.page_size,
+            ),
+        )
+        if next_cursor:
+            params = self.request.GET.copy()
+            params["after"] = next_cursor
+            context["older_query"] = params.urlencode()
+        context["live_events"] = served_over_asgi(self.request)
 
         return context
 
@@ -189,8 +303,29 @@ class MatchDetailView(DetailView):
 
         context["filtered_stats"] = stats_qs
         context["query"] = q
+        context["live_events"] = served_over_asgi(self.request)
         return context
 
+class MatchEventsView(View):
+    """Stream live score and status changes as server-sent events.
+
+    ?match=<pk> (repeatable) limits the stream to those matches. The view is
+    async: under an ASGI server (uvicorn cs412.asgi:application) an open
+    stream holds no thread, and every viewer is fed from one poll per
+    process (see live.py). Under WSGI it answers with a short stream that
+    polls on its own and ends, and the browser reconnects; the pages only
+    open a stream when served over ASGI."""
+
+    async def get(self, request, *args, **kwargs):
+        matches = {int(pk) for pk in request.GET.getlist("match") if pk.isdigit()}
+        events = stream(matches or None) if served_over_asgi(request) else sync_stream(matches or None)
+        response = StreamingHttpResponse(events, content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # stop nginx and similar proxies from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
 class PlayerMatchStatsDetailView(DetailView):
     """Display stats for a single PlayerMatchStats record."""
 
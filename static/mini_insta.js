@@ -0,0 +1,28 @@
+// file: static/mini_insta.js
+// Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+// Description: Progressive "load more" for the cursor-paginated lists: fetch the
+// next page as an HTML fragment and put it where the clicked link was.
+
+document.addEventListener('click', function (event) {
+    const link = event.target.closest('a.load-more[data-fragment]');
+    if (!link) {
+        return;
+    }
+    event.preventDefault();
+    link.textContent = 'Loading…';
+    fetch(link.dataset.fragment)
+        .then(function (response) {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.text();
+        })
+        .then(function (html) {
+            // the fragment ends with its own link when there is another page
+            link.outerHTML = html;
+        })
+        .catch(function () {
+            // fall back to opening the next page normally
+            window.location = link.href;
+        });
+});
@@ -0,0 +1,23 @@
+// file: static/project_live.js
+// Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+// Description: Live match scores: listen to the server-sent events stream named by
+// a data-live-events element and patch the matching data-live-field values in place.
+
+document.querySelectorAll('[data-live-events]').forEach(function (element) {
+    const source = new EventSource(element.dataset.liveEvents);
+
+    source.addEventListener('score', function (event) {
+        const update = JSON.parse(event.data);
+        document.querySelectorAll('[data-live-match="' + update.id + '"]').forEach(function (match) {
+            match.querySelectorAll('[data-live-field]').forEach(function (field) {
+                if (field.dataset.liveField in update) {
+                    field.textContent = update[field.dataset.liveField];
+                }
+            });
+        });
+        // nothing more will change once a match is over
+        if (update.status === 'finished' && element.dataset.liveEvents.indexOf('?match=') !== -1) {
+            source.close();
+        }
+    });
+});
@@ -0,0 +1,152 @@
+# file: voter_analytics/aggregates.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Precomputed voter counts (party x precinct, birth year, elections, participation masks) kept in VoterAggregate.
+
+from collections import Counter
+
+from django.db.models import Count
+
+from .models import Voter, VoterAggregate
+from .parsing import ELECTIONS
+
+# Voter fields that any cube cell depends on
+CUBE_FIELDS = ['party_affiliation', 'precinct_number', 'birth_year', 'participation'] + ELECTIONS
+
+PARTY_PRECINCT = 'party_precinct'
+BIRTH_YEAR = 'birth_year'
+ELECTION = 'election'
+PARTICIPATION = 'participation'
+TOTAL = 'total'
+
+
+def cells(row):
+    ''' Return the (dimension, key_a, key_b) cells that one voter contributes to.
+    row is a dict holding at least CUBE_FIELDS. '''
+
+    birth_year = row['birth_year']
+    result = [
+        (TOTAL, '', ''),
+        (PARTY_PRECINCT, row['party_affiliation'] or '', row['precinct_number'] or ''),
+        (BIRTH_YEAR, str(birth_year) if birth_year else '', ''),
+        (PARTICIPATION, str(row['participation']), ''),
+    ]
+    result.extend((ELECTION, name, '') for name in ELECTIONS if row[name])
+    return result
+
+
+def count_cells(rows, sign=1):
+    ''' Return a Counter of cell -> sign * number of rows contributing to it. '''
+
+    delta = Counter()
+    for row in rows:
+        for cell in cells(row):
+            delta[cell] += sign
+    return delta
+
+
+def apply_delta(delta):
+    ''' Add a Counter of cell deltas to the stored counts. Run this inside the
+    transaction that changed the voters so the cube never drifts from them. '''
+
+    delta = {cell: n for cell, n in delta.items() if n}
+    if not delta:
+        return
+
+    dimensions = {cell[0] for cell in delta}
+    current = {
+        (a.dimension, a.key_a, a.key_b): a.count
+        for a in VoterAggregate.objects.filter(dimension__in=dimensions)
+    }
+    VoterAggregate.objects.bulk_create(
+        [
+            VoterAggregate(dimension=d, key_a=a, key_b=b, count=current.get((d, a, b), 0) + n)
+            for (d, a, b), n in delta.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['dimension', 'key_a', 'key_b'],
+        update_fields=['count'],
+    )
+
+
+def rebuild(voter_model=Voter, aggregate_model=VoterAggregate):
+    ''' Recompute every cell from scratch with one GROUP BY per dimension.
+    The model arguments let migrations pass their historical models. '''
+
+    voters = voter_model.objects.filter(missing_from_import=False)
+    totals = Counter()
+
+    totals[(TOTAL, '', '')] = voters.count()
+    for row in voters.values('party_affiliation', 'precinct_number').annotate(n=Count('pk')):
+        totals[(PARTY_PRECINCT, row['party_affiliation'] or '', row['precinct_number'] or '')] += row['n']
+    for row in voters.values('birth_year').annotate(n=Count('pk')):
+        totals[(BIRTH_YEAR, str(row['birth_year']) if row['birth_year'] else '', '')] += row['n']
+    for row in voters.values('participation').annotate(n=Count('pk')):
+        totals[(PARTICIPATION, str(row['participation']), '')] += row['n']
+    for name in ELECTIONS:
+        totals[(ELECTION, name, '')] = voters.filter(**{name: True}).count()
+
+    aggregate_model.objects.all().delete()
+    aggregate_model.objects.bulk_create(
+        aggregate_model(dimension=d, key_a=a, key_b=b, count=n) for (d, a, b), n in totals.items()
+    )
+
+
+def _cells_for(dimension):
+    ''' Return the stored (key_a, key_b, count) rows of one dimension. '''
+
+    return VoterAggregate.objects.filter(dimension=dimension).values_list('key_a', 'key_b', 'count')
+
+
+def total_voters():
+    ''' Number of current voters. '''
+
+    row = VoterAggregate.objects.filter(dimension=TOTAL).values_list('count', flat=True).first()
+    return row or 0
+
+
+def party_precinct_counts():
+    ''' Return {(party, precinct): count}; blank keys mean unknown. '''
+
+    return {(a, b): n for a, b, n in _cells_for(PARTY_PRECINCT) if n}
+
+
+def party_counts():
+    ''' Return {party: count}, rolled up from the party x precinct cells. '''
+
+    result = Counter()
+    for (party, precinct), n in party_precinct_counts().items():
+        result[party] += n
+    return dict(result)
+
+
+def birth_year_counts(bucket=1):
+    ''' Return {first year of bucket: count} sorted by year, skipping unknown years. '''
+
+    result = Counter()
+    for a, b, n in _cells_for(BIRTH_YEAR):
+        if a and n:
+            year = int(a)
+            result[year - year % bucket] += n
+    return dict(sorted(result.items()))
+
+
+def election_counts():
+    ''' Return {election field name: number of voters who voted in it}. '''
+
+    stored = {a: n for a, b, n in _cells_for(ELECTION)}
+    return {name: stored.get(name, 0) for name in ELECTIONS}
+
+
+def participation_counts():
+    ''' Return {participation mask: count}. '''
+
+    return {int(a): n for a, b, n in _cells_for(PARTICIPATION) if n}
+
+
+def participation_distribution():
+    ''' Return {number of elections voted in: count}, from the stored mask cells. '''
+
+    result = {n: 0 for n in range(len(ELECTIONS) + 1)}
+    for mask, n in participation_counts().items():
+        result[mask.bit_count()] += n
+    return result
@@ -0,0 +1,214 @@
+# file: voter_analytics/ingest.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Batched bulk loaders (append and delta) for the Newton voter file.
+
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from django.db import transaction
+
+from . import aggregates
+from .models import Voter, VoterImport
+from .parsing import COLUMNS, DERIVED, iter_batches, iter_rows, parse_range, split_ranges
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def record_import(mode, result):
+    ''' Log a finished import; one that changed rows bumps the data version. '''
+
+    counts = {key: result.get(key, 0) for key in ('created', 'updated', 'missing', 'rejected')}
+    return VoterImport.objects.create(
+        mode=mode,
+        rows_changed=counts['created'] + counts['updated'] + counts['missing'],
+        **counts,
+    )
+
+
+class InsertWriter:
+    ''' Append parsed rows to the Voter table. Rows whose natural key is
+    already present (duplicates within or across files) are skipped. '''
+
+    mode = 'insert'
+
+    def __init__(self):
+        self.counts = {'created': 0, 'duplicates': 0}
+
+    def write(self, batch):
+        ''' Insert one batch of parsed rows, and its aggregate cells, inside a
+        single transaction. '''
+
+        if not batch:
+            return 0
+        with transaction.atomic():
+            keys = [row['natural_key'] for row in batch]
+            taken = set(Voter.objects.filter(natural_key__in=keys).values_list('natural_key', flat=True))
+            new_rows = []
+            for row in batch:
+                if row['natural_key'] in taken:
+                    self.counts['duplicates'] += 1
+                    continue
+                taken.add(row['natural_key'])
+                new_rows.append(row)
+
+            Voter.objects.bulk_create([Voter(**row) for row in new_rows], batch_size=len(batch))
+            aggregates.apply_delta(aggregates.count_cells(new_rows))
+        self.counts['created'] += len(new_rows)
+        return len(batch)
+
+    def finish(self):
+        ''' Return the final counts for this import. '''
+
+        return dict(self.counts)
+
+
+class DeltaWriter:
+    ''' Upsert only new or changed rows, keyed by natural_key, and flag voters
+    that no longer appear in the file. Flagged voters drop out of the aggregate
+    cube and come back if they reappear. Keeps one {natural_key: (pk, content_hash,
+    missing)} map in memory, which is a few MB per 100k voters. '''
+
+    mode = 'delta'
+    UPDATE_FIELDS = COLUMNS + DERIVED + ['content_hash', 'missing_from_import']
+
+    def __init__(self):
+        self.existing = {
+            key: (pk, content_hash, missing)
+            for key, pk, content_hash, missing in Voter.objects
+            .exclude(natural_key=None)
+            .values_list('natural_key', 'pk', 'content_hash', 'missing_from_import')
+            .iterator(chunk_size=10000)
+        }
+        self.seen = set()
+        self.counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'duplicates': 0, 'missing': 0}
+
+    def write(self, batch):
+        ''' Upsert the changed rows of one batch inside a single transaction. '''
+
+        changed = []
+        for row in batch:
+            key = row['natural_key']
+            if key in self.seen:
+                self.counts['duplicates'] += 1
+                continue
+            self.seen.add(key)
+
+            old = self.existing.get(key)
+            if old is None:
+                self.counts['created'] += 1
+            elif old[1] != row['content_hash'] or old[2]:
+                self.counts['updated'] += 1
+            else:
+                self.counts['unchanged'] += 1
+                continue
+            changed.append(row)
+
+        if changed:
+            with transaction.atomic():
+                # take the replaced rows out of the cube before writing the new versions
+                old_rows = (
+                    Voter.objects
+                    .filter(natural_key__in=[row['natural_key'] for row in changed], missing_from_import=False)
+                    .values(*aggregates.CUBE_FIELDS)
+                )
+                delta = aggregates.count_cells(old_rows, sign=-1)
+                delta.update(aggregates.count_cells(changed))
+
+                Voter.objects.bulk_create(
+                    [Voter(missing_from_import=False, **row) for row in changed],
+                    batch_size=len(changed),
+                    update_conflicts=True,
+                    unique_fields=['natural_key'],
+                    update_fields=self.UPDATE_FIELDS,
+                )
+                aggregates.apply_delta(delta)
+        return len(batch)
+
+    def finish(self, batch_size=DEFAULT_BATCH_SIZE):
+        ''' Flag voters that were in the table but not in this import. '''
+
+        gone = [pk for key, (pk, content_hash, missing) in self.existing.items()
+                if key not in self.seen and not missing]
+        for i in range(0, len(gone), batch_size):
+            with transaction.atomic():
+                voters = Voter.objects.filter(pk__in=gone[i:i + batch_size])
+                aggregates.apply_delta(aggregates.count_cells(voters.values(*aggregates.CUBE_FIELDS), sign=-1))
+                voters.update(missing_from_import=True)
+        self.counts['missing'] = len(gone)
+        return dict(self.counts)
+
+
+def load_csv(filenames, batch_size=DEFAULT_BATCH_SIZE, progress=None, writer=None):
+    ''' Stream one file (or a list of shard files) into the Voter table in bulk batches.
+    progress, if given, is called with (written, rejected, seconds) after every batch.
+    Returns a dict of counts plus rejected/seconds. '''
+
+    start = time.monotonic()
+    writer = writer or InsertWriter()
+    written = 0
+    rejected = 0
+
+    if isinstance(filenames, str):
+        filenames = [filenames]
+
+    for filename in filenames:
+        with open(filename, 'r', newline='', encoding='utf-8', errors='replace') as f:
+            for batch, bad in iter_batches(iter_rows(f), batch_size):
+                written += writer.write(batch)
+                if progress:
+                    progress(written, rejected + bad, time.monotonic() - start)
+        rejected += bad
+
+    result = writer.finish()
+    result['rejected'] = rejected
+    record_import(writer.mode, result)
+    result['seconds'] = time.monotonic() - start
+    return result
+
+
+def load_parallel(filenames, workers, chunk_bytes=4 * 1024 * 1024, batch_size=DEFAULT_BATCH_SIZE,
+                  progress=None, writer=None):
+    ''' Import one or more CSV files (e.g. shards of one export) using worker
+    processes for parsing and this process as the only database writer.
+    Every file is split into line-aligned byte ranges; at most 2 ranges per
+    worker are in flight so parsed rows never pile up faster than they are
+    written. Returns a dict of counts plus rejected/seconds. '''
+
+    start = time.monotonic()
+    writer = writer or InsertWriter()
+    written = 0
+    rejected = 0
+
+    ranges = []
+    for filename in filenames:
+        ranges.extend(split_ranges(filename, chunk_bytes))
+    pending_ranges = iter(ranges)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = set()
+
+        def submit_more():
+            while len(in_flight) < workers * 2:
+                next_range = next(pending_ranges, None)
+                if next_range is None:
+                    return
+                in_flight.add(pool.submit(parse_range, next_range))
+
+        submit_more()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                in_flight.discard(future)
+                rows, bad = future.result()
+                for i in range(0, len(rows), batch_size):
+                    written += writer.write(rows[i:i + batch_size])
+                rejected += bad
+                if progress:
+                    progress(written, rejected, time.monotonic() - start)
+            submit_more()
+
+    result = writer.finish()
+    result['rejected'] = rejected
+    record_import(writer.mode, result)
+    result['seconds'] = time.monotonic() - start
+    return result
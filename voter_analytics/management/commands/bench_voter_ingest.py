@@ -0,0 +1,191 @@
+# file: voter_analytics/management/commands/bench_voter_ingest.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Management command that times every voter ingest path on synthetic data and saves the results as JSON.
+
+import datetime
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from voter_analytics.ingest import DeltaWriter, InsertWriter, load_csv, load_parallel
+from voter_analytics.models import Voter, VoterAggregate, VoterImport
+from voter_analytics.synthetic import generate_csv
+
+
+def children_maxrss():
+    ''' Return the peak RSS in KiB of the largest exited child process, or
+    None where the resource module is missing (it is Unix-only). '''
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+
+class PeakRSS:
+    ''' Sample this process's resident set size in a background thread and
+    keep the maximum. Reads /proc/self/statm, so the peak stays None where
+    that file doesn't exist (anywhere but Linux). '''
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _current(self):
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def _run(self):
+        while not self._stop.is_set():
+            current = self._current()
+            if current is not None:
+                self.peak = max(self.peak or 0, current)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def git_commit():
+    ''' Return the current commit hash, or None outside a git checkout. '''
+
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    ''' Benchmark the voter loaders against a throwaway database. '''
+
+    help = 'Time each voter ingest path on synthetic CSVs and write rows/sec and peak memory as JSON.'
+
+    PATHS = ['serial', 'parallel', 'delta-unchanged', 'delta-changed']
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000],
+                            help='row counts to generate (default 10000 100000)')
+        parser.add_argument('--paths', nargs='+', choices=self.PATHS, default=self.PATHS,
+                            help='ingest paths to time (default all)')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2,
+                            help='worker processes for the parallel path')
+        parser.add_argument('--changed-rate', type=float, default=0.02,
+                            help='fraction of changed records for delta-changed (default 0.02)')
+        parser.add_argument('--seed', type=int, default=412)
+        parser.add_argument('--output', default=os.path.join(tempfile.gettempdir(), 'bench_output.json'),
+                            help='JSON file to write (default bench_output.json in the temp directory)')
+        parser.add_argument('--keep-files', action='store_true', help='keep the generated CSVs')
+
+    def handle(self, *args, **options):
+        ''' Create a scratch database, run every (size, path) pair, then drop it. '''
+
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
+
+        if connection.vendor == 'sqlite':
+            # a file-backed scratch database, so timings include real disk writes
+            scratch = tempfile.NamedTemporaryFile(prefix='bench-voters-', suffix='.sqlite3', delete=False)
+            scratch.close()
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = scratch.name
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+        data_dir = tempfile.mkdtemp(prefix='bench-voters-')
+        results = []
+        try:
+            for size in options['sizes']:
+                results.extend(self.bench_size(size, data_dir, options))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            if not options['keep_files']:
+                for name in os.listdir(data_dir):
+                    os.remove(os.path.join(data_dir, name))
+                os.rmdir(data_dir)
+
+        report = {
+            'commit': git_commit(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': connection.vendor,
+            'workers': options['workers'],
+            'results': results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {len(results)} results to {options["output"]}'))
+
+    def bench_size(self, size, data_dir, options):
+        ''' Generate the files for one size and time each requested path. '''
+
+        base = os.path.join(data_dir, f'voters-{size}.csv')
+        changed = os.path.join(data_dir, f'voters-{size}-changed.csv')
+        generate_csv(base, size, seed=options['seed'])
+        if 'delta-changed' in options['paths']:
+            generate_csv(changed, size, seed=options['seed'], changed_rate=options['changed_rate'])
+
+        results = []
+        for path in options['paths']:
+            self.reset()
+            if path.startswith('delta'):
+                # a delta run re-imports over a table already loaded from the base file
+                load_csv(base)
+                source = base if path == 'delta-unchanged' else changed
+                run = lambda: load_csv(source, writer=DeltaWriter())
+            elif path == 'parallel':
+                run = lambda: load_parallel([base], workers=options['workers'], writer=InsertWriter())
+            else:
+                run = lambda: load_csv(base, writer=InsertWriter())
+
+            children_before = children_maxrss()
+            with PeakRSS() as rss:
+                start = time.perf_counter()
+                counts = run()
+                seconds = time.perf_counter() - start
+            children_after = children_maxrss()
+            counts.pop('seconds', None)
+
+            result = {
+                'size': size,
+                'path': path,
+                'seconds': round(seconds, 3),
+                'rows_per_sec': round(size / seconds, 1) if seconds else None,
+                'peak_rss_mb': round(rss.peak / 2 ** 20, 1) if rss.peak else None,
+                # ru_maxrss is in KiB on Linux; only meaningful once a worker has exited
+                'worker_peak_rss_mb': (
+                    round(children_after / 1024, 1)
+                    if children_after is not None and children_after > children_before else None
+                ),
+                'counts': counts,
+            }
+            results.append(result)
+            self.stdout.write(f'{size:>9} {path:<16} {result["seconds"]:>8.2f}s {result["rows_per_sec"]:>10,.0f} rows/sec')
+        return results
+
+    def reset(self):
+        ''' Empty the voter tables between runs. '''
+
+        Voter.objects.all().delete()
+        VoterAggregate.objects.all().delete()
+        VoterImport.objects.all().delete()
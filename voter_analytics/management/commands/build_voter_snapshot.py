@@ -0,0 +1,18 @@
+# file: voter_analytics/management/commands/build_voter_snapshot.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Management command that (re)builds the columnar NumPy snapshot of the Voter table.
+
+from django.core.management.base import BaseCommand
+
+from voter_analytics import snapshot
+
+
+class Command(BaseCommand):
+    ''' Build the memory-mapped voter snapshot for the current data version. '''
+
+    help = 'Export the Voter table into memory-mapped .npy column files.'
+
+    def handle(self, *args, **options):
+        path = snapshot.build()
+        snap = snapshot.Snapshot(path)
+        self.stdout.write(self.style.SUCCESS(f'Built snapshot v{snap.version} with {snap.size} voters in {path}'))
@@ -0,0 +1,30 @@
+# file: voter_analytics/management/commands/generate_voters.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Management command that writes a synthetic Newton-like voter CSV.
+
+from django.core.management.base import BaseCommand, CommandError
+
+from voter_analytics.synthetic import generate_csv
+
+
+class Command(BaseCommand):
+    ''' Write a deterministic synthetic voter CSV for testing the loaders. '''
+
+    help = 'Generate a synthetic voter CSV with realistic distributions and some malformed lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('filename', help='where to write the CSV')
+        parser.add_argument('--rows', type=int, default=10000, help='number of records (default 10000)')
+        parser.add_argument('--seed', type=int, default=412, help='random seed (default 412)')
+        parser.add_argument('--malformed-rate', type=float, default=0.002,
+                            help='fraction of broken lines (default 0.002)')
+        parser.add_argument('--changed-rate', type=float, default=0.0,
+                            help='fraction of records changed relative to the same seed, '
+                                 'to simulate the next weekly export (default 0)')
+
+    def handle(self, *args, **options):
+        if options['rows'] < 0:
+            raise CommandError('--rows must not be negative')
+        generate_csv(options['filename'], options['rows'], seed=options['seed'],
+                     malformed_rate=options['malformed_rate'], changed_rate=options['changed_rate'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {options["rows"]} rows to {options["filename"]}'))
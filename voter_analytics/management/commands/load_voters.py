@@ -0,0 +1,64 @@
+# file: voter_analytics/management/commands/load_voters.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Management command that streams a voter CSV into the database in bulk batches.
+
+from django.core.management.base import BaseCommand, CommandError
+
+from voter_analytics import snapshot
+from voter_analytics.ingest import DEFAULT_BATCH_SIZE, DeltaWriter, InsertWriter, load_csv, load_parallel
+
+
+class Command(BaseCommand):
+    ''' Load a Newton voter CSV file (or several shard files) into the Voter table. '''
+
+    help = 'Stream voter CSV files into the Voter table using batched bulk inserts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('filenames', nargs='+', help='path(s) to voter CSV files or shards')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help=f'rows per INSERT transaction (default {DEFAULT_BATCH_SIZE})')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='parser processes; above 1 files are split into byte ranges '
+                                 'and parsed in parallel while this process does all writes')
+        parser.add_argument('--chunk-mb', type=float, default=4,
+                            help='size of each byte range handed to a worker (parallel mode only)')
+        parser.add_argument('--delta', action='store_true',
+                            help='re-import: upsert only new or changed voters by natural key '
+                                 'and flag voters missing from the file')
+
+    def handle(self, *args, **options):
+        ''' Run the import and report progress after every batch. '''
+
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
+
+        def progress(written, rejected, seconds):
+            rate = written / seconds if seconds else 0
+            self.stdout.write(f'{written} written, {rejected} rejected ({rate:,.0f} rows/sec)')
+
+        writer = DeltaWriter() if options['delta'] else InsertWriter()
+
+        try:
+            if options['workers'] > 1:
+                result = load_parallel(
+                    options['filenames'],
+                    workers=options['workers'],
+                    chunk_bytes=int(options['chunk_mb'] * 1024 * 1024),
+                    batch_size=options['batch_size'],
+                    progress=progress,
+                    writer=writer,
+                )
+            else:
+                result = load_csv(options['filenames'], batch_size=options['batch_size'],
+                                  progress=progress, writer=writer)
+        except OSError as e:
+            raise CommandError(f'could not read input: {e}')
+
+        if result.get('created') or result.get('updated') or result.get('missing'):
+            snapshot.refresh_if_stale()
+
+        seconds = result.pop('seconds')
+        summary = ', '.join(f'{key} {value}' for key, value in result.items())
+        self.stdout.write(self.style.SUCCESS(f'Done in {seconds:.1f}s: {summary}'))
@@ -0,0 +1,20 @@
+# file: voter_analytics/management/commands/refresh_voter_aggregates.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Management command that rebuilds the VoterAggregate cube from the Voter table.
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from voter_analytics import aggregates
+
+
+class Command(BaseCommand):
+    ''' Recompute all precomputed voter counts. The loaders keep the cube up to
+    date on their own; use this after editing voters by hand or in the admin. '''
+
+    help = 'Rebuild the precomputed voter aggregate table from scratch.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            aggregates.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt aggregates for {aggregates.total_voters()} voters'))
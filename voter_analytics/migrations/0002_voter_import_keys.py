@@ -0,0 +1,65 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:05
+
+import hashlib
+
+from django.db import migrations, models
+
+# the imported columns and identity fields as of this migration, in hash order
+COLUMNS = [
+    'last_name', 'first_name', 'street_number', 'street_name', 'apt_number', 'zip_code',
+    'date_of_birth', 'date_of_registration', 'party_affiliation', 'precinct_number',
+    'v20state', 'v21town', 'v21primary', 'v22general', 'v23town', 'voter_score',
+]
+KEY_FIELDS = ['last_name', 'first_name', 'date_of_birth', 'date_of_registration']
+
+
+def _digest(values):
+    text = '\x1f'.join('' if v is None else str(v) for v in values)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def backfill_hashes(apps, schema_editor):
+    ''' Fill natural_key/content_hash for rows loaded before they existed.
+    Rows that repeat an earlier natural key keep a NULL key. '''
+
+    Voter = apps.get_model('voter_analytics', 'Voter')
+    seen = set()
+    batch = []
+    for voter in Voter.objects.only('pk', *COLUMNS).order_by('pk').iterator(chunk_size=5000):
+        natural_key = _digest([str(getattr(voter, f) or '').lower() for f in KEY_FIELDS])
+        voter.content_hash = _digest([getattr(voter, f) for f in COLUMNS])
+        if natural_key not in seen:
+            seen.add(natural_key)
+            voter.natural_key = natural_key
+        batch.append(voter)
+        if len(batch) >= 5000:
+            Voter.objects.bulk_update(batch, ['natural_key', 'content_hash'])
+            batch = []
+    if batch:
+        Voter.objects.bulk_update(batch, ['natural_key', 'content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voter_analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='voter',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='voter',
+            name='missing_from_import',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddField(
+            model_name='voter',
+            name='natural_key',
+            field=models.CharField(blank=True, max_length=32, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_hashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,140 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:20
+
+import hashlib
+
+from django.db import migrations, models, transaction
+
+from voter_analytics.parsing import parse_date
+
+BATCH_SIZE = 2000
+
+# the imported columns and identity fields as of this migration, in hash order
+COLUMNS = [
+    'last_name', 'first_name', 'street_number', 'street_name', 'apt_number', 'zip_code',
+    'date_of_birth', 'date_of_registration', 'party_affiliation', 'precinct_number',
+    'v20state', 'v21town', 'v21primary', 'v22general', 'v23town', 'voter_score',
+]
+KEY_FIELDS = ['last_name', 'first_name', 'date_of_birth', 'date_of_registration']
+
+
+def backfill_dates(apps, schema_editor):
+    ''' Parse the old text dates into the new DateFields, one short transaction
+    per pk range so the table is never locked for the whole run. '''
+
+    Voter = apps.get_model('voter_analytics', 'Voter')
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Voter.objects
+                .filter(pk__gt=last_pk)
+                .order_by('pk')
+                .only('pk', 'date_of_birth', 'date_of_registration')[:BATCH_SIZE]
+            )
+            if not batch:
+                return
+            for voter in batch:
+                voter.birth_date = parse_date(voter.date_of_birth)
+                voter.registration_date = parse_date(voter.date_of_registration)
+                voter.birth_year = voter.birth_date.year if voter.birth_date else None
+            Voter.objects.bulk_update(batch, ['birth_date', 'registration_date', 'birth_year'])
+        last_pk = batch[-1].pk
+
+
+def _digest(values):
+    text = '\x1f'.join('' if v is None else str(v) for v in values)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def rehash(apps, schema_editor):
+    ''' Recompute natural_key and content_hash from the typed dates, the way
+    the loaders hash a parsed row. The old hashes were taken over the date
+    text, so any date not already in ISO form would make the next delta
+    import see a new voter. As in 0002, a row whose key repeats an earlier
+    one keeps a NULL key. '''
+
+    Voter = apps.get_model('voter_analytics', 'Voter')
+    seen = set()
+    changed = []
+    voters = Voter.objects.only('pk', 'natural_key', 'content_hash', *COLUMNS).order_by('pk')
+    for voter in voters.iterator(chunk_size=5000):
+        natural_key = _digest([str(getattr(voter, f) or '').lower() for f in KEY_FIELDS])
+        content_hash = _digest([getattr(voter, f) for f in COLUMNS])
+        if natural_key in seen:
+            natural_key = None
+        else:
+            seen.add(natural_key)
+        if (natural_key, content_hash) != (voter.natural_key, voter.content_hash):
+            voter.natural_key, voter.content_hash = natural_key, content_hash
+            changed.append(voter)
+
+    # clear the keys that move first, so no row takes a key another still holds
+    for i in range(0, len(changed), BATCH_SIZE):
+        Voter.objects.filter(pk__in=[voter.pk for voter in changed[i:i + BATCH_SIZE]]).update(natural_key=None)
+    for i in range(0, len(changed), BATCH_SIZE):
+        with transaction.atomic():
+            Voter.objects.bulk_update(changed[i:i + BATCH_SIZE], ['natural_key', 'content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    # each backfill batch commits on its own
+    atomic = False
+
+    dependencies = [
+        ('voter_analytics', '0002_voter_import_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='voter',
+            name='birth_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='voter',
+            name='registration_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='voter',
+            name='birth_year',
+            field=models.PositiveSmallIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_dates, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='voter',
+            name='date_of_birth',
+        ),
+        migrations.RemoveField(
+            model_name='voter',
+            name='date_of_registration',
+        ),
+        migrations.RenameField(
+            model_name='voter',
+            old_name='birth_date',
+            new_name='date_of_birth',
+        ),
+        migrations.RenameField(
+            model_name='voter',
+            old_name='registration_date',
+            new_name='date_of_registration',
+        ),
+        migrations.RunPython(rehash, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['party_affiliation', 'birth_year'], name='voter_party_birth_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['precinct_number', 'party_affiliation'], name='voter_precinct_party_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['voter_score', 'party_affiliation'], name='voter_score_party_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['zip_code'], name='voter_zip_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:07
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def build_aggregates(apps, schema_editor):
+    ''' Fill the cube from the voters that are already loaded. The cube code
+    in voter_analytics.aggregates grows with later migrations, so the cells
+    that exist at this point are computed here. '''
+
+    Voter = apps.get_model('voter_analytics', 'Voter')
+    VoterAggregate = apps.get_model('voter_analytics', 'VoterAggregate')
+    voters = Voter.objects.filter(missing_from_import=False)
+
+    cells = [VoterAggregate(dimension='total', key_a='', key_b='', count=voters.count())]
+    for row in voters.values('party_affiliation', 'precinct_number').annotate(n=Count('pk')):
+        cells.append(VoterAggregate(dimension='party_precinct', key_a=row['party_affiliation'] or '',
+                                    key_b=row['precinct_number'] or '', count=row['n']))
+    for row in voters.values('birth_year').annotate(n=Count('pk')):
+        cells.append(VoterAggregate(dimension='birth_year', key_a=str(row['birth_year'] or ''),
+                                    key_b='', count=row['n']))
+    for name in ['v20state', 'v21town', 'v21primary', 'v22general', 'v23town']:
+        cells.append(VoterAggregate(dimension='election', key_a=name, key_b='',
+                                    count=voters.filter(**{name: True}).count()))
+    VoterAggregate.objects.bulk_create(cells)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voter_analytics', '0003_voter_typed_dates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoterAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(max_length=20)),
+                ('key_a', models.CharField(blank=True, max_length=20)),
+                ('key_b', models.CharField(blank=True, max_length=20)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('dimension', 'key_a', 'key_b')},
+            },
+        ),
+        migrations.RunPython(build_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:08
+
+from django.db import migrations, models, transaction
+from django.db.models import Count, F
+
+# the elections as of this migration, in bit order (voter_analytics.parsing.ELECTIONS may grow)
+ELECTIONS = ['v20state', 'v21town', 'v21primary', 'v22general', 'v23town']
+
+BATCH_SIZE = 5000
+
+
+def backfill_participation(apps, schema_editor):
+    ''' Set the participation bits from the election flags, one pk range per
+    transaction, then rebuild the aggregate cube so it gains the mask cells.
+    The cube is computed here rather than by voter_analytics.aggregates, whose
+    code follows the current models, not the ones at this migration. '''
+
+    Voter = apps.get_model('voter_analytics', 'Voter')
+    VoterAggregate = apps.get_model('voter_analytics', 'VoterAggregate')
+    last_pk = Voter.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+    for lo in range(0, last_pk, BATCH_SIZE):
+        with transaction.atomic():
+            voters = Voter.objects.filter(pk__gt=lo, pk__lte=lo + BATCH_SIZE)
+            for i, name in enumerate(ELECTIONS):
+                voters.filter(**{name: True}).update(participation=F('participation').bitor(1 << i))
+
+    voters = Voter.objects.filter(missing_from_import=False)
+    cells = [VoterAggregate(dimension='total', key_a='', key_b='', count=voters.count())]
+    for row in voters.values('party_affiliation', 'precinct_number').annotate(n=Count('pk')):
+        cells.append(VoterAggregate(dimension='party_precinct', key_a=row['party_affiliation'] or '',
+                                    key_b=row['precinct_number'] or '', count=row['n']))
+    for row in voters.values('birth_year').annotate(n=Count('pk')):
+        cells.append(VoterAggregate(dimension='birth_year', key_a=str(row['birth_year'] or ''),
+                                    key_b='', count=row['n']))
+    for row in voters.values('participation').annotate(n=Count('pk')):
+        cells.append(VoterAggregate(dimension='participation', key_a=str(row['participation']),
+                                    key_b='', count=row['n']))
+    for name in ELECTIONS:
+        cells.append(VoterAggregate(dimension='election', key_a=name, key_b='',
+                                    count=voters.filter(**{name: True}).count()))
+    with transaction.atomic():
+        VoterAggregate.objects.all().delete()
+        VoterAggregate.objects.bulk_create(cells)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voter_analytics', '0004_voteraggregate'),
+    ]
+
+    # each backfill batch commits on its own
+    atomic = False
+
+    operations = [
+        migrations.AddField(
+            model_name='voter',
+            name='participation',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(backfill_participation, migrations.RunPython.noop),
+    ]
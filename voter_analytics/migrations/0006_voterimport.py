@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voter_analytics', '0005_voter_participation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoterImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mode', models.CharField(max_length=20)),
+                ('finished', models.DateTimeField(auto_now_add=True)),
+                ('created', models.IntegerField(default=0)),
+                ('updated', models.IntegerField(default=0)),
+                ('missing', models.IntegerField(default=0)),
+                ('rejected', models.IntegerField(default=0)),
+                ('rows_changed', models.IntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voter_analytics', '0007_voter_name_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='voter',
+            name='participation',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+    ]
@@ -1,7 +1,59 @@
 from django.db import models
+from django.db.models import Count, F, Value
+
+from .parsing import ELECTIONS, election_bit, participation_mask
 
 # Create your models here.
 
+class VoterQuerySet(models.QuerySet):
+    '''Participation queries answered from the Voter.participation bitmask.'''
+
+    # while there are few enough masks to list them all, filters become an
+    # indexed participation IN (...) lookup instead of a bitwise scan
+    MAX_LISTED_MASKS = 1024
+
+    def _masks(self, predicate):
+        '''Return every possible mask value for which predicate(mask) is true.'''
+        return [m for m in range(1 << len(ELECTIONS)) if predicate(m)]
+
+    def _bits(self, elections):
+        '''Return the mask with the bits of the named elections set.'''
+        bits = 0
+        for name in elections:
+            bits |= election_bit(name)
+        return bits
+
+    def _listable(self):
+        '''Return True while every possible mask fits in one IN list.'''
+        return (1 << len(ELECTIONS)) <= self.MAX_LISTED_MASKS
+
+    def voted_in(self, *elections):
+        '''Voters who voted in every one of the named elections (and maybe others).'''
+        bits = self._bits(elections)
+        if self._listable():
+            return self.filter(participation__in=self._masks(lambda m: m & bits == bits))
+        return self.alias(_voted=F('participation').bitand(bits)).filter(_voted=bits)
+
+    def voted_exactly(self, *elections):
+        '''Voters who voted in the named elections and in no others.'''
+        return self.filter(participation=self._bits(elections))
+
+    def voted_at_least(self, n):
+        '''Voters who voted in at least n of the tracked elections.'''
+        if self._listable():
+            return self.filter(participation__in=self._masks(lambda m: m.bit_count() >= n))
+        # count the set bits in SQL: one 0/1 term per election
+        voted = sum((F('participation').bitrightshift(i).bitand(1) for i in range(len(ELECTIONS))), Value(0))
+        return self.alias(_voted=voted).filter(_voted__gte=n)
+
+    def participation_distribution(self):
+        '''Return {number of elections voted in: voter count} in one GROUP BY pass.'''
+        result = {n: 0 for n in range(len(ELECTIONS) + 1)}
+        for row in self.values('participation').annotate(n=Count('pk')).order_by():
+            result[row['participation'].bit_count()] += row['n']
+        return result
+
+
 class Voter(models.Model):
     '''Store one registered voter from Newton, MA.'''
 
@@ -16,8 +68,11 @@ class Voter(models.Model):
     zip_code      = models.CharField(max_length=10, blank=True, null=True)
 
     # dates
-    date_of_birth        = models.TextField(blank=True, null=True)
-    date_of_registration = models.TextField(blank=True, null=True)
+    date_of_birth        = models.DateField(blank=True, null=True)
+    date_of_registration = models.DateField(blank=True, null=True)
+
+    # derived from date_of_birth, so year-range filters hit an integer index
+    birth_year = models.PositiveSmallIntegerField(blank=True, null=True, db_index=True)
 
     # party
     party_affiliation = models.CharField(max_length=2, blank=True, null=True)
@@ -32,87 +87,88 @@ class Voter(models.Model):
     v22general  = models.BooleanField(default=False)
     v23town     = models.BooleanField(default=False)
 
+    # bit i set when the voter voted in ELECTIONS[i]; kept in sync with the flags above.
+    # A full integer column leaves room for 31 elections on every backend.
+    participation = models.PositiveIntegerField(default=0, db_index=True)
+
     # score
     voter_score = models.IntegerField(default=0)
 
+    # import bookkeeping: stable identity, fingerprint of the imported columns,
+    # and whether the voter was absent from the most recent delta import
+    natural_key = models.CharField(max_length=32, unique=True, blank=True, null=True)
+    content_hash = models.CharField(max_length=32, blank=True)
+    missing_from_import = models.BooleanField(default=False, db_index=True)
+
+    objects = VoterQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['party_affiliation', 'birth_year'], name='voter_party_birth_idx'),
+            models.Index(fields=['precinct_number', 'party_affiliation'], name='voter_precinct_party_idx'),
+            models.Index(fields=['voter_score', 'party_affiliation'], name='voter_score_party_idx'),
+            models.Index(fields=['zip_code'], name='voter_zip_idx'),
+            # keyset pagination order of the search view
+            models.Index(fields=['last_name', 'first_name', 'id'], name='voter_name_keyset_idx'),
+        ]
+
     def __str__(self):
         '''Return string representation of the Voter instance'''
         return f'{self.last_name}, {self.first_name} (P:{self.party_affiliation or "NA"}; Precinct:{self.precinct_number or "-"}) — Score {self.voter_score}'
 
+    def save(self, *args, **kwargs):
+        '''Keep birth_year and the participation mask in step with the raw fields before saving.'''
+        self.birth_year = self.date_of_birth.year if self.date_of_birth else None
+        self.participation = participation_mask(self)
+        super().save(*args, **kwargs)
+
+
+class VoterAggregate(models.Model):
+    '''One precomputed count for the analytics pages, e.g. voters in party D
+    and precinct 1 (dimension="party_precinct", key_a="D", key_b="1").
+    Maintained by voter_analytics.aggregates.'''
+
+    dimension = models.CharField(max_length=20)
+    key_a = models.CharField(max_length=20, blank=True)
+    key_b = models.CharField(max_length=20, blank=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('dimension', 'key_a', 'key_b')
+
+    def __str__(self):
+        '''Return string representation of the cell'''
+        return f'{self.dimension}[{self.key_a},{self.key_b}] = {self.count}'
+
+
+class VoterImport(models.Model):
+    '''One run of a voter loader. The latest run that changed rows is the
+    data version used to invalidate snapshots and cached counts.'''
+
+    mode = models.CharField(max_length=20)
+    finished = models.DateTimeField(auto_now_add=True)
+    created = models.IntegerField(default=0)
+    updated = models.IntegerField(default=0)
+    missing = models.IntegerField(default=0)
+    rejected = models.IntegerField(default=0)
+    rows_changed = models.IntegerField(default=0)
+
+    def __str__(self):
+        '''Return string representation of the import run'''
+        return f'{self.mode} import at {self.finished}: {self.rows_changed} rows changed'
+
+    @classmethod
+    def data_version(cls):
+        '''Return the id of the last import that changed voters (0 if none).'''
+        return cls.objects.filter(rows_changed__gt=0).order_by('-pk').values_list('pk', flat=True).first() or 0
+
+
+def load_data(filename='newton_voters.csv'):
+    '''Function to load data records from CSV file into the Django database.
+    Kept for shell use; see the load_voters management command.'''
+
+    from .ingest import load_csv
 
-def load_data():
-    '''Function to load data records from CSV file into the Django database.'''
-
-    filename = '\Users\evren\Downloads\newton_voters.csv'
-    f = open(filename, 'r')  # open the file for reading
-
-    # discard headers:
-    f.readline()
-
-    # helper to coerce Y/N-ish strings to bool (kept inline; no extra imports)
-    def as_bool(s):
-        if not s:
-            return False
-        s = s.strip().lower()
-        return s in ('y', 'yes', 'true', 't', '1', 'x')
-
-    created = 0
-
-    # read the entire file, one line at a time (simple split like your marathon sample)
-    for line in f:
-        try:
-            fields = line.strip().split(',')
-
-            # index map
-            #  0: Last Name
-            #  1: First Name
-            #  2: Residential Address - Street Number
-            #  3: Residential Address - Street Name
-            #  4: Residential Address - Apartment Number
-            #  5: Residential Address - Zip Code
-            #  6: Date of Birth
-            #  7: Date of Registration
-            #  8: Party Affiliation
-            #  9: Precinct Number
-            # 10: v20state
-            # 11: v21town
-            # 12: v21primary
-            # 13: v22general
-            # 14: v23town
-            # 15: voter_score
-
-            voter = Voter(
-                last_name=fields[0].strip(),
-                first_name=fields[1].strip(),
-
-                street_number=fields[2].strip() or None,
-                street_name=fields[3].strip() or None,
-                apt_number=fields[4].strip() or None,
-                zip_code=fields[5].strip() or None,
-
-                # keep dates as text to avoid extra parsing imports
-                date_of_birth=fields[6].strip() or None,
-                date_of_registration=fields[7].strip() or None,
-
-                # 2-char party
-                party_affiliation=(fields[8].strip()[:2] if fields[8].strip() else None),
-
-                precinct_number=fields[9].strip() or None,
-
-                v20state=as_bool(fields[10] if len(fields) > 10 else ''),
-                v21town=as_bool(fields[11] if len(fields) > 11 else ''),
-                v21primary=as_bool(fields[12] if len(fields) > 12 else ''),
-                v22general=as_bool(fields[13] if len(fields) > 13 else ''),
-                v23town=as_bool(fields[14] if len(fields) > 14 else ''),
-
-                voter_score=int(fields[15].strip()) if len(fields) > 15 and fields[15].strip().isdigit() else 0,
-            )
-
-            voter.save()
-            created += 1
-
-        except Exception:
-            print("Something went wrong!")
-            print(f"line={line}")
-
-    print(f"Done. Created {created} Voters")
+    result = load_csv(filename)
+    print(f"Done. Created {result['created']} Voters, rejected {result['rejected']} rows, "
+          f"skipped {result['duplicates']} duplicates")
@@ -0,0 +1,214 @@
+# file: voter_analytics/parsing.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Django-free parsing of the Newton voter CSV, safe to import in worker processes.
+
+import csv
+import datetime
+import hashlib
+import io
+import os
+
+# column order of the Newton voter export (header row is skipped)
+COLUMNS = [
+    'last_name',             #  0: Last Name
+    'first_name',            #  1: First Name
+    'street_number',         #  2: Residential Address - Street Number
+    'street_name',           #  3: Residential Address - Street Name
+    'apt_number',            #  4: Residential Address - Apartment Number
+    'zip_code',              #  5: Residential Address - Zip Code
+    'date_of_birth',         #  6: Date of Birth
+    'date_of_registration',  #  7: Date of Registration
+    'party_affiliation',     #  8: Party Affiliation
+    'precinct_number',       #  9: Precinct Number
+    'v20state',              # 10
+    'v21town',               # 11
+    'v21primary',            # 12
+    'v22general',            # 13
+    'v23town',               # 14
+    'voter_score',           # 15
+]
+
+ELECTIONS = ['v20state', 'v21town', 'v21primary', 'v22general', 'v23town']
+
+# values stored on Voter that are computed from the columns above
+DERIVED = ['birth_year', 'participation']
+
+DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%m/%d/%y']
+
+# fields that identify the same voter across exports
+KEY_FIELDS = ['last_name', 'first_name', 'date_of_birth', 'date_of_registration']
+
+
+class RowError(ValueError):
+    ''' Raised when a CSV row cannot be turned into a Voter. '''
+
+
+def as_bool(s):
+    ''' Coerce a Y/N-ish string to bool. '''
+
+    if not s:
+        return False
+    return s.strip().lower() in ('y', 'yes', 'true', 't', '1', 'x')
+
+
+def election_bit(name):
+    ''' Return the participation bit for one election field name. '''
+
+    return 1 << ELECTIONS.index(name)
+
+
+def participation_mask(row):
+    ''' Pack the election flags of a row (dict or object) into one integer;
+    bit i is set when the voter voted in ELECTIONS[i]. '''
+
+    get = row.get if isinstance(row, dict) else lambda name: getattr(row, name)
+    mask = 0
+    for i, name in enumerate(ELECTIONS):
+        if get(name):
+            mask |= 1 << i
+    return mask
+
+
+def parse_date(s):
+    ''' Parse a date in one of DATE_FORMATS; return None if blank or unrecognised. '''
+
+    if isinstance(s, datetime.date) or not s:
+        return s or None
+    s = s.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(s, fmt).date()
+        except ValueError:
+            pass
+    return None
+
+
+def parse_row(fields):
+    ''' Turn one list of CSV fields into a dict of Voter field values.
+    Raises RowError if the row is unusable. '''
+
+    if len(fields) < 10:
+        raise RowError(f'expected at least 10 columns, got {len(fields)}')
+
+    fields = [f.strip() for f in fields]
+    last_name, first_name = fields[0], fields[1]
+    if not last_name or not first_name:
+        raise RowError('missing name')
+
+    score = fields[15] if len(fields) > 15 else ''
+
+    row = {
+        'last_name': last_name[:100],
+        'first_name': first_name[:100],
+        'street_number': fields[2] or None,
+        'street_name': fields[3] or None,
+        'apt_number': fields[4] or None,
+        'zip_code': fields[5] or None,
+        'date_of_birth': parse_date(fields[6]),
+        'date_of_registration': parse_date(fields[7]),
+        'party_affiliation': fields[8][:2] or None,
+        'precinct_number': fields[9] or None,
+        'voter_score': int(score) if score.isdigit() else 0,
+    }
+    for i, name in enumerate(ELECTIONS, start=10):
+        row[name] = as_bool(fields[i] if len(fields) > i else '')
+
+    row['birth_year'] = row['date_of_birth'].year if row['date_of_birth'] else None
+    row['participation'] = participation_mask(row)
+    row['natural_key'], row['content_hash'] = row_hashes(row)
+    return row
+
+
+def _digest(values):
+    ''' Return a short hex digest of a list of field values. '''
+
+    text = '\x1f'.join('' if v is None else str(v) for v in values)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def row_hashes(row):
+    ''' Return (natural_key, content_hash) for a dict of Voter field values.
+    The natural key is stable for one person; the content hash changes when
+    any imported column changes. '''
+
+    natural_key = _digest([str(row[f] or '').lower() for f in KEY_FIELDS])
+    content_hash = _digest([row[f] for f in COLUMNS])
+    return natural_key, content_hash
+
+
+def iter_rows(f, skip_header=True):
+    ''' Yield (line_number, row_dict or None, error or None) for each record in the
+    open file f, reading it one record at a time. '''
+
+    reader = csv.reader(f)
+    if skip_header:
+        next(reader, None)
+
+    for fields in reader:
+        if not fields:
+            continue
+        try:
+            yield reader.line_num, parse_row(fields), None
+        except (RowError, ValueError, IndexError) as e:
+            yield reader.line_num, None, e
+
+
+def iter_batches(rows, batch_size):
+    ''' Group parsed rows into lists of at most batch_size, counting rejects.
+    Yields (batch, rejected_so_far); the last batch may be empty so the final
+    reject count is always reported. '''
+
+    batch = []
+    rejected = 0
+    for line_num, row, error in rows:
+        if error is not None:
+            rejected += 1
+            continue
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch, rejected
+            batch = []
+    yield batch, rejected
+
+
+def split_ranges(filename, chunk_bytes, skip_header=True):
+    ''' Split filename into (filename, start, end) byte ranges of about chunk_bytes,
+    each starting at the beginning of a line. Assumes one record per line, which
+    holds for the voter export; quoted fields with embedded newlines need the
+    serial loader. '''
+
+    size = os.path.getsize(filename)
+    ranges = []
+    with open(filename, 'rb') as f:
+        start = 0
+        if skip_header:
+            f.readline()
+            start = f.tell()
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            if f.tell() < size:
+                f.readline()  # move to the start of the next line
+            end = f.tell()
+            ranges.append((filename, start, end))
+            start = end
+    return ranges
+
+
+def parse_range(args):
+    ''' Worker entry point: parse the byte range (filename, start, end).
+    Returns (rows, rejected) where rows is a list of Voter field dicts. '''
+
+    filename, start, end = args
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    text = io.StringIO(data.decode('utf-8', errors='replace'), newline='')
+    rows = []
+    rejected = 0
+    for line_num, row, error in iter_rows(text, skip_header=False):
+        if error is not None:
+            rejected += 1
+        else:
+            rows.append(row)
+    return rows, rejected
@@ -0,0 +1,204 @@
+# file: voter_analytics/snapshot.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Columnar NumPy snapshot of the Voter table, memory-mapped for vectorized analytics.
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+from django.conf import settings
+
+from .models import Voter, VoterImport
+from .parsing import ELECTIONS
+
+# numeric columns: Voter field -> (array dtype, value stored for NULL)
+NUMERIC = {
+    'pk': (np.int64, 0),
+    'birth_year': (np.int16, 0),
+    'voter_score': (np.int16, 0),
+    'participation': (np.uint16, 0),
+}
+
+# dictionary-encoded columns: Voter field -> code dtype; code 0 means blank/NULL
+CATEGORICAL = {
+    'party_affiliation': np.uint8,
+    'precinct_number': np.uint16,
+    'zip_code': np.uint16,
+}
+
+CHUNK_SIZE = 20000
+
+_lock = threading.Lock()
+_loaded = None
+
+
+def snapshot_root():
+    ''' Directory holding snapshot versions (settings.VOTER_SNAPSHOT_DIR). '''
+
+    return getattr(settings, 'VOTER_SNAPSHOT_DIR', os.path.join(settings.BASE_DIR, 'voter_snapshot'))
+
+
+class Snapshot:
+    ''' A read-only set of memory-mapped column arrays for one data version.
+    Every process that opens the same version shares the page cache. '''
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.path = path
+        self.version = meta['version']
+        self.size = meta['size']
+        self.vocabulary = meta['vocabulary']
+        self.columns = {
+            name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+            for name in list(NUMERIC) + list(CATEGORICAL)
+        }
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def code(self, column, value):
+        ''' Return the dictionary code of value in a categorical column (-1 if absent). '''
+
+        vocabulary = self.vocabulary[column]
+        return vocabulary.index(value) if value in vocabulary else -1
+
+
+def build(version=None):
+    ''' Export the current voters into a new snapshot directory and return its path.
+    Arrays are filled chunk by chunk from a server-side iterator, then the
+    directory is moved into place in one rename. '''
+
+    version = VoterImport.data_version() if version is None else version
+    root = snapshot_root()
+    os.makedirs(root, exist_ok=True)
+
+    voters = Voter.objects.filter(missing_from_import=False).order_by('pk')
+    size = voters.count()
+    arrays = {name: np.zeros(size, dtype=dtype) for name, (dtype, null) in NUMERIC.items()}
+    arrays.update({name: np.zeros(size, dtype=dtype) for name, dtype in CATEGORICAL.items()})
+    vocabulary = {name: [''] for name in CATEGORICAL}
+    codes = {name: {'': 0} for name in CATEGORICAL}
+
+    fields = list(NUMERIC) + list(CATEGORICAL)
+    for i, row in enumerate(voters.values_list(*fields).iterator(chunk_size=CHUNK_SIZE)):
+        if i >= size:
+            break  # rows inserted while building belong to the next version
+        for name, value in zip(fields, row):
+            if name in CATEGORICAL:
+                value = value or ''
+                code = codes[name].get(value)
+                if code is None:
+                    code = codes[name][value] = len(vocabulary[name])
+                    vocabulary[name].append(value)
+                arrays[name][i] = code
+            else:
+                arrays[name][i] = NUMERIC[name][1] if value is None else value
+
+    tmp = tempfile.mkdtemp(prefix='.building-', dir=root)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp, f'{name}.npy'), array)
+    with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+        json.dump({'version': version, 'size': size, 'vocabulary': vocabulary}, f)
+
+    target = os.path.join(root, f'v{version}')
+    try:
+        os.rename(tmp, target)
+    except OSError:
+        # another process published this version first
+        shutil.rmtree(tmp, ignore_errors=True)
+    _prune(root, keep=target)
+    return target
+
+
+def _prune(root, keep):
+    ''' Remove older snapshot versions. Processes that still map them keep
+    their open files until they reload. '''
+
+    for entry in os.listdir(root):
+        path = os.path.join(root, entry)
+        if entry.startswith('v') and path != keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def load():
+    ''' Return the Snapshot for the current data version, building it first if
+    an import has changed the table since the last build. '''
+
+    global _loaded
+    version = VoterImport.data_version()
+    with _lock:
+        if _loaded is not None and _loaded.version == version:
+            return _loaded
+        path = os.path.join(snapshot_root(), f'v{version}')
+        if not os.path.exists(os.path.join(path, 'meta.json')):
+            path = build(version)
+        _loaded = Snapshot(path)
+        return _loaded
+
+
+def refresh_if_stale():
+    ''' Rebuild the snapshot after an import, but only if one has been built
+    before, so loaders don't pay for snapshots nobody reads. '''
+
+    root = snapshot_root()
+    if os.path.isdir(root) and any(entry.startswith('v') for entry in os.listdir(root)):
+        load()
+
+
+def _value_counts(snap, column, mask=None):
+    ''' Return {decoded value: count} for a categorical column. '''
+
+    codes = snap[column] if mask is None else snap[column][mask]
+    counts = np.bincount(codes, minlength=len(snap.vocabulary[column]))
+    return {snap.vocabulary[column][code]: int(n) for code, n in enumerate(counts) if n}
+
+
+def party_distribution(snap=None, mask=None):
+    ''' Return {party: count}, optionally for voters selected by a boolean mask. '''
+
+    return _value_counts(snap or load(), 'party_affiliation', mask)
+
+
+def precinct_distribution(snap=None, mask=None):
+    ''' Return {precinct: count}. '''
+
+    return _value_counts(snap or load(), 'precinct_number', mask)
+
+
+def birth_year_histogram(snap=None, bucket=1, mask=None):
+    ''' Return {first year of bucket: count} for voters with a known birth year. '''
+
+    snap = snap or load()
+    years = snap['birth_year'] if mask is None else snap['birth_year'][mask]
+    years = years[years > 0]
+    if not len(years):
+        return {}
+    buckets, counts = np.unique(years - years % bucket, return_counts=True)
+    return {int(b): int(n) for b, n in zip(buckets, counts)}
+
+
+def score_distribution(snap=None, mask=None):
+    ''' Return {voter_score: count}. '''
+
+    snap = snap or load()
+    scores = snap['voter_score'] if mask is None else snap['voter_score'][mask]
+    counts = np.bincount(np.clip(scores, 0, None))
+    return {score: int(n) for score, n in enumerate(counts) if n}
+
+
+def election_turnout(snap=None, mask=None):
+    ''' Return {election field name: number of voters who voted in it}. '''
+
+    snap = snap or load()
+    bits = snap['participation'] if mask is None else snap['participation'][mask]
+    return {name: int(np.count_nonzero(bits & (1 << i))) for i, name in enumerate(ELECTIONS)}
+
+
+def party_mask(snap, party):
+    ''' Boolean mask of voters in the given party, for the functions above. '''
+
+    return snap['party_affiliation'] == snap.code('party_affiliation', party)
@@ -0,0 +1,134 @@
+# file: voter_analytics/synthetic.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Deterministic generator of Newton-like voter CSV files for tests and benchmarks.
+
+import csv
+import datetime
+import random
+
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+    'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor',
+    'Moore', 'Jackson', 'Martin', 'Lee', 'Perez', 'Thompson', 'White', 'Harris', 'Sanchez',
+    'Clark', 'Ramirez', 'Lewis', 'Robinson', 'Walker', 'Young', 'Allen', 'King', 'Wright',
+    'Scott', 'Torres', 'Nguyen', 'Hill', 'Flores', 'Green', 'Adams', 'Nelson', 'Baker', 'Hall',
+    'Rivera', 'Campbell', 'Mitchell', 'Carter', 'Roberts', 'Cohen', 'Murphy', "O'Brien", 'Kelly',
+    'Sullivan', 'Chen', 'Wang', 'Kim', 'Patel', 'Shah', 'Goldberg', 'Rossi', 'McCarthy',
+]
+
+FIRST_NAMES = [
+    'James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David',
+    'Elizabeth', 'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas',
+    'Sarah', 'Charles', 'Karen', 'Daniel', 'Lisa', 'Matthew', 'Nancy', 'Anthony', 'Betty',
+    'Mark', 'Sandra', 'Steven', 'Ashley', 'Paul', 'Emily', 'Andrew', 'Michelle', 'Joshua',
+    'Amanda', 'Kevin', 'Melissa', 'Brian', 'Stephanie', 'Wei', 'Priya', 'Ana', 'Noah', 'Olivia',
+]
+
+STREETS = [
+    'Commonwealth Ave', 'Beacon St', 'Washington St', 'Walnut St', 'Centre St', 'Chestnut St',
+    'Lowell Ave', 'Waltham St', 'Boylston St', 'Highland St', 'Auburndale Ave', 'Lexington St',
+    'Homer St', 'Crafts St', 'Cabot St', 'Parker St', 'Dedham St', 'Hammond St', 'Ward St',
+]
+
+ZIP_CODES = ['02458', '02459', '02460', '02461', '02462', '02464', '02465', '02466', '02467', '02468']
+
+# Newton party enrollment is roughly 55% unenrolled, a third Democratic, under 10% Republican
+PARTIES = [('U ', 55), ('D ', 33), ('R ', 8), ('L ', 1), ('J ', 1), ('CC', 1), ('GR', 1)]
+
+# 8 wards x 4 precincts, e.g. "3B" for ward 3 precinct B
+PRECINCTS = [f'{ward}{letter}' for ward in range(1, 9) for letter in 'ABCD']
+
+# base turnout of each election column, in export order
+TURNOUT = [0.80, 0.35, 0.20, 0.65, 0.30]
+
+HEADER = [
+    'Last Name', 'First Name', 'Residential Address - Street Number',
+    'Residential Address - Street Name', 'Residential Address - Apartment Number',
+    'Residential Address - Zip Code', 'Date of Birth', 'Date of Registration',
+    'Party Affiliation', 'Precinct Number', 'v20state', 'v21town', 'v21primary',
+    'v22general', 'v23town', 'voter_score',
+]
+
+
+def _weighted(rng, choices):
+    ''' Pick a value from a list of (value, weight) pairs. '''
+
+    return rng.choices([c[0] for c in choices], weights=[c[1] for c in choices])[0]
+
+
+def voter_row(rng, today=datetime.date(2024, 1, 1)):
+    ''' Return one realistic list of CSV fields. '''
+
+    age = min(max(int(rng.gauss(48, 18)), 18), 100)
+    birth = today - datetime.timedelta(days=age * 365 + rng.randrange(365))
+    years_registered = rng.randrange(max(age - 18, 1))
+    registration = today - datetime.timedelta(days=years_registered * 365 + rng.randrange(365))
+
+    # older voters turn out more often; each voter has one propensity for all elections
+    propensity = min(1.0, 0.4 + age / 100 + rng.uniform(-0.3, 0.3))
+    flags = [rng.random() < min(1.0, t * propensity * 1.3) for t in TURNOUT]
+
+    street = rng.choice(STREETS)
+    if rng.random() < 0.01:
+        street += ', Rear'  # a comma that must survive as a quoted field
+
+    return [
+        rng.choice(LAST_NAMES),
+        rng.choice(FIRST_NAMES),
+        str(rng.randrange(1, 2000)),
+        street,
+        str(rng.randrange(1, 30)) if rng.random() < 0.2 else '',
+        rng.choice(ZIP_CODES),
+        birth.isoformat(),
+        registration.isoformat(),
+        _weighted(rng, PARTIES),
+        rng.choice(PRECINCTS),
+    ] + ['TRUE' if f else 'FALSE' for f in flags] + [str(sum(flags))]
+
+
+def malformed_row(rng):
+    ''' Return one broken line of the kinds real exports contain. '''
+
+    kind = rng.randrange(3)
+    if kind == 0:
+        return ['Truncated', 'Row', '12']
+    if kind == 1:
+        return ['', '', '', '', '', '', '', '', '', '']
+    return ['Garbage']
+
+
+def change_row(rng, fields):
+    ''' Simulate a voter's record changing between two exports: a move, a
+    party switch, or a new election voted in. '''
+
+    kind = rng.randrange(3)
+    if kind == 0:
+        fields[2] = str(rng.randrange(1, 2000))
+        fields[3] = rng.choice(STREETS)
+    elif kind == 1:
+        fields[8] = _weighted(rng, PARTIES)
+    else:
+        fields[14] = 'TRUE'
+        fields[15] = str(sum(f == 'TRUE' for f in fields[10:15]))
+    return fields
+
+
+def generate_csv(filename, rows, seed=412, malformed_rate=0.002, changed_rate=0.0):
+    ''' Write a header plus rows records (some malformed) to filename.
+    The same seed and row count always produce the same file. With
+    changed_rate > 0 the file is a later export of the same voters in which
+    about that fraction of records changed, for delta re-import runs. '''
+
+    rng = random.Random(seed)
+    change_rng = random.Random(seed + 1)
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for _ in range(rows):
+            if rng.random() < malformed_rate:
+                writer.writerow(malformed_row(rng))
+                continue
+            fields = voter_row(rng)
+            if changed_rate and change_rng.random() < changed_rate:
+                fields = change_row(change_rng, fields)
+            writer.writerow(fields)
@@ -1,3 +1,373 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from . import aggregates, snapshot
+from .ingest import DeltaWriter, InsertWriter, load_csv, load_parallel
+from .models import Voter, VoterAggregate, VoterImport
+from .parsing import ELECTIONS, iter_rows, parse_row
+from .synthetic import HEADER, generate_csv
+from .views import EXPORT_FIELDS, PAGE_SIZE
 
 # Create your tests here.
+
+
+def fields(last, first, street='Beacon St', party='D', precinct='1A', born='1980-05-01', voted=(), score=None):
+    ''' Return one list of CSV fields in export order. '''
+
+    flags = ['TRUE' if name in voted else 'FALSE' for name in ELECTIONS]
+    return [last, first, '12', street, '', '02459', born, '2000-01-02', party, precinct,
+            *flags, str(len(voted) if score is None else score)]
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+
+
+def stored_cube():
+    ''' Return the non-empty VoterAggregate cells as {(dimension, key_a, key_b): count}. '''
+
+    return {(a.dimension, a.key_a, a.key_b): a.count for a in VoterAggregate.objects.all() if a.count}
+
+
+class CubeMixin:
+    ''' Compare the incrementally maintained cube to one rebuilt from scratch. '''
+
+    def assertCubeMatchesRebuild(self):
+        incremental = stored_cube()
+        aggregates.rebuild()
+        self.assertEqual(incremental, stored_cube())
+
+
+class ParsingTests(TestCase):
+    ''' A CSV record turns into Voter field values, or into a reject. '''
+
+    def test_parse_row(self):
+        row = parse_row(fields(' Smith ', 'Ann', party='DEM', born='05/01/1980', voted=['v20state', 'v22general']))
+        self.assertEqual(row['last_name'], 'Smith')
+        self.assertEqual(row['party_affiliation'], 'DE')
+        self.assertEqual(row['date_of_birth'], datetime.date(1980, 5, 1))
+        self.assertEqual(row['birth_year'], 1980)
+        self.assertIsNone(row['apt_number'])
+        self.assertTrue(row['v20state'] and row['v22general'] and not row['v21town'])
+        self.assertEqual(row['participation'], 0b01001)
+        self.assertEqual(row['voter_score'], 2)
+
+        # the same person: a new address changes the content, not the identity
+        moved = parse_row(fields('Smith', 'Ann', street='Walnut St', party='DEM', born='1980-05-01',
+                                 voted=['v20state', 'v22general']))
+        self.assertEqual(moved['natural_key'], row['natural_key'])
+        self.assertNotEqual(moved['content_hash'], row['content_hash'])
+
+    def test_iter_rows_rejects_bad_rows(self):
+        text = io.StringIO()
+        writer = csv.writer(text)
+        writer.writerow(HEADER)
+        writer.writerow(fields('Smith', 'Ann', street='Beacon St, Rear'))
+        writer.writerow(['Truncated', 'Row', '12'])
+        writer.writerow(fields('', 'Nameless'))
+        text.write('\n')
+        writer.writerow(fields('Jones', 'Bob', voted=ELECTIONS))
+        text.seek(0)
+
+        results = list(iter_rows(text))
+        self.assertEqual([row is not None for _, row, _ in results], [True, False, False, True])
+        self.assertEqual([error is not None for _, _, error in results], [False, True, True, False])
+        # the quoted comma stays inside the street name
+        self.assertEqual(results[0][1]['street_name'], 'Beacon St, Rear')
+        self.assertEqual(results[0][1]['precinct_number'], '1A')
+        self.assertEqual(results[3][1]['participation'], 0b11111)
+
+
+class IngestTests(CubeMixin, TestCase):
+    ''' The loaders write the same rows whichever path they take, and keep the cube in step. '''
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def loaded(self):
+        return sorted(Voter.objects.values_list('natural_key', 'content_hash', 'missing_from_import'))
+
+    def test_load_csv(self):
+        rows = [fields(f'Name{i}', 'X', voted=ELECTIONS[:i % 3]) for i in range(7)]
+        rows.insert(3, ['Truncated', 'Row'])
+        rows.append(fields('', 'Nameless'))
+        write_csv(self.path('voters.csv'), rows)
+
+        progress = []
+        counts = load_csv(self.path('voters.csv'), batch_size=3, progress=lambda *args: progress.append(args[:2]))
+        self.assertEqual((counts['created'], counts['rejected']), (7, 2))
+        self.assertEqual(Voter.objects.count(), 7)
+        self.assertEqual(aggregates.total_voters(), 7)
+        self.assertCubeMatchesRebuild()
+        # one report per full batch, then the final partial batch
+        self.assertEqual(progress, [(3, 0), (6, 1), (7, 2)])
+
+    def test_serial_and_parallel_load_the_same_rows(self):
+        rows = [
+            fields(f'Name{i}', f'First{i}', street=f'{i} Beacon St, Rear', party='DR'[i % 2],
+                   voted=ELECTIONS[:i % 4])
+            for i in range(600)
+        ]
+        for i in range(0, 600, 97):
+            rows[i] = ['Truncated', 'Row']
+        # the same voters again, some in another shard's byte range
+        for i in range(50, 600, 151):
+            rows[i] = rows[i - 40]
+        write_csv(self.path('voters.csv'), rows)
+
+        serial = load_csv(self.path('voters.csv'), batch_size=100)
+        serial_rows = self.loaded()
+        self.assertCubeMatchesRebuild()
+
+        Voter.objects.all().delete()
+        VoterAggregate.objects.all().delete()
+        # small ranges so every worker parses several of them
+        parallel = load_parallel([self.path('voters.csv')], workers=2, chunk_bytes=4 * 1024, batch_size=100)
+        self.assertEqual(self.loaded(), serial_rows)
+        self.assertCubeMatchesRebuild()
+        for key in ('created', 'duplicates', 'rejected'):
+            self.assertEqual(parallel[key], serial[key], key)
+        self.assertEqual((serial['created'], serial['duplicates'], serial['rejected']), (589, 4, 7))
+
+    def test_delta_counts(self):
+        ann, bob, cat, dan = (fields(name, 'X', voted=['v20state']) for name in ('Ann', 'Bob', 'Cat', 'Dan'))
+        write_csv(self.path('week1.csv'), [ann, bob, cat, dan])
+        load_csv(self.path('week1.csv'))
+
+        # Bob changed party, Cat left, Eve is new
+        bob_switched = fields('Bob', 'X', party='R', voted=['v20state'])
+        eve = fields('Eve', 'X', voted=ELECTIONS)
+        write_csv(self.path('week2.csv'), [ann, bob_switched, dan, eve])
+        counts = load_csv(self.path('week2.csv'), writer=DeltaWriter())
+        self.assertEqual(
+            {key: counts[key] for key in ('created', 'updated', 'unchanged', 'missing')},
+            {'created': 1, 'updated': 1, 'unchanged': 2, 'missing': 1},
+        )
+        self.assertTrue(Voter.objects.get(last_name='Cat').missing_from_import)
+        self.assertEqual(Voter.objects.get(last_name='Bob').party_affiliation, 'R')
+        self.assertEqual(aggregates.total_voters(), 4)
+        self.assertCubeMatchesRebuild()
+
+        # Cat is back unchanged, and counts as updated because the row was flagged missing
+        write_csv(self.path('week3.csv'), [ann, bob_switched, cat, dan, eve])
+        counts = load_csv(self.path('week3.csv'), writer=DeltaWriter())
+        self.assertEqual(
+            {key: counts[key] for key in ('created', 'updated', 'unchanged', 'missing')},
+            {'created': 0, 'updated': 1, 'unchanged': 4, 'missing': 0},
+        )
+        self.assertFalse(Voter.objects.get(last_name='Cat').missing_from_import)
+        self.assertEqual(aggregates.total_voters(), 5)
+        self.assertCubeMatchesRebuild()
+
+        # an import that changed nothing doesn't move the data version
+        version = VoterImport.data_version()
+        load_csv(self.path('week3.csv'), writer=DeltaWriter())
+        self.assertEqual(VoterImport.data_version(), version)
+
+
+class TypedDatesMigrationTests(TransactionTestCase):
+    ''' Migration 0003 parses the text dates and rehashes each row the way the loaders would. '''
+
+    def migrate(self, target):
+        ''' Migrate voter_analytics to target and return the historical apps there. '''
+
+        executor = MigrationExecutor(connection)
+        executor.migrate([('voter_analytics', target)])
+        return MigrationExecutor(connection).loader.project_state([('voter_analytics', target)]).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_rehash(self):
+        Voter = self.migrate('0001_initial').get_model('voter_analytics', 'Voter')
+        common = {'street_number': '12', 'street_name': 'Beacon St', 'zip_code': '02459',
+                  'party_affiliation': 'D', 'precinct_number': '1A', 'v20state': True, 'voter_score': 1}
+        ann = Voter.objects.create(last_name='Smith', first_name='Ann', date_of_birth='05/01/1980',
+                                   date_of_registration='01/02/2000', **common)
+        # the same person again with ISO dates: a different key while the dates were text
+        again = Voter.objects.create(last_name='Smith', first_name='Ann', date_of_birth='1980-05-01',
+                                     date_of_registration='2000-01-02', **common)
+        bob = Voter.objects.create(last_name='Jones', first_name='Bob', date_of_birth='',
+                                   date_of_registration='2000-01-02', **common)
+
+        Voter = self.migrate('0002_voter_import_keys').get_model('voter_analytics', 'Voter')
+        self.assertNotEqual(Voter.objects.get(pk=ann.pk).natural_key, Voter.objects.get(pk=again.pk).natural_key)
+
+        Voter = self.migrate('0003_voter_typed_dates').get_model('voter_analytics', 'Voter')
+        migrated = Voter.objects.get(pk=ann.pk)
+        expected = parse_row(fields('Smith', 'Ann', born='05/01/1980', voted=['v20state']))
+        self.assertEqual(migrated.date_of_birth, datetime.date(1980, 5, 1))
+        self.assertEqual(migrated.date_of_registration, datetime.date(2000, 1, 2))
+        self.assertEqual(migrated.birth_year, 1980)
+        self.assertEqual((migrated.natural_key, migrated.content_hash), (expected['natural_key'], expected['content_hash']))
+        # the repeat now shares the key, so it keeps none
+        self.assertIsNone(Voter.objects.get(pk=again.pk).natural_key)
+
+        migrated = Voter.objects.get(pk=bob.pk)
+        expected = parse_row(fields('Jones', 'Bob', born='', voted=['v20state']))
+        self.assertIsNone(migrated.date_of_birth)
+        self.assertEqual((migrated.natural_key, migrated.content_hash), (expected['natural_key'], expected['content_hash']))
+
+
+class ParticipationTests(TestCase):
+    ''' Participation queries on the bitmask agree with the election flags. '''
+
+    def setUp(self):
+        voted = [(), ('v20state',), ('v20state', 'v22general'), ('v20state', 'v21town', 'v22general'), ELECTIONS]
+        for i, elections in enumerate(voted):
+            Voter.objects.create(last_name=f'V{i}', first_name='X', **{name: True for name in elections})
+        aggregates.rebuild()
+
+    def test_voted_in(self):
+        names = lambda qs: sorted(qs.values_list('last_name', flat=True))
+        self.assertEqual(names(Voter.objects.voted_in('v20state')), ['V1', 'V2', 'V3', 'V4'])
+        self.assertEqual(names(Voter.objects.voted_in('v20state', 'v22general')), ['V2', 'V3', 'V4'])
+        self.assertEqual(names(Voter.objects.voted_exactly('v20state', 'v22general')), ['V2'])
+
+    def test_voted_at_least(self):
+        self.assertEqual(Voter.objects.voted_at_least(0).count(), 5)
+        self.assertEqual(Voter.objects.voted_at_least(2).count(), 3)
+        self.assertEqual(Voter.objects.voted_at_least(5).count(), 1)
+
+    def test_bitwise_fallback(self):
+        def results():
+            queries = [Voter.objects.voted_in('v20state', 'v22general')]
+            queries += [Voter.objects.voted_at_least(n) for n in range(6)]
+            return [sorted(qs.values_list('pk', flat=True)) for qs in queries], str(queries[-1].query)
+
+        listed, sql = results()
+        self.assertIn('IN (', sql)
+        # with too many masks to list, the same queries run as bitwise expressions
+        with mock.patch.object(type(Voter.objects.all()), 'MAX_LISTED_MASKS', 1):
+            bitwise, sql = results()
+        self.assertNotIn('IN (', sql)
+        self.assertEqual(bitwise, listed)
+
+    def test_participation_distribution(self):
+        expected = {0: 1, 1: 1, 2: 1, 3: 1, 4: 0, 5: 1}
+        self.assertEqual(Voter.objects.participation_distribution(), expected)
+        self.assertEqual(aggregates.participation_distribution(), expected)
+
+
+class SnapshotTests(TestCase):
+    ''' The column snapshot follows the data version. '''
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = self.settings(VOTER_SNAPSHOT_DIR=directory.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        snapshot._loaded = None
+        self.addCleanup(setattr, snapshot, '_loaded', None)
+
+    def test_rebuilt_when_data_version_changes(self):
+        Voter.objects.create(last_name='Smith', first_name='Ann', party_affiliation='D')
+        first = snapshot.load()
+        self.assertEqual(first.size, 1)
+        self.assertIs(snapshot.load(), first)
+
+        Voter.objects.create(last_name='Jones', first_name='Bob', party_affiliation='R')
+        VoterImport.objects.create(mode='insert', created=1, rows_changed=1)
+        second = snapshot.load()
+        self.assertNotEqual(second.version, first.version)
+        self.assertEqual(second.size, 2)
+        self.assertEqual(snapshot.party_distribution(second), {'D': 1, 'R': 1})
+        # the old version's directory is pruned
+        self.assertEqual(os.listdir(snapshot.snapshot_root()), [f'v{second.version}'])
+
+
+class VoterViewTests(TestCase):
+    ''' Search pages walk every voter once; exports stream the same voters. '''
+
+    def setUp(self):
+        rows = [
+            parse_row(fields(f'Name{i % 7}', f'First{i}', party='DR'[i % 2], voted=ELECTIONS[:i % 3]))
+            for i in range(PAGE_SIZE * 2 + 50)
+        ]
+        InsertWriter().write(rows)
+
+    def walk(self, params):
+        ''' Return the pks on every page of the voter list, following the next-page links. '''
+
+        pks = []
+        response = self.client.get(reverse('voters'), params)
+        while True:
+            pks.extend(v.pk for v in response.context['voters'])
+            if not response.context['next_query']:
+                return pks, response
+            response = self.client.get(reverse('voters') + '?' + response.context['next_query'])
+
+    def test_cursor_walks_every_voter_once(self):
+        pks, response = self.walk({})
+        expected = list(Voter.objects.order_by('last_name', 'first_name', 'pk').values_list('pk', flat=True))
+        self.assertEqual(pks, expected)
+        self.assertEqual(response.context['count'], len(expected))
+
+        pks, response = self.walk({'party': 'D'})
+        self.assertEqual(len(pks), Voter.objects.filter(party_affiliation='D').count())
+        self.assertEqual(response.context['count'], len(pks))
+
+    def test_counts_come_from_the_cube(self):
+        VoterAggregate.objects.filter(dimension=aggregates.TOTAL).update(count=12345)
+        response = self.client.get(reverse('voters'))
+        self.assertEqual(response.context['count'], 12345)
+
+    def test_csv_export(self):
+        response = self.client.get(reverse('export_voters'), {'format': 'csv', 'party': 'R'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode('utf-8'))))
+        self.assertEqual(rows[0], EXPORT_FIELDS)
+        expected = list(Voter.objects.filter(party_affiliation='R').order_by('pk').values_list('pk', flat=True))
+        self.assertEqual([int(row[0]) for row in rows[1:]], expected)
+
+    def test_ndjson_export(self):
+        response = self.client.get(reverse('export_voters'), {'format': 'ndjson', 'voted': 'v20state'})
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(len(records), Voter.objects.voted_in('v20state').count())
+        self.assertEqual(list(records[0]), EXPORT_FIELDS)
+        self.assertTrue(all(record['v20state'] for record in records))
+
+        response = self.client.get(reverse('export_voters'), {'format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+
+class SyntheticTests(TestCase):
+    ''' generate_csv writes the same file for the same seed. '''
+
+    def test_deterministic(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, f'{n}.csv') for n in range(4)]
+            generate_csv(paths[0], 500, seed=3)
+            generate_csv(paths[1], 500, seed=3)
+            generate_csv(paths[2], 500, seed=4)
+            generate_csv(paths[3], 500, seed=3, changed_rate=0.1)
+            contents = []
+            for path in paths:
+                with open(path, encoding='utf-8') as f:
+                    contents.append(f.read())
+
+        self.assertEqual(contents[0], contents[1])
+        self.assertNotEqual(contents[0], contents[2])
+        # a later export of the same voters: same size, some records changed
+        self.assertNotEqual(contents[0], contents[3])
+        self.assertEqual(len(contents[3].splitlines()), len(contents[0].splitlines()))
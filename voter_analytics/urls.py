@@ -6,5 +6,7 @@ from django.urls import path
 from .views import *
 
 urlpatterns = [
-    
+    path('', VoterListView.as_view(), name='voters'),
+    path('voter/<int:pk>', VoterDetailView.as_view(), name='voter'),
+    path('export', VoterExportView.as_view(), name='export_voters'),
 ]
\ No newline at end of file
@@ -1,3 +1,231 @@
-from django.shortcuts import render
+# file: voter_analytics/views.py
+# Author: Evren Yaman (yamane@bu.edu), 10/18/2026
+# Description: Voter search with keyset pagination and counts served from the aggregate cube or cache.
+
+import base64
+import csv
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.views.generic import DetailView, ListView, View
+
+from . import aggregates
+from .models import Voter, VoterImport
+from .parsing import COLUMNS, ELECTIONS
 
 # Create your views here.
+
+PAGE_SIZE = 100
+COUNT_CACHE_SECONDS = 60 * 60
+
+# rows fetched per round trip by the export iterator
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FIELDS = ['id'] + COLUMNS
+
+
+def encode_cursor(voter):
+    ''' Return an opaque cursor pointing just past voter in (last_name, first_name, pk) order. '''
+
+    raw = json.dumps([voter.last_name, voter.first_name, voter.pk]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    ''' Return (last_name, first_name, pk) from a cursor, or None if it is invalid. '''
+
+    try:
+        last_name, first_name, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return str(last_name), str(first_name), int(pk)
+    except (ValueError, TypeError):
+        return None
+
+
+class VoterFilterMixin:
+    ''' Parse the voter search filters from the query string and apply them.
+    Shared by every view that works on a filtered set of voters. '''
+
+    def get_filters(self):
+        ''' Return the normalized filters; blank or invalid values are dropped. '''
+
+        if hasattr(self, '_filters'):
+            return self._filters
+
+        params = self.request.GET
+        filters = {}
+        for name in ('party', 'precinct'):
+            value = params.get(name, '').strip()
+            if value:
+                filters[name] = value
+        for name in ('min_birth_year', 'max_birth_year', 'voter_score'):
+            value = params.get(name, '').strip()
+            if value.isdigit():
+                filters[name] = int(value)
+        voted = sorted(name for name in params.getlist('voted') if name in ELECTIONS)
+        if voted:
+            filters['voted'] = voted
+
+        self._filters = filters
+        return filters
+
+    def filter_voters(self, qs=None):
+        ''' Return current voters matching the filters. '''
+
+        filters = self.get_filters()
+        qs = Voter.objects.filter(missing_from_import=False) if qs is None else qs
+
+        if 'party' in filters:
+            qs = qs.filter(party_affiliation=filters['party'])
+        if 'precinct' in filters:
+            qs = qs.filter(precinct_number=filters['precinct'])
+        if 'min_birth_year' in filters:
+            qs = qs.filter(birth_year__gte=filters['min_birth_year'])
+        if 'max_birth_year' in filters:
+            qs = qs.filter(birth_year__lte=filters['max_birth_year'])
+        if 'voter_score' in filters:
+            qs = qs.filter(voter_score=filters['voter_score'])
+        if 'voted' in filters:
+            qs = qs.voted_in(*filters['voted'])
+        return qs
+
+    def count_voters(self):
+        ''' Return the number of matching voters. Filter combinations the cube
+        covers are answered from it; everything else is counted once and cached
+        per filter signature until the next import changes the data. '''
+
+        filters = self.get_filters()
+        keys = set(filters)
+
+        if not keys:
+            return aggregates.total_voters()
+        if keys <= {'party', 'precinct'}:
+            return sum(
+                n for (party, precinct), n in aggregates.party_precinct_counts().items()
+                if filters.get('party', party) == party and filters.get('precinct', precinct) == precinct
+            )
+        if keys <= {'min_birth_year', 'max_birth_year'}:
+            return sum(
+                n for year, n in aggregates.birth_year_counts().items()
+                if filters.get('min_birth_year', year) <= year <= filters.get('max_birth_year', year)
+            )
+        if keys == {'voted'}:
+            bits = sum(1 << ELECTIONS.index(name) for name in filters['voted'])
+            return sum(n for mask, n in aggregates.participation_counts().items() if mask & bits == bits)
+
+        signature = hashlib.md5(json.dumps(filters, sort_keys=True).encode('utf-8')).hexdigest()
+        key = f'voter_analytics:count:{VoterImport.data_version()}:{signature}'
+        return cache.get_or_set(key, lambda: self.filter_voters().count(), COUNT_CACHE_SECONDS)
+
+
+class VoterListView(VoterFilterMixin, ListView):
+    ''' Display one page of filtered voters, ordered by name. Pages are
+    addressed by a keyset cursor instead of an OFFSET, so page 500 costs the
+    same index range scan as page 1. '''
+
+    model = Voter
+    template_name = "voter_analytics/voters.html"
+    context_object_name = "voters"
+
+    def get_queryset(self):
+        ''' Return at most PAGE_SIZE voters after the cursor, plus one extra row
+        to detect whether a next page exists. '''
+
+        qs = self.filter_voters().order_by('last_name', 'first_name', 'pk')
+
+        position = decode_cursor(self.request.GET.get('after', ''))
+        if position:
+            last_name, first_name, pk = position
+            # the leading >= bound lets the name index start the range scan at the cursor
+            qs = qs.filter(last_name__gte=last_name).filter(
+                Q(last_name__gt=last_name) |
+                Q(last_name=last_name, first_name__gt=first_name) |
+                Q(last_name=last_name, first_name=first_name, pk__gt=pk)
+            )
+
+        rows = list(qs[:PAGE_SIZE + 1])
+        self.has_next = len(rows) > PAGE_SIZE
+        return rows[:PAGE_SIZE]
+
+    def get_context_data(self, **kwargs):
+        ''' Add the filters, result count and next-page query string to the context. '''
+
+        context = super().get_context_data(**kwargs)
+        voters = context['voters']
+
+        params = self.request.GET.copy()
+        params.pop('after', None)
+        next_params = params.copy()
+        if self.has_next:
+            next_params['after'] = encode_cursor(voters[-1])
+
+        # every filter key is present so the form can render blanks
+        context['filters'] = {
+            'party': '', 'precinct': '', 'min_birth_year': '', 'max_birth_year': '',
+            'voter_score': '', 'voted': [], **self.get_filters(),
+        }
+        context['count'] = self.count_voters()
+        context['parties'] = sorted(p for p in aggregates.party_counts() if p)
+        context['elections'] = ELECTIONS
+        context['filter_query'] = params.urlencode()
+        context['next_query'] = next_params.urlencode() if self.has_next else ''
+        context['is_first_page'] = 'after' not in self.request.GET
+        return context
+
+
+class VoterDetailView(DetailView):
+    ''' Display a single Voter. '''
+
+    model = Voter
+    template_name = "voter_analytics/voter.html"
+    context_object_name = "voter"
+
+
+class Echo:
+    ''' File-like object whose write() just returns the value, so csv.writer
+    can format one row at a time for a streaming response. '''
+
+    def write(self, value):
+        return value
+
+
+class VoterExportView(VoterFilterMixin, View):
+    ''' Stream the voters matching the search filters as CSV or NDJSON.
+    Rows come from a server-side iterator in EXPORT_CHUNK_SIZE chunks, so
+    memory stays flat however many voters match. '''
+
+    def get(self, request, *args, **kwargs):
+        ''' Return a streaming download in the format given by ?format=csv|ndjson. '''
+
+        fmt = request.GET.get('format', 'csv')
+        if fmt == 'csv':
+            rows, content_type = self.csv_rows(), 'text/csv'
+        elif fmt == 'ndjson':
+            rows, content_type = self.ndjson_rows(), 'application/x-ndjson'
+        else:
+            return HttpResponseBadRequest('format must be csv or ndjson')
+
+        response = StreamingHttpResponse(rows, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="voters.{fmt}"'
+        return response
+
+    def iter_voters(self):
+        ''' Yield value tuples of EXPORT_FIELDS for every matching voter. '''
+
+        qs = self.filter_voters().order_by('pk').values_list(*EXPORT_FIELDS)
+        return qs.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    def csv_rows(self):
+        ''' Yield the CSV header, then one formatted line per voter. '''
+
+        writer = csv.writer(Echo())
+        yield writer.writerow(EXPORT_FIELDS)
+        for row in self.iter_voters():
+            yield writer.writerow(row)
+
+    def ndjson_rows(self):
+        ''' Yield one JSON object per line per voter. '''
+
+        for row in self.iter_voters():
+            yield json.dumps(dict(zip(EXPORT_FIELDS, row)), default=str) + '\n'